@@ -0,0 +1,358 @@
+"""
+Benchmark the series sleuth: cold command line startup, loading
+the data set, parse() latency for regular-season and playoffs games,
+batch throughput, and peak memory. Results are saved as JSON so that
+they can be compared between versions.
+"""
+import os
+import sys
+import time
+import json
+import random
+import shutil
+import argparse
+import platform
+import tempfile
+import statistics
+import subprocess
+import tracemalloc
+from types import SimpleNamespace
+from series_sleuth import __version__
+from series_sleuth.cache import load_index, get_cache_path, get_data_version
+from series_sleuth.sleuth import SleuthData
+from series_sleuth.session import SleuthSession
+from series_sleuth.util import SEASON_MAX
+
+# generate_games_data.py is a script next to this one, not part of the package
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from generate_games_data import add_arguments, check_args, generate_games, write_games_data
+
+
+root_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+results_path = os.path.abspath(os.path.join(root_path, 'benchmarks'))
+
+# Metrics where more is better; for every other metric, less is better
+HIGHER_IS_BETTER = ['gamesPerSecond']
+
+
+def main(args):
+    # Always start from an empty cache, so cold and warm runs mean something
+    cache_dir = tempfile.mkdtemp(prefix='series-sleuth-benchmark-')
+    os.environ['SERIES_SLEUTH_CACHE_DIR'] = cache_dir
+
+    try:
+        dataset = {}
+        if args.synthetic:
+            check_args(args)
+            args.games_data = os.path.join(cache_dir, 'synthetic_games_data.json')
+            print(f"Generating {args.seasons} seasons of {args.teams} teams")
+            write_games_data(args.games_data, generate_games(args))
+            dataset['synthetic'] = {
+                'teams': args.teams,
+                'seasons': args.seasons,
+                'days': args.days,
+                'bracketSize': args.bracket_size,
+                'playoffsSeriesLength': args.playoffs_series_length,
+                'seed': args.seed,
+            }
+        if args.games_data:
+            os.environ['SERIES_SLEUTH_GAMES_DATA'] = args.games_data
+
+        print("Loading data")
+        index = load_index()
+        rng = random.Random(args.seed)
+        regular_ids, playoffs_ids = sample_game_ids(index, rng, args.samples)
+        dataset['version'] = get_data_version()
+        dataset['games'] = len(index.store)
+        dataset['seasons'] = len(index.seasons())
+
+        results = {
+            'version': __version__,
+            'commit': get_commit(),
+            'date': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'backend': os.environ.get('SERIES_SLEUTH_BACKEND') or 'python',
+            'dataset': dataset,
+            'metrics': {},
+        }
+        metrics = results['metrics']
+
+        print("Benchmarking command line startup")
+        metrics.update(bench_cli(regular_ids[0], args.repeat))
+
+        print("Benchmarking data set load")
+        metrics.update(bench_load(regular_ids[0], args.repeat))
+
+        print("Benchmarking parse()")
+        metrics.update(bench_parse(index, 'parseRegular', regular_ids))
+        metrics.update(bench_parse(index, 'parsePlayoffs', playoffs_ids))
+
+        print("Benchmarking batch throughput")
+        all_ids = [index.store.game_id(row) for row in range(len(index.store))]
+        if args.batch_size:
+            all_ids = rng.sample(all_ids, min(args.batch_size, len(all_ids)))
+        metrics.update(bench_batch(index, all_ids, args.workers))
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+    print_metrics(metrics)
+
+    output = args.output
+    if output is None:
+        os.makedirs(results_path, exist_ok=True)
+        name = results['version']
+        if results['commit']:
+            name += '-' + results['commit']
+        output = os.path.join(results_path, f"{name}.json")
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=4)
+    print(f"Saved results to {output}")
+
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            baseline = json.load(f)
+        regressions = compare(baseline, results, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} metrics regressed by more than {args.threshold}%: {', '.join(regressions)}")
+            sys.exit(1)
+
+
+def sample_game_ids(index, rng, samples):
+    """Pick (the same, for the same seed) regular-season and playoffs game IDs to benchmark"""
+    store = index.store
+    regular = []
+    playoffs = []
+    for row in range(len(store)):
+        if store.day[row] < SEASON_MAX:
+            regular.append(row)
+        else:
+            playoffs.append(row)
+    regular = rng.sample(regular, min(samples, len(regular)))
+    playoffs = rng.sample(playoffs, min(samples, len(playoffs)))
+    return [store.game_id(row) for row in regular], [store.game_id(row) for row in playoffs]
+
+
+def get_commit():
+    """Get the short hash of the current git commit, if there is one"""
+    try:
+        out = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=root_path,
+            capture_output=True,
+            text=True,
+            check=True
+        )
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def timings(prefix, times):
+    """Summarize a list of timings (seconds) as metrics"""
+    times = sorted(times)
+    return {
+        f"{prefix}.count": len(times),
+        f"{prefix}.meanSeconds": statistics.mean(times),
+        f"{prefix}.medianSeconds": statistics.median(times),
+        f"{prefix}.p95Seconds": times[min(len(times) - 1, int(len(times)*0.95))],
+        f"{prefix}.maxSeconds": times[-1],
+    }
+
+
+def run_command(flags):
+    """Run the command line tool once, and return its wall time and peak memory (bytes)"""
+    cmd = [sys.executable, '-m', 'series_sleuth.command'] + flags
+    start = time.perf_counter()
+    p = subprocess.Popen(cmd, stdout=subprocess.DEVNULL)
+    _, status, usage = os.wait4(p.pid, 0)
+    elapsed = time.perf_counter() - start
+    p.returncode = os.waitstatus_to_exitcode(status)
+    if p.returncode!=0:
+        raise Exception(f"Error: command failed with exit code {p.returncode}: {' '.join(cmd)}")
+    # ru_maxrss is in kilobytes on Linux, but in bytes on macOS
+    rss = usage.ru_maxrss if sys.platform=='darwin' else usage.ru_maxrss*1024
+    return elapsed, rss
+
+
+def bench_cli(game_id, repeat):
+    """Time a fresh series-sleuth process summarizing one game, without, before, and with the cache"""
+    metrics = {}
+    flags = ['--json', '-g', game_id]
+    for name, extra, clear_cache in [
+        ('cliNoCache', ['--no-cache'], False),
+        ('cliColdCache', [], True),
+        ('cliWarmCache', [], False),
+    ]:
+        times = []
+        peak = 0
+        for _ in range(repeat):
+            if clear_cache and os.path.exists(get_cache_path()):
+                os.remove(get_cache_path())
+            elapsed, rss = run_command(flags + extra)
+            times.append(elapsed)
+            peak = max(peak, rss)
+        metrics.update(timings(name, times))
+        metrics[f"{name}.peakRssBytes"] = peak
+    return metrics
+
+
+def bench_load(game_id, repeat):
+    """
+    Time SleuthData.__init__ loading the data set, from the games data JSON and from the cache.
+    The cache file was already built (and read) by load_index() in main(), so loadCache and
+    loadMapped time warm reads, with the file in the operating system's page cache.
+    """
+    options = SimpleNamespace(game_id=game_id, team=None, season=None, day=None)
+    loads = [
+        ('loadNoCache', lambda: SleuthData(options, index=load_index(cache=False))),
+        ('loadCache', lambda: SleuthData(options)),
+        ('loadMapped', lambda: SleuthData(options, index=load_index(mapped=True))),
+    ]
+    metrics = {}
+    for name, load in loads:
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            load()
+            times.append(time.perf_counter() - start)
+        metrics.update(timings(name, times))
+
+        # Once more, tracing allocations (which slows it down) for the peak memory
+        metrics[f"{name}.peakBytes"] = traced_peak(load)
+    return metrics
+
+
+def bench_parse(index, name, game_ids):
+    """Time parse() of each given game, the way the command line tool summarizes one game"""
+    times = []
+    for game_id in game_ids:
+        options = SimpleNamespace(game_id=game_id, team=None, season=None, day=None)
+        s = SleuthData(options, index=index)
+        start = time.perf_counter()
+        s.parse()
+        times.append(time.perf_counter() - start)
+    if not times:
+        return {}
+    return timings(name, times)
+
+
+def bench_batch(index, game_ids, workers):
+    """Time summarizing many games with one session, like batch mode"""
+    metrics = {}
+    for n in [1] + [w for w in workers if w > 1]:
+        name = 'batch' if n==1 else f"batchWorkers{n}"
+        session = SleuthSession(index=index)
+        start = time.perf_counter()
+        session.summarize_many(game_ids, workers=n)
+        elapsed = time.perf_counter() - start
+        metrics[f"{name}.games"] = len(game_ids)
+        metrics[f"{name}.seconds"] = elapsed
+        metrics[f"{name}.gamesPerSecond"] = len(game_ids)/elapsed if elapsed else 0
+    metrics['batch.peakBytes'] = traced_peak(lambda: SleuthSession(index=index).summarize_many(game_ids))
+    return metrics
+
+
+def traced_peak(f):
+    """Return the peak memory (bytes) allocated while calling f"""
+    tracemalloc.start()
+    try:
+        f()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def print_metrics(metrics):
+    width = max(len(name) for name in metrics)
+    for name, value in metrics.items():
+        print(f"{name:<{width}}  {format_value(name, value)}")
+
+
+def format_value(name, value):
+    if name.endswith('Seconds') or name.endswith('.seconds'):
+        return f"{value*1000:.3f} ms"
+    if name.endswith('Bytes'):
+        return f"{value/(1 << 20):.1f} MiB"
+    if isinstance(value, float):
+        return f"{value:.1f}"
+    return str(value)
+
+
+def compare(baseline, results, threshold):
+    """
+    Print each metric next to its value in the baseline results,
+    and return the names of the timing, throughput and memory
+    metrics that got worse by more than threshold percent
+    """
+    print(f"Compared to {baseline.get('version')} ({baseline.get('commit')}):")
+    old_metrics = baseline.get('metrics', {})
+    width = max(len(name) for name in results['metrics'])
+    regressions = []
+    for name, value in results['metrics'].items():
+        old = old_metrics.get(name)
+        if old is None or name.endswith('.count') or name.endswith('.games'):
+            continue
+        change = (value - old)/old*100 if old else 0
+        worse = -change if name.split('.')[-1] in HIGHER_IS_BETTER else change
+        flag = ''
+        if worse > threshold:
+            regressions.append(name)
+            flag = '  REGRESSION'
+        print(f"{name:<{width}}  {format_value(name, old)} -> {format_value(name, value)}  ({change:+.1f}%){flag}")
+    return regressions
+
+
+if __name__ == "__main__":
+
+    p = argparse.ArgumentParser()
+    p.add_argument('--repeat',
+                   required=False,
+                   default=5,
+                   type=int,
+                   help='Number of times to time command line startup and data set loads (default 5)')
+    p.add_argument('--samples',
+                   required=False,
+                   default=200,
+                   type=int,
+                   help='Number of regular-season and of playoffs games to time parse() on (default 200 each)')
+    p.add_argument('--batch-size',
+                   required=False,
+                   default=None,
+                   type=int,
+                   help='Number of games to summarize for batch throughput (default every game)')
+    p.add_argument('--workers',
+                   required=False,
+                   default=[],
+                   type=int,
+                   action='append',
+                   help='Also time batch throughput on this many worker threads (repeat flag for more)')
+
+    p.add_argument('--games-data',
+                   required=False,
+                   default=None,
+                   help='Benchmark on this games data JSON file instead of the installed games data')
+    p.add_argument('--synthetic',
+                   required=False,
+                   default=False,
+                   action='store_true',
+                   help='Benchmark on a synthetic data set made by generate_games_data.py with the settings below')
+    # --seed also picks the games to benchmark
+    add_arguments(p.add_argument_group('synthetic data set'))
+
+    p.add_argument('--output',
+                   required=False,
+                   default=None,
+                   help='File to save the results to (default benchmarks/<version>-<commit>.json)')
+    p.add_argument('--compare',
+                   required=False,
+                   default=None,
+                   help='Results file of an earlier run to compare these results to')
+    p.add_argument('--threshold',
+                   required=False,
+                   default=10,
+                   type=float,
+                   help='With --compare, exit with an error if any metric is worse by more than this percent (default 10)')
+
+    args = p.parse_args(sys.argv[1:])
+    main(args)
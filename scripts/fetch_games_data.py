@@ -1,8 +1,15 @@
 import re
 import os
+import sys
+import time
+import random
+import argparse
+import threading
 import requests
 import json
-import sseclient
+from collections import deque
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor
 
 
 root_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
@@ -11,15 +18,41 @@ data_path = os.path.abspath(os.path.join(root_path, 'cli', 'data'))
 GAMES_DATA_JSON = os.path.join(data_path, "games_data_trim.json")
 UPDATE_DATA_JSON = os.path.join(data_path, "update_data.json")
 
+# Games are stored in append-only segments, one NDJSON file per season
+# with one line per fetched day, plus a manifest that says which bytes
+# of each segment are committed and where each day's latest line is.
+SEGMENTS_DIR = os.path.join(data_path, "games_segments")
+MANIFEST_JSON = os.path.join(SEGMENTS_DIR, "manifest.json")
 
-def main():
+# Compact a segment once more than this fraction of it is replaced days
+COMPACT_RATIO = 0.5
+
+BASE_URL = "https://www.blaseball.com"
+
+# HTTP statuses worth trying again after a while
+RETRY_STATUSES = [429, 500, 502, 503, 504]
+
+
+def main(args):
     print("Loading data")
-    gameData, updateData = load_game_data()
+    updateData = load_update_data()
+
+    if args.compact:
+        for season in list(updateData["segments"]):
+            compact_segment(updateData, int(season))
+        print("Compacted all segments")
+
+    if args.export:
+        print(f"Exporting games data to {GAMES_DATA_JSON}")
+        export_game_data(GAMES_DATA_JSON)
+
+    if args.compact or args.export:
+        return
 
     lastDate = updateData["lastDate"]
     print(f"Last date found was season {lastDate[0] + 1}, day {lastDate[1] + 1}")
 
-    currDate = get_game_day()
+    currDate = get_game_day(args.base_url)
     print(f"Current date is season {currDate[0] + 1}, day {currDate[1] + 1}")
 
     missingDays = find_missing_days(lastDate, currDate)
@@ -28,22 +61,30 @@ def main():
 
     if(len(missingDays) > 0):
         print("Attempting to fetch intermediate games.")
-        for date in missingDays:
-            print(f"Fetching season {date[0] + 1}, day {date[1] + 1}")
-            if(date in updateData["gameDates"]):
-                # If we already have this date, drop it and re-download it
+        # Days are fetched concurrently, but come back (and are saved) in order
+        fetched = fetch_game_days(
+            missingDays,
+            base_url=args.base_url,
+            workers=args.workers,
+            rate=args.rate,
+            retries=args.retries
+        )
+        for date, result in fetched:
+            print(f"Fetched season {date[0] + 1}, day {date[1] + 1}")
+            if(len(result)==0):
+                # Nothing to save (e.g. a day after the end of the playoffs)
+                print("No games on that day, skipping it.")
+                mark_fetched(updateData, date)
+                continue
+            if(has_game_day(updateData, date)):
+                # If we already have this date, the new copy replaces it
                 print("Odd... we already have that day? Replacing it for safety.")
-                gameData = [game for game in gameData if (game["season"] != date[0] or game["day"] != date[1])]
-            # Get the game data and postprocess it
-            result = requests.get(f'https://www.blaseball.com/database/games?day={date[1]}&season={date[0]}')
-            result = result.json()
+            # Postprocess the game data
             post_result = postprocess_game_data(result)
-            for game in post_result:
-                gameData.append(game)
-            updateData["lastDate"] = date
-            updateData["gameDates"].append(date)
-            # Save to file each time (slower but safer)
-            save_game_data(gameData, updateData)
+            # Append just this day to its season's segment
+            save_game_day(updateData, date, post_result)
+            # Add just this day to the series-sleuth data cache
+            save_sleuth_day(date, post_result)
 
 
 def postprocess_game_data(gameData):
@@ -102,44 +143,272 @@ def postprocess_game_data(gameData):
     return trimGameData
 
 
-def get_game_day():
-    client = sseclient.SSEClient("https://www.blaseball.com/events/streamData")
+def save_sleuth_day(date, games):
+    """Add one day of games to the series-sleuth data cache, if series-sleuth is installed"""
+    try:
+        from series_sleuth.cache import save_day
+    except ImportError:
+        return
+    save_day(date[0], date[1], games)
+
+
+def get_game_day(base_url=BASE_URL):
+    # Only needed here, so the rest of the script works without it
+    import sseclient
+    client = sseclient.SSEClient(f"{base_url}/events/streamData")
     singleEvent = next(client) #.events())
     sim = json.loads(singleEvent.data)["value"]["games"]["sim"]
     print("season %s\nday %s"%(sim["season"], sim["day"]))
     return (sim["season"], sim["day"])
 
 
-def load_game_data():
-    gameDates = []
+class RateLimiter(object):
+    """
+    Spaces out requests from any number of threads,
+    so that no more than rate requests start per second
+    """
+    def __init__(self, rate):
+        self.interval = 1.0/rate if rate else 0.0
+        self.next_time = 0.0
+        self.lock = threading.Lock()
+
+    def wait(self):
+        with self.lock:
+            now = time.monotonic()
+            start = max(now, self.next_time)
+            self.next_time = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+
+def make_session(workers):
+    """Make a requests session that keeps up to workers connections open for reuse"""
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=workers, pool_maxsize=workers)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def fetch_game_day(session, limiter, date, base_url=BASE_URL, retries=5, backoff=0.5, timeout=30):
+    """
+    Fetch the games of one (season, day) from the /database/games endpoint.
+    Connection errors, timeouts, and statuses in RETRY_STATUSES are tried
+    again up to retries times, waiting twice as long each time (plus some
+    jitter); anything else raises an exception.
+    """
+    url = f"{base_url}/database/games"
+    params = {"day": date[1], "season": date[0]}
+    for attempt in range(retries + 1):
+        limiter.wait()
+        try:
+            result = session.get(url, params=params, timeout=timeout)
+            if result.status_code not in RETRY_STATUSES:
+                result.raise_for_status()
+                return result.json()
+            problem = f"status {result.status_code}"
+        except (requests.ConnectionError, requests.Timeout) as e:
+            problem = type(e).__name__
+        if attempt==retries:
+            raise Exception(f"Error: could not fetch season {date[0] + 1}, day {date[1] + 1} ({problem})")
+        delay = backoff*(2**attempt)
+        delay += random.uniform(0, delay)
+        print(f"Retrying season {date[0] + 1}, day {date[1] + 1} in {delay:.1f}s ({problem})")
+        time.sleep(delay)
+
+
+def fetch_game_days(dates, base_url=BASE_URL, workers=8, rate=10, retries=5, backoff=0.5):
+    """
+    Fetch the games of many (season, day) dates on a pool of worker threads
+    sharing one pooled session, and generate (date, games) in the same order
+    as dates. At most a few days per worker are fetched ahead of the day
+    that is due next, so results do not pile up while waiting for a slow day.
+    """
+    session = make_session(workers)
+    limiter = RateLimiter(rate)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        def submit(date):
+            return date, executor.submit(fetch_game_day, session, limiter, date, base_url, retries, backoff)
+
+        dates = iter(dates)
+        pending = deque(submit(date) for date in islice(dates, 2*workers))
+        while pending:
+            date, future = pending.popleft()
+            result = future.result()
+            for next_date in islice(dates, 1):
+                pending.append(submit(next_date))
+            yield date, result
+
+
+def load_update_data():
+    """
+    Load the manifest of the games data segments. The first time,
+    the games data JSON (if there is one) is split into segments.
+
+    The manifest looks like this (seasons and days are zero-indexed):
+    {
+        "lastDate": [season, day],
+        "segments": {
+            "<season>": {
+                "file": "season_001.0.ndjson",
+                "length": <committed bytes>,
+                "days": {"<day>": [<offset>, <length>], ...}
+            }
+        }
+    }
+    """
     try:
-        with open(GAMES_DATA_JSON, "r") as f:
-            gameData = []
-            arr = json.load(f)
-            for game in arr:
-                gameData.append(game)
-                gameDates.append((game['season'], game['day']))
+        with open(MANIFEST_JSON, "r") as f:
+            return json.load(f)
     except FileNotFoundError:
-        gameData = []
+        pass
 
+    updateData = {"lastDate": [0, 0], "segments": {}}
     try:
         with open(UPDATE_DATA_JSON, "r") as f:
-            updateData = json.loads(f.read())
+            updateData["lastDate"] = json.load(f)["lastDate"]
     except FileNotFoundError:
-        updateData = {"lastDate": (0, 0)}
-
-    updateData["gameDates"] = gameDates
-    return (gameData, updateData)
-
-
-def save_game_data(gameData, updateData):
-    with open(GAMES_DATA_JSON, "w") as f:
-        json.dump(gameData, f)
-        # This makes the json data readable:
-        #json.dump(gameData, f, indent=4, sort_keys=True)
+        pass
 
-    with open(UPDATE_DATA_JSON, "w") as f:
+    try:
+        with open(GAMES_DATA_JSON, "r") as f:
+            arr = json.load(f)
+    except FileNotFoundError:
+        arr = []
+    days = {}
+    for game in arr:
+        days.setdefault((game['season'], game['day']), []).append(game)
+    del arr
+    for date in sorted(days):
+        append_game_day(updateData, date, days[date])
+    write_manifest(updateData)
+    return updateData
+
+
+def load_game_data(updateData=None):
+    """
+    Stream every game out of the segments, in order of season and day,
+    one game at a time, reading only the committed lines
+    """
+    if updateData is None:
+        updateData = load_update_data()
+    for season in sorted(updateData["segments"], key=int):
+        segment = updateData["segments"][season]
+        with open(os.path.join(SEGMENTS_DIR, segment["file"]), "rb") as f:
+            for day in sorted(segment["days"], key=int):
+                offset, length = segment["days"][day]
+                f.seek(offset)
+                for game in json.loads(f.read(length))["games"]:
+                    yield game
+
+
+def has_game_day(updateData, date):
+    segment = updateData["segments"].get(str(date[0]))
+    return segment is not None and str(date[1]) in segment["days"]
+
+
+def save_game_day(updateData, date, games):
+    """
+    Save one day of games: append them to the season's segment, then
+    commit them by writing the manifest. If the day was already saved,
+    this copy replaces it, and the segment is compacted once replaced
+    days take up too much of it.
+    """
+    append_game_day(updateData, date, games)
+    mark_fetched(updateData, date)
+
+    segment = updateData["segments"][str(date[0])]
+    live = sum(length for offset, length in segment["days"].values())
+    if segment["length"] - live > COMPACT_RATIO*segment["length"]:
+        compact_segment(updateData, date[0])
+
+
+def mark_fetched(updateData, date):
+    """Record that every day up to date has been fetched, and write the manifest"""
+    if date >= tuple(updateData["lastDate"]):
+        updateData["lastDate"] = list(date)
+    write_manifest(updateData)
+
+
+def append_game_day(updateData, date, games):
+    """
+    Append one day of games to the season's segment, as one line of JSON,
+    and record it in the manifest (which the caller must write to commit it)
+    """
+    season = str(date[0])
+    if season not in updateData["segments"]:
+        updateData["segments"][season] = {
+            "file": f"season_{date[0] + 1:03d}.0.ndjson",
+            "length": 0,
+            "days": {},
+        }
+    segment = updateData["segments"][season]
+
+    os.makedirs(SEGMENTS_DIR, exist_ok=True)
+    line = (json.dumps({"season": date[0], "day": date[1], "games": games}) + "\n").encode("utf-8")
+    with open(os.path.join(SEGMENTS_DIR, segment["file"]), "ab") as f:
+        # Drop anything past the committed length (left by a crash mid-write)
+        f.truncate(segment["length"])
+        f.write(line)
+        f.flush()
+        os.fsync(f.fileno())
+    segment["days"][str(date[1])] = [segment["length"], len(line)]
+    segment["length"] += len(line)
+
+
+def write_manifest(updateData):
+    """Write the manifest atomically: write it next to the old one, then rename it over it"""
+    os.makedirs(SEGMENTS_DIR, exist_ok=True)
+    tmp = MANIFEST_JSON + ".tmp"
+    with open(tmp, "w") as f:
         json.dump(updateData, f, sort_keys=True)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, MANIFEST_JSON)
+
+
+def compact_segment(updateData, season):
+    """
+    Write a new copy of a season's segment without its replaced days,
+    under a new file name, then switch the manifest over to it. If this
+    is interrupted, the manifest still points at the old segment.
+    """
+    segment = updateData["segments"][str(season)]
+    old_file = segment["file"]
+    generation = int(old_file.split(".")[-2]) + 1
+    new_file = f"season_{season + 1:03d}.{generation}.ndjson"
+
+    days = {}
+    length = 0
+    with open(os.path.join(SEGMENTS_DIR, old_file), "rb") as src, \
+            open(os.path.join(SEGMENTS_DIR, new_file), "wb") as dst:
+        for day in sorted(segment["days"], key=int):
+            offset, day_length = segment["days"][day]
+            src.seek(offset)
+            dst.write(src.read(day_length))
+            days[day] = [length, day_length]
+            length += day_length
+        dst.flush()
+        os.fsync(dst.fileno())
+
+    segment["file"] = new_file
+    segment["length"] = length
+    segment["days"] = days
+    write_manifest(updateData)
+    os.remove(os.path.join(SEGMENTS_DIR, old_file))
+
+
+def export_game_data(path):
+    """Write every game to a JSON array file, streaming one game at a time"""
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        f.write("[")
+        for i, game in enumerate(load_game_data()):
+            if i > 0:
+                f.write(", ")
+            json.dump(game, f)
+        f.write("]")
+    os.replace(tmp, path)
 
 
 def find_missing_days(lastDate, currDate):
@@ -162,4 +431,38 @@ def find_missing_days(lastDate, currDate):
 
 
 if __name__ == "__main__":
-    main()
+
+    p = argparse.ArgumentParser()
+    p.add_argument('--compact',
+                   required=False,
+                   default=False,
+                   action='store_true',
+                   help='Compact every games data segment, dropping replaced days, and exit')
+    p.add_argument('--export',
+                   required=False,
+                   default=False,
+                   action='store_true',
+                   help='Export the games data segments to a single games data JSON file, and exit')
+
+    p.add_argument('--workers',
+                   required=False,
+                   default=8,
+                   type=int,
+                   help='Number of days to fetch at the same time (default 8)')
+    p.add_argument('--rate',
+                   required=False,
+                   default=10,
+                   type=float,
+                   help='Most requests to start per second (default 10)')
+    p.add_argument('--retries',
+                   required=False,
+                   default=5,
+                   type=int,
+                   help='Number of times to retry a day that fails to fetch (default 5)')
+    p.add_argument('--base-url',
+                   required=False,
+                   default=BASE_URL,
+                   help='Base URL of the blaseball API (e.g. a local server, for testing)')
+
+    args = p.parse_args(sys.argv[1:])
+    main(args)
@@ -0,0 +1,231 @@
+"""
+Generate a synthetic games data set, in the same format as the games
+data JSON (the output of postprocess_game_data() in fetch_games_data.py),
+for testing and benchmarking the series sleuth at scales beyond the
+real games data. The same settings and seed always generate the same games.
+"""
+import os
+import sys
+import json
+import random
+import argparse
+import uuid
+from series_sleuth.util import SEASON_MAX, PLAYOFFS_MAX, SERIES_LENGTH
+
+
+root_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+SHORT2LONG_JSON = os.path.join(root_path, 'series_sleuth', 'data', 'short2long.json')
+
+
+def main(args):
+    check_args(args)
+    print(f"Generating {args.seasons} seasons of {args.teams} teams to {args.output}")
+    ngames = write_games_data(args.output, generate_games(args))
+    print(f"Wrote {ngames} games")
+
+
+def add_arguments(p):
+    """Add the flags that control the generated data set (shared with benchmark_sleuth.py)"""
+    p.add_argument('--teams',
+                   required=False,
+                   default=20,
+                   type=int,
+                   help='Number of teams (default 20)')
+    p.add_argument('--seasons',
+                   required=False,
+                   default=24,
+                   type=int,
+                   help='Number of seasons (default 24)')
+    p.add_argument('--days',
+                   required=False,
+                   default=SEASON_MAX,
+                   type=int,
+                   help=f"Number of days in the regular season, at most {SEASON_MAX} and a multiple of {SERIES_LENGTH} (default {SEASON_MAX})")
+    p.add_argument('--bracket-size',
+                   required=False,
+                   default=8,
+                   type=int,
+                   help='Number of teams in the playoffs, a power of 2 (default 8)')
+    p.add_argument('--playoffs-series-length',
+                   required=False,
+                   default=5,
+                   type=int,
+                   help='Most games in each playoffs series, an odd number (default 5, best of 5)')
+    p.add_argument('--seed',
+                   required=False,
+                   default=0,
+                   type=int,
+                   help='Random seed (default 0)')
+
+
+def check_args(args):
+    """Raise an exception if the data set settings cannot make a data set the sleuth understands"""
+    if args.teams < 2 or args.seasons < 1:
+        raise Exception("Error: need at least 2 teams and 1 season")
+    if not 1 <= args.days <= SEASON_MAX:
+        raise Exception(f"Error: the regular season must be 1 to {SEASON_MAX} days long")
+    if args.days%SERIES_LENGTH!=0:
+        # Every regular-season series lasts SERIES_LENGTH days (see Sleuth.series_scores())
+        raise Exception(f"Error: the regular season must be a whole number of {SERIES_LENGTH}-game series")
+    size = args.bracket_size
+    if size < 2 or size & (size - 1) or size > args.teams:
+        raise Exception("Error: the playoffs bracket size must be a power of 2, and at most the number of teams")
+    if args.playoffs_series_length < 1 or args.playoffs_series_length%2==0:
+        raise Exception("Error: the playoffs series length must be an odd number")
+    rounds = size.bit_length() - 1
+    if rounds*args.playoffs_series_length > PLAYOFFS_MAX - SEASON_MAX:
+        raise Exception(f"Error: the playoffs cannot last more than {PLAYOFFS_MAX - SEASON_MAX} days")
+
+
+def make_teams(n):
+    """Return n teams, as (nickname, full name, emoji), starting with the real teams"""
+    with open(SHORT2LONG_JSON, 'r') as f:
+        short2long = json.load(f)
+    teams = []
+    for i in range(n):
+        if i < len(short2long):
+            nickname = list(short2long)[i]
+            name = short2long[nickname]
+        else:
+            nickname = f"Team {i + 1}"
+            name = f"Synthetic {nickname}"
+        teams.append((nickname, name, f"0x{0x1F300 + i:X}"))
+    return teams
+
+
+def generate_games(args):
+    """
+    Generate every game of every season, in data set order (by season,
+    then by day), as game data json items.
+
+    Each regular season is a round robin of series: every SERIES_LENGTH
+    days, the teams are paired up again (one team sits out, if there is an
+    odd number of teams) and each pair plays one game per day. Playoffs
+    start on day 100 with the teams with the most regular-season wins,
+    seeded best vs worst; each series ends once a team has won most of
+    playoffs_series_length games, and the winners meet in the next round.
+    """
+    rng = random.Random(args.seed)
+    teams = make_teams(args.teams)
+    pitchers = {nickname: [f"{nickname} Pitcher {k + 1}" for k in range(5)] for nickname, _, _ in teams}
+    info = {nickname: (name, emoji) for nickname, name, emoji in teams}
+
+    def game(season, day, home, away, postseason):
+        home_score = rng.randint(0, 12)
+        away_score = rng.randint(0, 12)
+        if home_score==away_score:
+            # No ties in blaseball, someone scores in extra innings
+            if rng.random() < 0.5:
+                home_score += 1
+            else:
+                away_score += 1
+        home_odds = round(rng.uniform(0.3, 0.7), 6)
+        raw = {
+            'id': str(uuid.UUID(int=rng.getrandbits(128), version=4)),
+            'season': season,
+            'day': day,
+            'awayOdds': round(1 - home_odds, 6),
+            'awayPitcherName': pitchers[away][day%5],
+            'awayScore': away_score,
+            'awayTeamEmoji': info[away][1],
+            'awayTeamName': info[away][0],
+            'awayTeamNickname': away,
+            'homeOdds': home_odds,
+            'homePitcherName': pitchers[home][day%5],
+            'homeScore': home_score,
+            'homeTeamEmoji': info[home][1],
+            'homeTeamName': info[home][0],
+            'homeTeamNickname': home,
+            'isPostseason': postseason,
+            'shame': False,
+        }
+        return postprocess_game(raw)
+
+    nicknames = [nickname for nickname, _, _ in teams]
+    for season in range(args.seasons):
+        wins = {nickname: 0 for nickname in nicknames}
+
+        # Regular season: round robin, new pairs every series
+        order = nicknames[:]
+        rng.shuffle(order)
+        if len(order)%2:
+            order.append(None)
+        for series, start in enumerate(range(0, args.days, SERIES_LENGTH)):
+            pairs = round_robin(order, series)
+            for day in range(start, min(start + SERIES_LENGTH, args.days)):
+                for a, b in pairs:
+                    if a is None or b is None:
+                        continue
+                    home, away = (a, b) if series%2==0 else (b, a)
+                    g = game(season, day, home, away, False)
+                    wins[g['winningTeamNickname']] += 1
+                    yield g
+
+        # Playoffs: best teams, seeded best vs worst, until one team is left
+        seeds = sorted(nicknames, key=lambda nickname: (-wins[nickname], nickname))[:args.bracket_size]
+        start = SEASON_MAX
+        while len(seeds) > 1:
+            pairs = [(seeds[i], seeds[len(seeds) - 1 - i]) for i in range(len(seeds)//2)]
+            series_wins = {nickname: 0 for nickname in seeds}
+            to_win = args.playoffs_series_length//2 + 1
+            for k in range(args.playoffs_series_length):
+                day = start + k
+                for high, low in pairs:
+                    if series_wins[high]==to_win or series_wins[low]==to_win:
+                        continue
+                    home, away = (high, low) if k%2==0 else (low, high)
+                    g = game(season, day, home, away, True)
+                    series_wins[g['winningTeamNickname']] += 1
+                    yield g
+            # Winners take the place of the higher seed, so the
+            # winner of 1 vs 8 plays the winner of 4 vs 5, and so on
+            seeds = [high if series_wins[high]==to_win else low for high, low in pairs]
+            start += args.playoffs_series_length
+
+
+def round_robin(order, k):
+    """Return the pairs playing in round k of a round robin over order (circle method)"""
+    n = len(order)
+    k = k%(n - 1)
+    rotated = [order[0]] + order[1:][-k:] + order[1:][:-k] if k else order[:]
+    return [(rotated[i], rotated[n - 1 - i]) for i in range(n//2)]
+
+
+def postprocess_game(game):
+    """Add the derived keys that postprocess_game_data() in fetch_games_data.py adds"""
+    for key in ['TeamName', 'TeamNickname', 'TeamEmoji', 'Score', 'Odds', 'PitcherName']:
+        home_won = game['homeScore'] > game['awayScore']
+        game['winning' + key] = game['home' + key] if home_won else game['away' + key]
+        game['losing' + key] = game['away' + key] if home_won else game['home' + key]
+    game['runDiff'] = abs(game['homeScore'] - game['awayScore'])
+    game['whoWon'] = 'home' if game['homeScore'] > game['awayScore'] else 'away'
+    return game
+
+
+def write_games_data(path, games):
+    """Write games to a games data JSON file one at a time, and return how many there were"""
+    n = 0
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write('[')
+        for game in games:
+            if n:
+                f.write(',\n')
+            json.dump(game, f)
+            n += 1
+        f.write(']\n')
+    os.replace(tmp_path, path)
+    return n
+
+
+if __name__ == "__main__":
+
+    p = argparse.ArgumentParser()
+    add_arguments(p)
+    p.add_argument('--output',
+                   required=False,
+                   default='synthetic_games_data.json',
+                   help='Games data JSON file to write (default synthetic_games_data.json)')
+
+    args = p.parse_args(sys.argv[1:])
+    main(args)
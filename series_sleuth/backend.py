@@ -0,0 +1,47 @@
+import os
+
+# NumPy is optional, only the numpy backend needs it
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+BACKEND_ENV = 'SERIES_SLEUTH_BACKEND'
+BACKENDS = ['python', 'numpy']
+
+
+def get_backend():
+    """
+    Get the backend that builds the cumulative tables:
+    $SERIES_SLEUTH_BACKEND, or python by default
+    """
+    return os.environ.get(BACKEND_ENV) or 'python'
+
+
+def set_backend(name):
+    """
+    Build the cumulative tables with the given backend from now on,
+    in this process and in any worker process it starts (the choice
+    is kept in $SERIES_SLEUTH_BACKEND). Raises ValueError if the
+    backend is unknown, or if it is numpy and NumPy is not installed.
+    """
+    check_backend(name)
+    os.environ[BACKEND_ENV] = name
+
+
+def check_backend(name):
+    """Raise ValueError if the given backend cannot be used"""
+    if name not in BACKENDS:
+        raise ValueError("unknown backend %s (choose from %s)"%(name, ", ".join(BACKENDS)))
+    if name=='numpy' and numpy is None:
+        raise ValueError("the numpy backend needs NumPy (pip install numpy)")
+
+
+def use_numpy():
+    """Check whether the cumulative tables are built with NumPy"""
+    name = get_backend()
+    if name=='python':
+        return False
+    check_backend(name)
+    return True
@@ -0,0 +1,77 @@
+import json
+import time
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor
+from .sleuth import Sleuth
+from .index import GameIndex
+from .metrics import REGISTRY, SUMMARIZE_SECONDS
+
+
+class Backfill(object):
+    """
+    Summarize every game in a season (or in every season),
+    for rebuilding an archive of game summaries.
+
+    Every summary only depends on games from its own season,
+    so the work is split up by season. With more than one
+    worker, each season is summarized in a separate process,
+    which is sent only that season's slice of the games data
+    (see GameStore.slice()) and indexes it on its own.
+
+    Summaries come back in the order of the data set
+    (by season, then by day), whatever the number of workers,
+    each one as a line of JSON. Metrics recorded by the worker
+    processes are added to this process's metrics registry.
+    """
+    def __init__(self, index, workers=1, fields=None):
+        """fields: only summarize these fields (see Sleuth.summarize())"""
+        self.index = index
+        self.workers = workers
+        self.fields = fields
+
+    def lines(self, season0=None):
+        """Generate the summary of every game as a line of JSON, in data set order"""
+        if season0 is None:
+            seasons = self.index.seasons()
+        else:
+            seasons = [season0]
+
+        if self.workers <= 1:
+            sleuth = Sleuth(self.index)
+            for s0 in seasons:
+                for line in summarize_rows(sleuth, self.index.season_rows(s0), self.fields):
+                    yield line
+            return
+
+        slices = (self.index.store.slice(self.index.season_rows(s0)) for s0 in seasons)
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            # map() returns the seasons in order, as each one finishes
+            for season_lines, metrics in executor.map(partial(summarize_season, fields=self.fields), slices):
+                REGISTRY.merge(metrics)
+                for line in season_lines:
+                    yield line
+
+
+def summarize_rows(sleuth, rows, fields=None):
+    """Return the summary of the game in each given row, as a line of JSON"""
+    lines = []
+    for row in rows:
+        start = time.perf_counter()
+        summary = sleuth.summarize(sleuth.data.record(row), fields=fields)
+        SUMMARIZE_SECONDS.observe(time.perf_counter() - start, query='backfill')
+        lines.append(json.dumps(summary))
+    return lines
+
+
+def summarize_season(store, fields=None):
+    """
+    Worker: index one season's slice of the games data and summarize every
+    game in it. Return the lines, and the metrics recorded while doing so
+    (see MetricsRegistry.collect()).
+    """
+    # A worker starts out with a copy of the parent's metrics, and
+    # may summarize more than one season: only send this season's back
+    REGISTRY.clear()
+    sleuth = Sleuth(GameIndex(store))
+    lines = summarize_rows(sleuth, range(len(store)), fields)
+    return lines, REGISTRY.collect()
@@ -0,0 +1,117 @@
+from .util import SEASON_MAX
+
+
+class PlayoffBracket(object):
+    """
+    Playoffs bracket of a single season, built once.
+
+    For every team in the playoffs, this holds the team's
+    postseason games in day order (the first game of each day,
+    like GameIndex.team_game()), and from those:
+    - the playoffs round of each of the team's games, which is
+      the number of different opponents the team has played
+      so far in the playoffs (so a team with a bye counts the
+      round after it as its first round)
+    - the days and scores of the team's games against each opponent
+    - every series: the games played in a row by the same two teams
+
+    Days are zero-indexed in lookups and one-indexed in the
+    dicts returned by series() and rounds(), like in summaries.
+    """
+    def __init__(self, store, rows, last_day0):
+        """Build the bracket from the GameStore rows of all games in one season, up to last_day0"""
+        self.store = store
+        if last_day0 < SEASON_MAX:
+            # No playoffs games yet
+            rows = range(0)
+
+        # Postseason games of each team, first game of each day only
+        self.team_rows = {}
+        for row in rows:
+            if store.day[row] < SEASON_MAX:
+                continue
+            for code in (store.home_team[row], store.away_team[row]):
+                team_rows = self.team_rows.setdefault(store.teams[code], [])
+                if team_rows and store.day[team_rows[-1]]==store.day[row]:
+                    continue
+                team_rows.append(row)
+
+        # Round of each team's games, and games against each opponent
+        self.team_rounds = {}
+        self.pair_rows = {}
+        # Series, by their first game: games in a row between the same
+        # two teams, seen from both teams (keeping the later round of the two)
+        self.series_rows = {}
+        self.series_rounds = {}
+        for team, team_rows in self.team_rows.items():
+            opponents = set()
+            first = None
+            for row in team_rows:
+                versus_team = self.opponent(row, team)
+                if versus_team not in opponents:
+                    opponents.add(versus_team)
+                    first = row
+                elif self.opponent(first, team)!=versus_team:
+                    first = row
+                self.team_rounds[(team, store.day[row])] = len(opponents)
+                self.pair_rows.setdefault((team, versus_team), []).append(row)
+                self.series_rows.setdefault(first, set()).add(row)
+                self.series_rounds[first] = max(self.series_rounds.get(first, 0), len(opponents))
+
+    def opponent(self, row, team):
+        """Return the team that played the given team in the given row"""
+        store = self.store
+        if store.teams[store.home_team[row]]==team:
+            return store.teams[store.away_team[row]]
+        return store.teams[store.home_team[row]]
+
+    def score(self, row):
+        """Return the score of the game in the given row, as {team: runs}"""
+        store = self.store
+        return {
+            store.teams[store.home_team[row]]: store.score(store.home_score, row),
+            store.teams[store.away_team[row]]: store.score(store.away_score, row)
+        }
+
+    def round_of(self, team, day0):
+        """Return the playoffs round of the given team's game on the given day, or 0 if it did not play"""
+        return self.team_rounds.get((team, day0), 0)
+
+    def pair_scores(self, team, versus_team):
+        """Return the (one-indexed) days and scores of every playoffs game between the two given teams"""
+        rows = self.pair_rows.get((team, versus_team), [])
+        return [self.store.day[row] + 1 for row in rows], [self.score(row) for row in rows]
+
+    def series(self):
+        """
+        Return every playoffs series, in order of their first day:
+
+        {
+            round: 1,
+            teams: [Millennials, Shoe Thieves],
+            days: [100, 101, 102, 103],
+            gameIds: [...],
+            scores: [{Millennials: 3, Shoe Thieves: 2}, ...]
+        }
+        """
+        store = self.store
+        all_series = []
+        for first in sorted(self.series_rows):
+            rows = sorted(self.series_rows[first])
+            all_series.append({
+                'round': self.series_rounds[first],
+                'teams': sorted([store.teams[store.home_team[first]], store.teams[store.away_team[first]]]),
+                'days': [store.day[row] + 1 for row in rows],
+                'gameIds': [store.game_id(row) for row in rows],
+                'scores': [self.score(row) for row in rows],
+            })
+        return all_series
+
+    def rounds(self):
+        """Return the series of every round, as a list of rounds"""
+        rounds = []
+        for series in self.series():
+            while len(rounds) < series['round']:
+                rounds.append([])
+            rounds[series['round'] - 1].append(series)
+        return rounds
@@ -0,0 +1,491 @@
+"""
+Binary on-disk cache of the indexed games data set.
+
+Parsing the games data JSON is the slowest part of starting up,
+so the first run stores the GameStore columns and the GameIndex
+arrays in a binary file, and later runs read the arrays straight
+back out of it without parsing any JSON.
+
+The cache is keyed on the blaseball-core-game-data version (or on
+a hash of the games data, if the version cannot be found, or on the
+games data file given with $SERIES_SLEUTH_GAMES_DATA) and on
+the version of this package. It is rebuilt automatically when the
+key does not match.
+
+The cache file can also be memory-mapped read-only (mapped=True),
+in which case the arrays are memoryviews over the mapped file
+instead of copies. Every process that maps the same cache file
+shares the same pages of memory, so many worker processes can
+use one copy of the games data and its index, and a new worker
+is ready as soon as the file is mapped.
+
+Days fetched after the cache was written (see GameIndex.update_day())
+are kept in a delta file next to the cache file, instead of writing
+the whole cache again: one line of JSON per day, after a first line
+with the cache key and a random id of its own. The delta is replayed
+on top of the cache when it is loaded, and compact_cache() folds it
+back into the cache file. An index remembers which cache file (by
+inode, size and modification time) and which delta file (by id) it
+was loaded from, so that it can tell when to load everything again
+(see is_compacted()).
+
+File layout:
+- MAGIC (8 bytes)
+- header length (4 bytes, little endian)
+- header (JSON): cache key, byte order, teams, id width, and the
+  typecode, offset and length of every array
+- the raw bytes of every array, each starting at a multiple of
+  ALIGN bytes from the start of the file
+"""
+import os
+import sys
+import json
+import mmap
+import struct
+import time
+import hashlib
+import tempfile
+from array import array
+import blaseball_core_game_data as gd
+from .store import GameStore, column_typecode
+from .index import GameIndex
+from .stream import iter_games_data, get_games_data_file
+from .metrics import record_load, DATA_GAMES
+
+
+MAGIC = b'SSLEUTH\x01'
+ALIGN = 8
+CACHE_FILE = 'games_index.bin'
+DELTA_FILE = 'games_index.delta'
+
+
+def get_cache_dir():
+    """
+    Get the directory where the cache file is kept:
+    $SERIES_SLEUTH_CACHE_DIR, or series-sleuth/ in
+    $XDG_CACHE_HOME (~/.cache by default)
+    """
+    if os.environ.get('SERIES_SLEUTH_CACHE_DIR'):
+        return os.environ['SERIES_SLEUTH_CACHE_DIR']
+    cache_home = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(cache_home, 'series-sleuth')
+
+
+def get_cache_path():
+    return os.path.join(get_cache_dir(), CACHE_FILE)
+
+
+def get_delta_path():
+    return os.path.join(get_cache_dir(), DELTA_FILE)
+
+
+def get_data_version():
+    """
+    Get the version of the games data set: the installed
+    blaseball-core-game-data version if it can be found,
+    otherwise a hash of the games data itself. A games data
+    file given with $SERIES_SLEUTH_GAMES_DATA is versioned
+    by its path, size, and modification time instead.
+    """
+    path = get_games_data_file()
+    if path is not None:
+        st = os.stat(path)
+        return 'file=%s;size=%d;mtime=%d'%(os.path.abspath(path), st.st_size, st.st_mtime_ns)
+    try:
+        from importlib.metadata import version
+        return 'blaseball-core-game-data==' + version('blaseball-core-game-data')
+    except Exception:
+        pass
+    if getattr(gd, '__version__', None):
+        return 'blaseball-core-game-data==' + gd.__version__
+    data = gd.get_games_data()
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    return 'sha1=' + hashlib.sha1(data).hexdigest()
+
+
+def get_cache_key(data_version=None):
+    """Get the cache key, for the given data version (or the current one, see get_data_version())"""
+    from . import __version__
+    if data_version is None:
+        data_version = get_data_version()
+    return 'series-sleuth==%s;%s'%(__version__, data_version)
+
+
+def build_index():
+    """Index the games data set, streaming the games out of the games data JSON"""
+    return GameIndex(GameStore.from_games(iter_games_data()))
+
+
+def load_index(cache=True, mapped=False):
+    """
+    Load the indexed games data set, from the cache if it is
+    up to date, otherwise from the games data JSON (and then
+    save it to the cache for next time).
+
+    If mapped is True, the cache file is memory-mapped and shared
+    with every other process mapping it, instead of being read in.
+
+    Every load is recorded in the metrics (see metrics.record_load()).
+    """
+    start = time.perf_counter()
+    # Finding the version can mean hashing the whole games data, so only do it once
+    data_version = get_data_version()
+    index, source = _load_index(cache, mapped, data_version)
+    record_load(index, source, time.perf_counter() - start, data_version)
+    return index
+
+
+def _load_index(cache, mapped, data_version):
+    """Load the indexed games data set, and return it and where it was loaded from: cache, mapped, or json"""
+    if not cache:
+        return build_index(), 'json'
+
+    key = get_cache_key(data_version)
+    path = get_cache_path()
+    if mapped:
+        index = map_cache(path, key)
+        source = 'mapped'
+    else:
+        index = read_cache(path, key)
+        source = 'cache'
+    if index is None:
+        index = build_index()
+        source = 'json'
+        try:
+            write_cache(path, key, index)
+        except OSError:
+            # Cache directory is not writable, carry on without the cache
+            return index, source
+        if mapped:
+            # Map the file we just wrote, so this process shares it too
+            index = map_cache(path, key) or index
+    if source=='json':
+        # Wrote the cache file just now
+        try:
+            index.cache_file = file_identity(os.stat(path))
+        except OSError:
+            return index, source
+    index.cache_key = key
+    index.delta_id = None
+    index.delta_offset = read_delta(get_delta_path(), key, index)
+    return index, source
+
+
+def file_identity(st):
+    """The inode, size, and modification time of a file, from its os.stat() result"""
+    return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+
+def save_day(season0, day0, games):
+    """
+    Save the games of one day (game data json items) to the delta file,
+    to be added to the cached index (replacing any games already there
+    for that season and day) every time it is loaded
+    """
+    key = get_cache_key()
+    path = get_delta_path()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    line = json.dumps({'season': season0, 'day': day0, 'games': games}) + '\n'
+    with open(path, 'a+') as f:
+        # Start a new delta file (with a new id) if this one belongs to another cache key
+        f.seek(0)
+        first = f.readline()
+        if not first.endswith('\n') or json.loads(first).get('key')!=key:
+            f.truncate(0)
+            f.write(json.dumps({'key': key, 'id': os.urandom(8).hex()}) + '\n')
+        f.write(line)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def read_delta(path, key, index, offset=0):
+    """
+    Add every day in the delta file, starting at the given byte offset,
+    to the index. Return the offset to read from next time.
+    Lines that are not complete yet (still being written) are left for
+    next time, and a delta file for another cache key is ignored.
+
+    Reading on from an offset is only right for the delta file the index
+    was loaded with: raises ValueError if the delta file has been replaced
+    since (it has another id), or if a line cannot be parsed (the offset
+    may be in the middle of a line). Reading from the start, lines that
+    cannot be parsed are skipped.
+    """
+    try:
+        with open(path, 'rb') as f:
+            first = f.readline()
+            if not first.endswith(b'\n'):
+                return offset
+            head = json.loads(first.decode('utf-8'))
+            if head.get('key')!=key:
+                return offset
+            start = max(offset, len(first))
+            f.seek(start)
+            data = f.read()
+    except (OSError, ValueError):
+        return offset
+    if offset and head.get('id')!=index.delta_id:
+        raise ValueError("the delta file was replaced since it was read")
+    index.delta_id = head.get('id')
+
+    pos = 0
+    while True:
+        end = data.find(b'\n', pos)
+        if end < 0:
+            break
+        try:
+            day = json.loads(data[pos:end].decode('utf-8'))
+        except ValueError:
+            if offset:
+                raise ValueError("unreadable line at byte %d of the delta file"%(start + pos))
+            # Reading the whole delta file: lose the one damaged day, not every day after it
+            pos = end + 1
+            continue
+        index.update_day(day['season'], day['day'], day['games'])
+        pos = end + 1
+    return start + pos
+
+
+def is_compacted(index):
+    """
+    Check whether the cache file has been written again since the index
+    was loaded from it (by compact_cache(), folding the delta file into
+    it), in which case the index must be loaded again to pick up any later
+    days: they are saved to a new delta file, that the index never read
+    """
+    if getattr(index, 'cache_key', None) is None:
+        return False
+    try:
+        return file_identity(os.stat(get_cache_path()))!=index.cache_file
+    except OSError:
+        return True
+
+
+def refresh_index(index):
+    """
+    Add any days saved to the delta file since the index was loaded
+    with load_index(), to a copy of the index (see GameIndex.copy()),
+    so that other threads can go on reading the index meanwhile.
+    Return the updated copy, or None if no days were added.
+    Raises ValueError if the delta file cannot be read on from where
+    the index left off (see read_delta()): then the index must be
+    loaded again.
+    """
+    key = getattr(index, 'cache_key', None)
+    if key is None:
+        # Not loaded from the cache
+        return None
+    path = get_delta_path()
+    try:
+        if os.path.getsize(path) <= index.delta_offset:
+            return None
+    except OSError:
+        return None
+    updated = index.copy()
+    updated.delta_offset = read_delta(path, key, updated, index.delta_offset)
+    if updated.delta_offset==index.delta_offset:
+        return None
+    DATA_GAMES.set(len(updated.store))
+    return updated
+
+
+def share_index(index):
+    """
+    Get a cache file that holds exactly the games of the given index,
+    for other processes to map with map_index(). Return (path, key,
+    identity, snapshot): the cache file the index was loaded from, if
+    nothing was added to the index since and the file is unchanged, or
+    else a new snapshot of the index in a temporary directory (then
+    snapshot is True, and the caller removes the directory when done).
+    """
+    key = getattr(index, 'cache_key', None)
+    if key is not None and index.version==0 and not is_compacted(index):
+        return get_cache_path(), key, index.cache_file, False
+    key = 'snapshot'
+    path = os.path.join(tempfile.mkdtemp(prefix='series-sleuth-'), CACHE_FILE)
+    write_cache(path, key, index)
+    return path, key, file_identity(os.stat(path)), True
+
+
+def map_index(path, key, identity):
+    """
+    Memory-map a cache file from share_index(). Raises an exception if
+    it is not the same file any more (e.g. the cache was compacted since).
+    """
+    index = map_cache(path, key)
+    if index is None or index.cache_file!=identity:
+        raise Exception("Error: the cache file %s changed while it was shared"%(path))
+    return index
+
+
+def compact_cache():
+    """
+    Write the cache file again with every day of the delta file
+    in it, and remove the delta file
+    """
+    index = load_index(cache=True)
+    # Use the key the index was just loaded with, instead of finding the data version again
+    key = getattr(index, 'cache_key', None) or get_cache_key()
+    write_cache(get_cache_path(), key, index)
+    try:
+        os.remove(get_delta_path())
+    except FileNotFoundError:
+        pass
+    return index
+
+
+def _arrays(index):
+    """All arrays that make up an index and its store, by name"""
+    arrays = {}
+    for name in GameStore.COLUMNS:
+        arrays['store.' + name] = getattr(index.store, name)
+    arrays['store.ids'] = array('B', index.store.ids)
+    for name in GameIndex.ARRAYS:
+        arrays['index.' + name] = getattr(index, name)
+    return arrays
+
+
+def write_cache(path, key, index):
+    """
+    Write the index to the cache file. The file is written
+    next to the cache file first, then renamed over it,
+    so readers never see a partially written cache.
+    """
+    arrays = _arrays(index)
+
+    # Lay out the arrays one after the other, aligned
+    sections = {}
+    offset = 0
+    for name, arr in arrays.items():
+        offset = -(-offset//ALIGN)*ALIGN
+        sections[name] = {
+            'typecode': column_typecode(arr),
+            'offset': offset,
+            'length': len(arr),
+        }
+        offset += len(arr)*arr.itemsize
+    header = {
+        'key': key,
+        'byteorder': sys.byteorder,
+        'teams': index.store.teams,
+        'id_width': index.store.id_width,
+        'sections': sections,
+    }
+    header = json.dumps(header).encode('utf-8')
+    data_start = -(-(len(MAGIC) + 4 + len(header))//ALIGN)*ALIGN
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = '%s.%d.tmp'%(path, os.getpid())
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(MAGIC)
+            f.write(struct.pack('<I', len(header)))
+            f.write(header)
+            for name, arr in arrays.items():
+                f.seek(data_start + sections[name]['offset'])
+                # Arrays, or memoryviews of a mapped index
+                f.write(arr)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def read_header(buf, key):
+    """
+    Parse the header of a cache file in the given buffer.
+    Return (header, data_start), or (None, None) if this is not
+    a cache file or if it does not match the key.
+    """
+    if len(buf) < len(MAGIC) + 4 or bytes(buf[:len(MAGIC)])!=MAGIC:
+        return None, None
+    start = len(MAGIC)
+    (header_len,) = struct.unpack('<I', bytes(buf[start:start + 4]))
+    start += 4
+    try:
+        header = json.loads(bytes(buf[start:start + header_len]).decode('utf-8'))
+    except ValueError:
+        return None, None
+    if header.get('key')!=key or header.get('byteorder')!=sys.byteorder:
+        return None, None
+    data_start = -(-(start + header_len)//ALIGN)*ALIGN
+    return header, data_start
+
+
+def index_from_arrays(header, arrays):
+    """Put a GameIndex back together from its named arrays"""
+    columns = {name: arrays['store.' + name] for name in GameStore.COLUMNS}
+    store = GameStore(columns, header['teams'], arrays['store.ids'], header['id_width'])
+    index_arrays = {name: arrays['index.' + name] for name in GameIndex.ARRAYS}
+    return GameIndex(store, index_arrays)
+
+
+def read_cache(path, key):
+    """
+    Read the index back from the cache file.
+    Return None if there is no cache file, or if it is stale.
+    """
+    try:
+        with open(path, 'rb') as f:
+            identity = file_identity(os.fstat(f.fileno()))
+            buf = f.read()
+    except OSError:
+        return None
+
+    header, data_start = read_header(buf, key)
+    if header is None:
+        return None
+
+    arrays = {}
+    for name, section in header['sections'].items():
+        arr = array(section['typecode'])
+        start = data_start + section['offset']
+        arr.frombytes(buf[start:start + section['length']*arr.itemsize])
+        if len(arr)!=section['length']:
+            # Truncated file
+            return None
+        arrays[name] = arr
+    arrays['store.ids'] = arrays['store.ids'].tobytes()
+    index = index_from_arrays(header, arrays)
+    index.cache_file = identity
+    return index
+
+
+def map_cache(path, key):
+    """
+    Memory-map the cache file read-only and wrap its arrays
+    in memoryviews, without copying them.
+    Return None if there is no cache file, or if it is stale.
+    """
+    try:
+        with open(path, 'rb') as f:
+            identity = file_identity(os.fstat(f.fileno()))
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        # ValueError: the file is empty
+        return None
+
+    buf = memoryview(mm)
+    header, data_start = read_header(buf, key)
+    if header is None:
+        buf.release()
+        mm.close()
+        return None
+
+    arrays = {}
+    for name, section in header['sections'].items():
+        itemsize = array(section['typecode']).itemsize
+        start = data_start + section['offset']
+        end = start + section['length']*itemsize
+        if end > len(buf):
+            # Truncated file: let go of the views and the mapping
+            for view in arrays.values():
+                view.release()
+            buf.release()
+            mm.close()
+            return None
+        arrays[name] = buf[start:end].cast(section['typecode'])
+    index = index_from_arrays(header, arrays)
+    index.cache_file = identity
+    return index
@@ -1,10 +1,19 @@
 import sys
 import os
 import json
+import copy
+import cProfile
 import configargparse
-from .view import TextView, JsonView
+from .view import TextView, JsonView, NdjsonView, SeriesTextView, SeriesJsonView, BackfillView
+from .sleuth import Sleuth, load_index, check_fields
+from .server import SleuthServer
+from .backend import BACKENDS, get_backend, set_backend
+from .timings import Timings
+from .metrics import REGISTRY
 from .util import (
     get_team_data,
+    read_game_ids,
+    NoMatchingGames,
     CaptureStdout
 )
 
@@ -33,7 +42,11 @@ def main(sysargs = sys.argv[1:]):
     p.add('-g',
           '--game-id',
           required=False,
+          action='append',
           help='Specify the game ID of the game to summarize (repeat flag to specify multiple game IDs)')
+    p.add('--game-ids-file',
+          required=False,
+          help='Read game IDs to summarize from this file, one per line (use - to read from stdin)')
 
     # Option 2: specify game by day, season, and team
     p.add('--team',
@@ -48,6 +61,77 @@ def main(sysargs = sys.argv[1:]):
           required=False,
           help='Specify day (this flag cannot be repeated for multiple days)')
 
+    # Option 3: report on every series in a season (or every season)
+    p.add('--all-series',
+          required=False,
+          default=False,
+          action='store_true',
+          help='Summarize every game of every series in the season given by --season (or in every season if --season is not given)')
+
+    # Option 4: summarize every game, for rebuilding an archive
+    p.add('--backfill',
+          required=False,
+          default=False,
+          action='store_true',
+          help='Summarize every game in the season given by --season (or in every season), one JSON object per line, in season and day order')
+    p.add('--parallel',
+          required=False,
+          default=1,
+          type=int,
+          help='Number of worker processes for --backfill, each summarizing one season at a time (default 1)')
+
+    # Option 5: keep the data loaded and answer queries over HTTP
+    p.add('--serve',
+          required=False,
+          default=False,
+          action='store_true',
+          help='Run a query server that keeps the games data loaded and answers GET /series?game_id=... (or ?team=...&season=...&day=...) with JSON')
+    p.add('--host',
+          required=False,
+          default='127.0.0.1',
+          help='Host for --serve to listen on (default 127.0.0.1)')
+    p.add('--port',
+          required=False,
+          default=8080,
+          type=int,
+          help='Port for --serve to listen on (default 8080)')
+    p.add('--socket',
+          required=False,
+          help='Unix socket for --serve to listen on, instead of a TCP port')
+
+    p.add('--no-cache',
+          required=False,
+          default=False,
+          action='store_true',
+          help='Do not read or write the on-disk cache of the games data (always parse the games data JSON)')
+
+    p.add('--mmap',
+          required=False,
+          default=False,
+          action='store_true',
+          help='Memory-map the on-disk cache of the games data instead of reading it in (shares one copy of the data between processes)')
+
+    p.add('--backend',
+          required=False,
+          choices=BACKENDS,
+          help='Build the season tables of records and runs with plain Python or with NumPy (default python, or $SERIES_SLEUTH_BACKEND)')
+
+    p.add('--fields',
+          required=False,
+          help='Only compute and print these fields of the game summary, separated by commas (e.g. seriesScore,odds)')
+
+    p.add('--timings',
+          required=False,
+          nargs='?',
+          const='-',
+          help='Time each phase of the run and each metric, and write the timings as JSON to this file (or to stderr, if no file is given)')
+    p.add('--profile',
+          required=False,
+          help='Run under cProfile and save the profile to this file (read it with pstats)')
+    p.add('--metrics-file',
+          required=False,
+          help='At the end of the run, write the metrics (summary latencies, data set load, memo hits) to this file in the Prometheus text format')
+
     # format
     g = p.add_mutually_exclusive_group()
     g.add('--text',
@@ -80,17 +164,118 @@ def main(sysargs = sys.argv[1:]):
     if (not options.json) and (not options.text):
         options.json = True
 
+    # Build the season tables with the backend that was asked for
+    try:
+        set_backend(options.backend or get_backend())
+    except ValueError as e:
+        raise Exception("Error: %s"%(e))
+
+    # Only compute the fields that were asked for
+    if options.fields:
+        options.fields = options.fields.split(',')
+        try:
+            check_fields(options.fields)
+        except ValueError as e:
+            raise Exception("Error: %s"%(e))
+
+    # Time each phase and profile the run, if asked to
+    timings = Timings() if options.timings else None
+    profiler = cProfile.Profile() if options.profile else None
+    try:
+        if timings is not None:
+            timings.start()
+        if profiler is not None:
+            profiler.enable()
+        run(options)
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(options.profile)
+        if timings is not None:
+            timings.stop()
+            timings.write(options.timings)
+        if options.metrics_file:
+            REGISTRY.write(options.metrics_file)
+
+
+def run(options):
+    """Run the command with the parsed options"""
+
+    # All-series report: summarize every game of every series
+    if options.all_series:
+        index = load_index(cache=not options.no_cache, mapped=options.mmap)
+        if options.text:
+            v = SeriesTextView(options, index=index)
+        else:
+            v = SeriesJsonView(options, index=index)
+        v.show()
+        return
+
+    # Backfill: summarize every game, one season per worker
+    if options.backfill:
+        index = load_index(cache=not options.no_cache, mapped=options.mmap)
+        v = BackfillView(options, index=index)
+        v.show()
+        return
+
+    # Query server: load the data once and answer queries until interrupted
+    if options.serve:
+        index = load_index(cache=not options.no_cache, mapped=options.mmap)
+        server = SleuthServer(index)
+        if options.socket:
+            print("Serving on unix socket %s"%(options.socket), file=sys.stderr)
+        else:
+            print("Serving on http://%s:%d"%(options.host, options.port), file=sys.stderr)
+        server.run(options.host, options.port, options.socket)
+        return
+
+    # Collect game ids from flags and from the game ids file
+    game_ids = options.game_id or []
+    if options.game_ids_file:
+        game_ids = game_ids + read_game_ids(options.game_ids_file)
+
     # User must specify team AND season AND day, OR game id
     tsd = options.team and options.season and options.day
-    gid = options.game_id
+    gid = len(game_ids)>0
     if not tsd and not gid:
-        raise Exception("Error: you must specify either --game-id or all three of --team/--season/--day")
+        raise Exception("Error: you must specify either --game-id, --game-ids-file, or all three of --team/--season/--day")
+
+    # Batch mode: load the data once and summarize every game
+    if len(game_ids)>1 or options.game_ids_file:
+        batch(options, game_ids)
+        return
 
+    options.game_id = game_ids[0] if gid else None
+    index = load_index(cache=not options.no_cache, mapped=options.mmap)
     if options.text:
-        v = TextView(options)
+        v = TextView(options, index=index)
         v.show()
     elif options.json:
-        v = JsonView(options)
+        v = JsonView(options, index=index)
+        v.show()
+
+
+def batch(options, game_ids):
+    """
+    Summarize many games with a single data load, and a single Sleuth,
+    so that games of the same series or season share memoized metrics.
+    JSON output is one JSON object per line (NDJSON).
+    Games that cannot be found are reported on stderr and skipped.
+    """
+    index = load_index(cache=not options.no_cache, mapped=options.mmap)
+    sleuth = Sleuth(index)
+    if options.text:
+        View = TextView
+    else:
+        View = NdjsonView
+    for game_id in game_ids:
+        game_options = copy.copy(options)
+        game_options.game_id = game_id
+        try:
+            v = View(game_options, sleuth=sleuth)
+        except NoMatchingGames:
+            print("Error: no game found with game ID %s"%(game_id), file=sys.stderr)
+            continue
         v.show()
 
 
@@ -0,0 +1,428 @@
+import copy
+import threading
+from array import array
+from .standings import StandingsTable, HeadToHeadTable
+from .bracket import PlayoffBracket
+from .store import copy_column
+
+
+class GameIndex(object):
+    """
+    Index over a columnar GameStore, built once at load time.
+
+    The index is a handful of flat arrays over the store's rows:
+    - id_order: rows sorted by game id (binary search by game id)
+    - day_offsets: first row of each (season, day); the games of
+      one season and day are a contiguous range of rows, since
+      the store is sorted by season and day
+    - team_offsets and team_rows: rows of each team's games
+      in each season, in day order
+    - last_day0s: last day with games in each season
+
+    Lookups that return games return game data json items
+    (see GameStore.record()), and the *_rows() lookups return
+    rows for code that reads the store's columns directly.
+
+    It also holds the per-season cumulative tables,
+    which are built the first time they are needed. Building
+    them is guarded by a lock, so one index can be shared by
+    many threads; everything else in the index is read-only.
+    Once the index is frozen (see freeze()), every table has
+    been built and nothing in the index changes any more.
+
+    Until then, the games of a day can be added or replaced with
+    update_day(), which updates the index and the tables in place
+    (this must not happen while other threads are reading it: update
+    a copy() instead, and swap it in once it is up to date).
+
+    Seasons and days are zero-indexed, like in the data set.
+    Games on the same day keep the order of the data set, and
+    when more than one game matches a lookup that returns a
+    single game, the first one in the data set wins.
+    """
+    ARRAYS = ['id_order', 'day_offsets', 'team_offsets', 'team_rows', 'last_day0s']
+
+    def __init__(self, store, arrays=None):
+        """
+        Index the given store, or wrap index arrays that were
+        already built for it (e.g. loaded from the cache)
+        """
+        self.store = store
+        if arrays is None:
+            arrays = self.build_arrays(store)
+        for name in self.ARRAYS:
+            setattr(self, name, arrays[name])
+        self.nseasons = len(self.last_day0s)
+        self.day_stride = (len(self.day_offsets) - 1)//max(self.nseasons, 1)
+
+        self._standings = {}
+        self._head_to_head = {}
+        self._brackets = {}
+        self._tables_lock = threading.Lock()
+        self.frozen = False
+        # Goes up by one every time the games in the index change
+        self.version = 0
+
+    @classmethod
+    def build_arrays(cls, store):
+        """Build the index arrays for the given store"""
+        n = len(store)
+        nteams = len(store.teams)
+        nseasons = max(store.season, default=-1) + 1
+        day_stride = max(store.day, default=-1) + 2
+
+        # Rows sorted by game id
+        id_order = array('l', sorted(range(n), key=store.game_id_bytes))
+
+        # First row of each season and day (plus one past the end)
+        day_offsets = array('l', [0])*(nseasons*day_stride + 1)
+        for row in range(n):
+            day_offsets[store.season[row]*day_stride + store.day[row] + 1] += 1
+        for slot in range(1, len(day_offsets)):
+            day_offsets[slot] += day_offsets[slot-1]
+
+        # Rows of each team's games in each season, in day order
+        team_offsets = array('l', [0])*(nseasons*nteams + 1)
+        for row in range(n):
+            base = store.season[row]*nteams + 1
+            team_offsets[base + store.home_team[row]] += 1
+            team_offsets[base + store.away_team[row]] += 1
+        for slot in range(1, len(team_offsets)):
+            team_offsets[slot] += team_offsets[slot-1]
+        team_rows = array('l', [0])*(2*n)
+        fill = array('l', team_offsets)
+        for row in range(n):
+            base = store.season[row]*nteams
+            for team in (store.home_team[row], store.away_team[row]):
+                team_rows[fill[base + team]] = row
+                fill[base + team] += 1
+
+        # Last day with games in each season
+        last_day0s = array('l', [0])*nseasons
+        for row in range(n):
+            season0 = store.season[row]
+            if store.day[row] > last_day0s[season0]:
+                last_day0s[season0] = store.day[row]
+
+        return {
+            'id_order': id_order,
+            'day_offsets': day_offsets,
+            'team_offsets': team_offsets,
+            'team_rows': team_rows,
+            'last_day0s': last_day0s,
+        }
+
+    # -------------------
+    # Row lookups
+
+    def get_row(self, game_id):
+        """Return the row of the game with the given id, or None"""
+        key = game_id.encode('utf-8')
+        if len(key) > self.store.id_width:
+            return None
+        key = key.ljust(self.store.id_width, b'\0')
+        i = self.id_position(key)
+        if i < len(self.id_order) and self.store.game_id_bytes(self.id_order[i])==key:
+            return self.id_order[i]
+        return None
+
+    def id_position(self, key):
+        """Return the position in id_order of the first game id not less than key (padded bytes)"""
+        lo = 0
+        hi = len(self.id_order)
+        while lo < hi:
+            mid = (lo + hi)//2
+            if self.store.game_id_bytes(self.id_order[mid]) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def season_rows(self, season0):
+        """Return the range of rows of all games in the given season"""
+        if not 0 <= season0 < self.nseasons:
+            return range(0)
+        base = season0*self.day_stride
+        return range(self.day_offsets[base], self.day_offsets[base + self.day_stride])
+
+    def day_rows(self, season0, day0):
+        """Return the range of rows of all games on the given season and day"""
+        if not (0 <= season0 < self.nseasons and 0 <= day0 < self.day_stride - 1):
+            return range(0)
+        slot = season0*self.day_stride + day0
+        return range(self.day_offsets[slot], self.day_offsets[slot + 1])
+
+    def team_code(self, team):
+        return self.store.team_codes.get(team)
+
+    def team_rows_of(self, season0, team):
+        """Return the rows of all games played by the given team in the given season"""
+        code = self.team_code(team)
+        if code is None or not 0 <= season0 < self.nseasons:
+            return []
+        slot = season0*len(self.store.teams) + code
+        return self.team_rows[self.team_offsets[slot]:self.team_offsets[slot + 1]]
+
+    def team_game_row(self, season0, day0, team):
+        """Return the row of the game played by the given team on the given season and day, or None"""
+        code = self.team_code(team)
+        if code is None:
+            return None
+        for row in self.day_rows(season0, day0):
+            if self.store.home_team[row]==code or self.store.away_team[row]==code:
+                return row
+        return None
+
+    # -------------------
+    # Game lookups
+
+    def get(self, game_id):
+        """Return the game with the given id, or None"""
+        row = self.get_row(game_id)
+        if row is None:
+            return None
+        return self.store.record(row)
+
+    def seasons(self):
+        """Return all seasons with games in them"""
+        return [s for s in range(self.nseasons) if len(self.season_rows(s)) > 0]
+
+    def season_games(self, season0):
+        """Return all games in the given season"""
+        return [self.store.record(row) for row in self.season_rows(season0)]
+
+    def day_games(self, season0, day0):
+        """Return all games on the given season and day"""
+        return [self.store.record(row) for row in self.day_rows(season0, day0)]
+
+    def team_games(self, season0, team):
+        """Return all games played by the given team in the given season"""
+        return [self.store.record(row) for row in self.team_rows_of(season0, team)]
+
+    def team_game(self, season0, day0, team):
+        """Return the game played by the given team on the given season and day, or None"""
+        row = self.team_game_row(season0, day0, team)
+        if row is None:
+            return None
+        return self.store.record(row)
+
+    def pair_games(self, season0, team, versus_team):
+        """Return all games played between the two given teams in the given season"""
+        code = self.team_code(versus_team)
+        return [
+            self.store.record(row)
+            for row in self.team_rows_of(season0, team)
+            if self.store.home_team[row]==code or self.store.away_team[row]==code
+        ]
+
+    def last_day0(self, season0):
+        """Return the last day (zero-indexed) with games in the given season"""
+        if not 0 <= season0 < self.nseasons:
+            return 0
+        return self.last_day0s[season0]
+
+    # -------------------
+    # Cumulative tables
+
+    def standings(self, season0):
+        """Return the cumulative StandingsTable for the given season"""
+        return self._table(self._standings, StandingsTable, season0)
+
+    def head_to_head(self, season0):
+        """Return the cumulative HeadToHeadTable for the given season"""
+        return self._table(self._head_to_head, HeadToHeadTable, season0)
+
+    def bracket(self, season0):
+        """Return the PlayoffBracket of the given season"""
+        return self._table(self._brackets, PlayoffBracket, season0)
+
+    def _table(self, tables, table_class, season0):
+        """Return the season's table from tables, building it the first time"""
+        table = tables.get(season0)
+        if table is None and self.frozen:
+            # Only seasons without games have no table, and their
+            # tables are empty, so build one without storing it
+            return table_class(self.store, range(0), 0)
+        if table is None:
+            with self._tables_lock:
+                # Another thread may have built it while we waited
+                table = tables.get(season0)
+                if table is None:
+                    table = table_class(self.store, self.season_rows(season0), self.last_day0(season0))
+                    tables[season0] = table
+        return table
+
+    def warm(self):
+        """Build the cumulative tables and brackets of every season now, instead of the first time they are needed"""
+        for season0 in self.seasons():
+            self.standings(season0)
+            self.head_to_head(season0)
+            self.bracket(season0)
+
+    def freeze(self):
+        """
+        Build every table and stop building them lazily: after this,
+        lookups only read from the index, without taking any lock
+        """
+        self.warm()
+        self.frozen = True
+
+    def unfreeze(self):
+        """
+        Let the index build tables lazily, and be updated, again
+        (once no other thread is reading it any more)
+        """
+        self.frozen = False
+
+    # -------------------
+    # Incremental updates
+
+    def copy(self):
+        """
+        Return a copy of the index (unfrozen), which update_day() can
+        change while other threads go on reading this one. The store is
+        shared: update_day() replaces it with a new one instead of changing it.
+        """
+        index = copy.copy(self)
+        for name in self.ARRAYS:
+            arr = getattr(self, name)
+            setattr(index, name, copy_column(arr, 0, len(arr)))
+        with self._tables_lock:
+            index._standings = {season0: table.copy() for season0, table in self._standings.items()}
+            index._head_to_head = {season0: table.copy() for season0, table in self._head_to_head.items()}
+            index._brackets = dict(self._brackets)
+        index._tables_lock = threading.Lock()
+        index.frozen = False
+        return index
+
+    def update_day(self, season0, day0, games):
+        """
+        Add the games of one day (game data json items, all with the
+        given season and day) to the index, replacing the games that
+        were already in the index for that season and day, if any.
+
+        Only what depends on that day is updated: the rows after it
+        are shifted, the season's team rows are rebuilt, and the
+        season's cumulative tables are counted again from that day on.
+        (The whole index is rebuilt instead if the day adds a new
+        season, a new team, or a day later than any day so far.)
+        """
+        if self.frozen:
+            raise Exception("Error: cannot update a frozen index")
+        for j in games:
+            if j['season']!=season0 or j['day']!=day0:
+                raise Exception("Error: game %s is not on season %d, day %d"%(j['id'], season0 + 1, day0 + 1))
+
+        self.version += 1
+        old_store = self.store
+        old_rows = self.day_position(season0, day0)
+        store = old_store.replace_rows(old_rows, games)
+        delta = len(games) - len(old_rows)
+        new_rows = range(old_rows.start, old_rows.start + len(games))
+
+        in_range = season0 < self.nseasons and day0 < self.day_stride - 1
+        if not in_range or len(store.teams)!=len(old_store.teams):
+            # The shape of the index changes, so build it again
+            self.store = store
+            arrays = self.build_arrays(store)
+            for name in self.ARRAYS:
+                setattr(self, name, arrays[name])
+            self.nseasons = len(self.last_day0s)
+            self.day_stride = (len(self.day_offsets) - 1)//max(self.nseasons, 1)
+            self._update_tables(season0, day0, old_store)
+            return
+
+        # Copy any memory-mapped arrays before changing them
+        for name in self.ARRAYS:
+            setattr(self, name, copy_column(getattr(self, name), 0, len(getattr(self, name))))
+
+        # Rows sorted by game id: drop the old day, shift later rows, insert the new day
+        id_order = array('l', [
+            row if row < old_rows.start else row + delta
+            for row in self.id_order
+            if row not in old_rows
+        ])
+        self.store = store
+        self.id_order = id_order
+        for row in new_rows:
+            self.id_order.insert(self.id_position(store.game_id_bytes(row)), row)
+
+        # First row of each later season and day moves by delta
+        for slot in range(season0*self.day_stride + day0 + 1, len(self.day_offsets)):
+            self.day_offsets[slot] += delta
+
+        # Rebuild this season's team rows, and shift later seasons' rows
+        nteams = len(store.teams)
+        first = season0*nteams
+        lo = self.team_offsets[first]
+        hi = self.team_offsets[first + nteams]
+        season_rows = self.season_rows(season0)
+        counts = array('l', [0])*nteams
+        for row in season_rows:
+            counts[store.home_team[row]] += 1
+            counts[store.away_team[row]] += 1
+        fill = array('l', [0])*nteams
+        for team in range(nteams):
+            self.team_offsets[first + team] = lo + sum(counts[:team])
+            fill[team] = self.team_offsets[first + team] - lo
+        season_team_rows = array('l', [0])*(2*len(season_rows))
+        for row in season_rows:
+            for team in (store.home_team[row], store.away_team[row]):
+                season_team_rows[fill[team]] = row
+                fill[team] += 1
+        later_team_rows = array('l', [row + delta for row in self.team_rows[hi:]])
+        self.team_rows = self.team_rows[:lo] + season_team_rows + later_team_rows
+        for slot in range(first + nteams, len(self.team_offsets)):
+            self.team_offsets[slot] += 2*delta
+
+        # Last day with games in this season
+        last_day0 = 0
+        for d in range(self.day_stride - 1):
+            if len(self.day_rows(season0, d)) > 0:
+                last_day0 = d
+        self.last_day0s[season0] = last_day0
+
+        self._update_tables(season0, day0, old_store)
+
+    def day_position(self, season0, day0):
+        """
+        Return the range of rows of all games on the given season and day,
+        which is where the games of that day go if there are none yet
+        """
+        store = self.store
+
+        def first_row(after):
+            lo = 0
+            hi = len(store)
+            while lo < hi:
+                mid = (lo + hi)//2
+                key = (store.season[mid], store.day[mid])
+                if key < (season0, day0) or (after and key==(season0, day0)):
+                    lo = mid + 1
+                else:
+                    hi = mid
+            return lo
+
+        return range(first_row(False), first_row(True))
+
+    def _update_tables(self, season0, day0, old_store):
+        """Bring the cumulative tables up to date after update_day()"""
+        # Brackets hold rows, which may have moved, and are quick to build again
+        self._brackets = {}
+        if self.store.fractional_runs!=old_store.fractional_runs:
+            # Runs need a different type of array, start over
+            self._standings = {}
+            self._head_to_head = {}
+            return
+        for tables in (self._standings, self._head_to_head):
+            for table in tables.values():
+                table.store = self.store
+            table = tables.get(season0)
+            if table is None:
+                continue
+            # Where the day's games are, or would be if it has none (day_rows()
+            # is an empty range at row 0 for a day past the end of the index)
+            start = self.day_position(season0, day0).start
+            rows = range(start, self.season_rows(season0).stop)
+            if not table.update(self.store, rows, day0, self.last_day0(season0)):
+                del tables[season0]
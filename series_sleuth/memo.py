@@ -0,0 +1,113 @@
+from functools import lru_cache
+from .metrics import MEMO_LOOKUPS, MEMO_MISSES
+from .util import SERIES_LENGTH
+
+
+DEFAULT_MEMO_SIZE = 4096
+
+
+def series_start(team, season, day):
+    """Arguments of series_scores() for the first day of the series (days are one-indexed)"""
+    return team, season, ((day - 1)//SERIES_LENGTH)*SERIES_LENGTH + 1
+
+
+class MetricMemo(object):
+    """
+    Bounded memo of the metric methods of a Sleuth, shared by
+    every game it summarizes.
+
+    Each metric method (see METRICS) is wrapped in its own LRU
+    cache of up to maxsize results, keyed on the arguments of the
+    call: (team, [versus_team,] season, day). Games in the same
+    series or season ask for many of the same results (e.g. the
+    final season records), so only the first of them computes them.
+    series_scores() gives the same result for every day of a series,
+    so it is keyed on the first day of the series instead (see KEYS).
+
+    Results are forgotten whenever the data set changes (when
+    GameIndex.version changes, see GameIndex.update_day()).
+    Records are returned as new lists, so changing a summary never
+    changes the memo; series scores are shared and must not be changed.
+
+    hits and misses count calls answered from the memo and calls
+    that had to compute their result, over all metrics. Every
+    lookup and miss of every memo is also counted in the metrics
+    registry (see metrics.MEMO_LOOKUPS and metrics.MEMO_MISSES).
+    """
+    METRICS = [
+        'season_record',
+        'playoffs_record',
+        'opponent_season_record',
+        'opponent_playoffs_record',
+        'opponent_season_runs',
+        'opponent_playoffs_runs',
+        'home_wl_record',
+        'away_wl_record',
+        'series_scores',
+        'series_scores_playoffs',
+    ]
+
+    # Metrics memoized on something other than their own arguments,
+    # and the function that turns their arguments into the memo key
+    KEYS = {
+        'series_scores': series_start,
+    }
+
+    def __init__(self, sleuth, maxsize=DEFAULT_MEMO_SIZE):
+        self.sleuth = sleuth
+        self.maxsize = maxsize
+        self.version = sleuth.index.version
+        self.caches = {}
+        for name in self.METRICS:
+            cached = lru_cache(maxsize=maxsize)(self.count_misses(getattr(sleuth, name)))
+            self.caches[name] = cached
+            setattr(sleuth, name, self.wrap(cached, self.KEYS.get(name)))
+
+    def count_misses(self, method):
+        """Wrap a metric method to count the calls that reach it, the ones the memo missed"""
+        def miss(*args):
+            MEMO_MISSES.inc()
+            return method(*args)
+        miss.__doc__ = method.__doc__
+        return miss
+
+    def wrap(self, cached, key=None):
+        """
+        Wrap a cached metric method to check the data version and copy records
+        (and to turn the arguments into the memo key first, if key is given)
+        """
+        def metric(*args):
+            if self.sleuth.index.version!=self.version:
+                self.clear()
+            MEMO_LOOKUPS.inc()
+            if key is not None:
+                args = key(*args)
+            value = cached(*args)
+            if isinstance(value, list):
+                return list(value)
+            return value
+        metric.__doc__ = cached.__doc__
+        return metric
+
+    def clear(self):
+        """Forget every memoized result (the hit and miss counts start over too)"""
+        for cached in self.caches.values():
+            cached.cache_clear()
+        self.version = self.sleuth.index.version
+
+    @property
+    def hits(self):
+        return sum(cached.cache_info().hits for cached in self.caches.values())
+
+    @property
+    def misses(self):
+        return sum(cached.cache_info().misses for cached in self.caches.values())
+
+    def stats(self):
+        """Return the hit and miss counts and the size of the memo"""
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'size': sum(cached.cache_info().currsize for cached in self.caches.values()),
+            'maxsize': self.maxsize*len(self.caches),
+        }
@@ -0,0 +1,274 @@
+import copy
+import math
+import threading
+from bisect import bisect_left
+from . import __version__
+
+
+class Metric(object):
+    """
+    Base class for a metric with (optional) labels: one value
+    for each combination of label values it has been given.
+    Every change is made under a lock, so metrics can be
+    changed from any number of threads.
+    """
+    TYPE = None
+
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.lock = threading.Lock()
+        self.values = {}
+
+    def key(self, labels):
+        """Return the label values of the given labels dict, in order"""
+        if set(labels)!=set(self.labels):
+            raise ValueError("%s needs labels %s, got %s"%(self.name, ", ".join(self.labels), ", ".join(labels)))
+        return tuple(str(labels[name]) for name in self.labels)
+
+    def clear(self):
+        """Forget every value"""
+        with self.lock:
+            self.values = {}
+
+    def collect(self):
+        """Return a copy of every value, to add to another process's metric with merge()"""
+        with self.lock:
+            return copy.deepcopy(self.values)
+
+    def merge(self, values):
+        """Add values from collect() to this metric"""
+        raise NotImplementedError()
+
+    def samples(self):
+        """Return (name suffix, label pairs, value) of every sample to export"""
+        with self.lock:
+            return [('', list(zip(self.labels, key)), value) for key, value in sorted(self.values.items())]
+
+    def export(self):
+        """Return the metric in the Prometheus text exposition format"""
+        lines = [
+            '# HELP %s %s'%(self.name, escape(self.help, quote=False)),
+            '# TYPE %s %s'%(self.name, self.TYPE),
+        ]
+        for suffix, labels, value in self.samples():
+            if labels:
+                labels = '{%s}'%(','.join('%s="%s"'%(name, escape(value)) for name, value in labels))
+            else:
+                labels = ''
+            lines.append('%s%s%s %s'%(self.name, suffix, labels, format_value(value)))
+        return '\n'.join(lines) + '\n'
+
+
+class Counter(Metric):
+    """A count that only goes up (e.g. requests answered)"""
+    TYPE = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self.key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def merge(self, values):
+        with self.lock:
+            for key, value in values.items():
+                self.values[key] = self.values.get(key, 0) + value
+
+
+class Gauge(Metric):
+    """A value that can go up and down (e.g. games in the data set)"""
+    TYPE = 'gauge'
+
+    def set(self, value, **labels):
+        key = self.key(labels)
+        with self.lock:
+            self.values[key] = value
+
+    def merge(self, values):
+        with self.lock:
+            self.values.update(values)
+
+
+class Histogram(Metric):
+    """
+    Distribution of observed values (e.g. latencies in seconds):
+    the number of observations up to each bucket's upper bound,
+    and the count and sum of every observation
+    """
+    TYPE = 'histogram'
+
+    # Latency buckets, from 100 microseconds up to 10 seconds
+    BUCKETS = [0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10]
+
+    def __init__(self, name, help, labels=(), buckets=None):
+        super().__init__(name, help, labels)
+        self.buckets = sorted(buckets or self.BUCKETS)
+
+    def observe(self, value, **labels):
+        key = self.key(labels)
+        # Count in the first bucket the value fits in; export adds them up
+        i = bisect_left(self.buckets, value)
+        with self.lock:
+            counts = self.values.get(key)
+            if counts is None:
+                counts = self.values[key] = [[0]*(len(self.buckets) + 1), 0.0]
+            counts[0][i] += 1
+            counts[1] += value
+
+    def merge(self, values):
+        with self.lock:
+            for key, (other_counts, other_total) in values.items():
+                counts = self.values.get(key)
+                if counts is None:
+                    counts = self.values[key] = [[0]*(len(self.buckets) + 1), 0.0]
+                for i, count in enumerate(other_counts):
+                    counts[0][i] += count
+                counts[1] += other_total
+
+    def samples(self):
+        samples = []
+        with self.lock:
+            for key, (counts, total) in sorted(self.values.items()):
+                labels = list(zip(self.labels, key))
+                cumulative = 0
+                for bound, count in zip(self.buckets + [math.inf], counts):
+                    cumulative += count
+                    samples.append(('_bucket', labels + [('le', format_value(float(bound)))], cumulative))
+                samples.append(('_sum', labels, total))
+                samples.append(('_count', labels, cumulative))
+        return samples
+
+
+class MetricsRegistry(object):
+    """
+    Registry of every metric of the sleuth, for monitoring the query
+    server (at /metrics) and batch jobs (written to a file at the end
+    of the run, see --metrics-file), in the Prometheus text format.
+    """
+    def __init__(self):
+        self.metrics = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def counter(self, name, help, labels=()):
+        return self.register(Counter(name, help, labels))
+
+    def gauge(self, name, help, labels=()):
+        return self.register(Gauge(name, help, labels))
+
+    def histogram(self, name, help, labels=(), buckets=None):
+        return self.register(Histogram(name, help, labels, buckets))
+
+    def clear(self):
+        """Forget every value of every metric (except the build info)"""
+        for metric in self.metrics:
+            if metric is not BUILD_INFO:
+                metric.clear()
+
+    def collect(self):
+        """
+        Return the values of every metric, by name, e.g. for a worker
+        process to send back to the parent process, which adds them
+        to its own with merge()
+        """
+        return {metric.name: metric.collect() for metric in self.metrics}
+
+    def merge(self, collected):
+        """Add the values of every metric from collect() to these"""
+        for metric in self.metrics:
+            if metric.name in collected:
+                metric.merge(collected[metric.name])
+
+    def export(self):
+        """Return every metric in the Prometheus text exposition format"""
+        return ''.join(metric.export() for metric in self.metrics)
+
+    def write(self, path):
+        """Write every metric to a file, e.g. for the node exporter's textfile collector"""
+        with open(path, 'w') as f:
+            f.write(self.export())
+
+
+def escape(value, quote=True):
+    """Escape a label value (or help text, without quotes) for the text format"""
+    value = str(value).replace('\\', '\\\\').replace('\n', '\\n')
+    if quote:
+        value = value.replace('"', '\\"')
+    return value
+
+
+def format_value(value):
+    if isinstance(value, float):
+        if math.isinf(value):
+            return '+Inf' if value > 0 else '-Inf'
+        if value.is_integer():
+            return '%.1f'%(value)
+        return repr(value)
+    return str(value)
+
+
+REGISTRY = MetricsRegistry()
+
+BUILD_INFO = REGISTRY.gauge(
+    'series_sleuth_build_info',
+    'Version of series-sleuth',
+    ['version']
+)
+BUILD_INFO.set(1, version=__version__)
+
+DATA_INFO = REGISTRY.gauge(
+    'series_sleuth_data_info',
+    'Version of the loaded games data set',
+    ['version']
+)
+DATA_GAMES = REGISTRY.gauge(
+    'series_sleuth_data_games',
+    'Number of games in the loaded games data set'
+)
+DATA_LOAD_SECONDS = REGISTRY.gauge(
+    'series_sleuth_data_load_seconds',
+    'Time the last load of the games data set took'
+)
+DATA_LOADS = REGISTRY.counter(
+    'series_sleuth_data_loads_total',
+    'Loads of the games data set, by where it was loaded from (cache or mapped for a data cache hit, json otherwise)',
+    ['source']
+)
+
+MEMO_LOOKUPS = REGISTRY.counter(
+    'series_sleuth_memo_lookups_total',
+    'Metric results asked of the memo'
+)
+MEMO_MISSES = REGISTRY.counter(
+    'series_sleuth_memo_misses_total',
+    'Metric results the memo did not have, and computed'
+)
+
+SUMMARIZE_SECONDS = REGISTRY.histogram(
+    'series_sleuth_summarize_seconds',
+    'Time to summarize one game, by how the game was asked for (game_id, team_season_day, or backfill)',
+    ['query']
+)
+
+HTTP_REQUESTS = REGISTRY.counter(
+    'series_sleuth_http_requests_total',
+    'Requests answered by the query server, by query (game_id, team_season_day, metrics, or other) and status',
+    ['query', 'status']
+)
+HTTP_REQUEST_SECONDS = REGISTRY.histogram(
+    'series_sleuth_http_request_seconds',
+    'Time to answer a request to the query server, by query (game_id, team_season_day, metrics, or other)',
+    ['query']
+)
+
+
+def record_load(index, source, seconds, version):
+    """Record a load of the games data set: where from, how long it took, and what version"""
+    DATA_LOADS.inc(source=source)
+    DATA_LOAD_SECONDS.set(seconds)
+    DATA_GAMES.set(len(index.store))
+    DATA_INFO.clear()
+    DATA_INFO.set(1, version=version)
@@ -0,0 +1,118 @@
+from .sleuth import Sleuth
+from .util import SEASON_MAX, SERIES_LENGTH
+
+
+class SeriesReport(object):
+    """
+    Enumerate every series in a season (or in every season)
+    and summarize every game in each series in one sweep.
+
+    Regular-season series are the SERIES_LENGTH-game blocks of days
+    used by Sleuth.series_scores(). A playoffs series is
+    every postseason game played between the same two teams.
+    The series scores are reconstructed once per series and
+    reused for the summary of each of its games.
+
+    Each series is a dict (season/days are 1-indexed):
+
+    {
+        season: 5,
+        playoffs: True,
+        playoffsRound: 1,
+        teams: [Millennials, Shoe Thieves],
+        days: [100, 101, 102, 103],
+        gameIds: [...],
+        games: [...]
+    }
+
+    where games holds the Sleuth.summarize() dict
+    of each game, in the same order as gameIds.
+    """
+    def __init__(self, index=None):
+        self.sleuth = Sleuth(index)
+        self.index = self.sleuth.index
+
+    def seasons(self):
+        """Return all seasons (zero-indexed) in the data set"""
+        return self.index.seasons()
+
+    def series(self, season0=None):
+        """
+        Generate every series in the given season (zero-indexed),
+        or in every season if no season is given
+        """
+        if season0 is None:
+            seasons = self.seasons()
+        else:
+            seasons = [season0]
+        for s0 in seasons:
+            for series_games in self.group_series(s0):
+                yield self.summarize_series(series_games)
+
+    def group_series(self, season0):
+        """
+        Split the games of a season into series, and return
+        them as lists of games, ordered by the first day of
+        the series and then by team names
+        """
+        groups = {}
+        for j in self.index.season_games(season0):
+            pair = tuple(sorted([j['homeTeamNickname'], j['awayTeamNickname']]))
+            if j['day'] < SEASON_MAX:
+                # Every regular-season series lasts SERIES_LENGTH games
+                key = (j['day']//SERIES_LENGTH, pair)
+            else:
+                key = (SEASON_MAX, pair)
+            groups.setdefault(key, []).append(j)
+
+        all_series = []
+        for games in groups.values():
+            games = sorted(games, key=lambda j: j['day'])
+            if games[0]['day'] < SEASON_MAX and not self.is_complete(games[0]):
+                # Series still in progress, skip it
+                continue
+            all_series.append(games)
+        all_series.sort(key=lambda games: (
+            games[0]['day'],
+            sorted([games[0]['homeTeamNickname'], games[0]['awayTeamNickname']])
+        ))
+        return all_series
+
+    def is_complete(self, j):
+        """Check that the home team of a regular-season game played every day of its series"""
+        start_day0 = (j['day']//SERIES_LENGTH)*SERIES_LENGTH
+        for day0 in range(start_day0, start_day0 + SERIES_LENGTH):
+            if self.index.team_game(j['season'], day0, j['homeTeamNickname']) is None:
+                return False
+        return True
+
+    def summarize_series(self, games):
+        """Summarize every game in one series, reusing its series scores"""
+        first = games[0]
+        season = first['season'] + 1
+        playoffs = first['day'] >= SEASON_MAX
+
+        # Series scores depend on which team is home, so keep
+        # one copy for each team that hosted a game
+        series_scores = {}
+        summaries = []
+        for j in games:
+            ht = j['homeTeamNickname']
+            at = j['awayTeamNickname']
+            day = j['day'] + 1
+            if ht not in series_scores:
+                if playoffs:
+                    series_scores[ht] = self.sleuth.series_scores_playoffs(ht, at, season, day)
+                else:
+                    series_scores[ht] = self.sleuth.series_scores(ht, season, day)
+            summaries.append(self.sleuth.summarize(j, series=series_scores[ht]))
+
+        return {
+            'season': season,
+            'playoffs': playoffs,
+            'playoffsRound': summaries[0]['playoffsRound'],
+            'teams': sorted([first['homeTeamNickname'], first['awayTeamNickname']]),
+            'days': [j['day'] + 1 for j in games],
+            'gameIds': [j['id'] for j in games],
+            'games': summaries,
+        }
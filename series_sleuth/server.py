@@ -0,0 +1,216 @@
+import json
+import time
+import asyncio
+import traceback
+from urllib.parse import urlsplit, parse_qs
+from .session import SleuthSession
+from .sleuth import check_fields
+from .metrics import REGISTRY, HTTP_REQUESTS, HTTP_REQUEST_SECONDS
+from .util import NoMatchingGames
+
+
+class QueryError(Exception):
+    """A query the server cannot answer, with the HTTP status to answer it with"""
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class SleuthServer(object):
+    """
+    Long-lived query server that keeps the games data set
+    and its indexes in memory between requests. Game days
+    saved to the data cache while the server is running
+    (see cache.save_day()) are picked up by the next request.
+
+    The server speaks just enough HTTP/1.1 to answer GET
+    requests with JSON, over a local TCP port or a Unix socket:
+
+        GET /series?game_id=<game id>
+        GET /series?team=<team>&season=<season>&day=<day>
+
+    Both return the same dict as SleuthSession.summarize() (season and
+    day are one-indexed, like on the command line). Add
+    &fields=seriesScore,odds to return only some of its keys. Connections
+    are kept open between requests unless the client asks to
+    close them.
+
+    Errors are returned as {"error": "..."} with status 400 for
+    a bad query or a malformed request, 404 for an unknown path or
+    for a game that cannot be found, 405 for anything other than GET,
+    and 500 if summarizing the game fails (the traceback goes to stderr).
+
+        GET /metrics
+
+    returns the metrics of the server (request counts and latencies
+    by type of query, data set load, memo lookups and misses, etc.)
+    in the Prometheus text format, see metrics.REGISTRY.
+    """
+    REASONS = {
+        200: 'OK',
+        400: 'Bad Request',
+        404: 'Not Found',
+        405: 'Method Not Allowed',
+        500: 'Internal Server Error',
+    }
+
+    def __init__(self, index=None):
+        """Load the data set and index it (unless an already-loaded index is passed in)"""
+        self.session = SleuthSession(index)
+        # Build every season's cumulative tables up front,
+        # so that no request has to wait for them
+        self.session.index.warm()
+
+    def query(self, method, target):
+        """
+        Answer a single request, and return (status, body): a JSON-able
+        body, or the text of the metrics. The request is counted and
+        timed in the metrics, by type of query, whatever happens
+        (a request that fails before it has a status counts as a 500).
+        """
+        start = time.perf_counter()
+        url = urlsplit(target)
+        params = parse_qs(url.query)
+        if url.path=='/series':
+            kind = 'game_id' if params.get('game_id') else 'team_season_day'
+        elif url.path=='/metrics':
+            kind = 'metrics'
+        else:
+            kind = 'other'
+        status = 500
+        try:
+            if method!='GET':
+                raise QueryError(405, "Only GET requests are supported")
+            if kind=='metrics':
+                status, body = 200, REGISTRY.export()
+            elif kind=='other':
+                raise QueryError(404, "Unknown path %s"%(url.path))
+            else:
+                # Pick up any game days saved since the last request
+                self.session.refresh()
+                status, body = 200, self.series(params)
+        except QueryError as e:
+            status, body = e.status, {'error': e.message}
+        except Exception:
+            # Still answer, so the client is not left without a response
+            traceback.print_exc()
+            status, body = 500, {'error': "Internal server error"}
+        finally:
+            HTTP_REQUESTS.inc(query=kind, status=status)
+            HTTP_REQUEST_SECONDS.observe(time.perf_counter() - start, query=kind)
+        return status, body
+
+    def series(self, params):
+        """Summarize the game given by the /series query parameters"""
+        def first(name):
+            values = params.get(name)
+            return values[0] if values else None
+
+        game_id = first('game_id')
+        team = first('team')
+        season = first('season')
+        day = first('day')
+        fields = first('fields')
+        try:
+            if fields is not None:
+                fields = fields.split(',')
+                check_fields(fields)
+            if game_id:
+                return self.session.summarize(game_id, fields)
+            if not (team and season and day):
+                raise QueryError(400, "Specify either game_id, or all three of team/season/day")
+            for name, value in [('season', season), ('day', day)]:
+                try:
+                    int(value)
+                except ValueError:
+                    raise QueryError(400, "%s must be an integer"%(name))
+            return self.session.summarize_game(team, season, day, fields)
+        except NoMatchingGames:
+            raise QueryError(404, "No matching game found")
+        except ValueError as e:
+            raise QueryError(400, str(e))
+
+    async def handle(self, reader, writer):
+        """Answer every request on one connection, until the client closes it"""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                # Skip over any request body, it is never used
+                try:
+                    length = int(headers.get('content-length', 0) or 0)
+                except ValueError:
+                    length = -1
+                if length > 0:
+                    await reader.readexactly(length)
+
+                parts = request_line.decode('latin-1').split()
+                if length < 0 or len(parts)!=3:
+                    if length < 0:
+                        # The body cannot be skipped, so the connection cannot be used again
+                        status, body = 400, {'error': "Malformed Content-Length header"}
+                    else:
+                        status, body = 400, {'error': "Malformed request line"}
+                    keep_alive = False
+                    HTTP_REQUESTS.inc(query='other', status=status)
+                else:
+                    method, target, version = parts
+                    status, body = self.query(method, target)
+                    connection = headers.get('connection', '').lower()
+                    if version=='HTTP/1.0':
+                        keep_alive = connection=='keep-alive'
+                    else:
+                        keep_alive = connection!='close'
+
+                writer.write(self.response(status, body, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    def response(self, status, body, keep_alive):
+        """Return the bytes of an HTTP response with the given JSON body (or text, for the metrics)"""
+        if isinstance(body, str):
+            payload = body.encode('utf-8')
+            content_type = 'text/plain; version=0.0.4; charset=utf-8'
+        else:
+            payload = json.dumps(body).encode('utf-8')
+            content_type = 'application/json'
+        head = [
+            'HTTP/1.1 %d %s'%(status, self.REASONS[status]),
+            'Content-Type: %s'%(content_type),
+            'Content-Length: %d'%(len(payload)),
+            'Connection: %s'%('keep-alive' if keep_alive else 'close'),
+        ]
+        return ('\r\n'.join(head) + '\r\n\r\n').encode('latin-1') + payload
+
+    async def start(self, host='127.0.0.1', port=8080, socket_path=None):
+        """Start listening on the Unix socket if one is given, otherwise on the TCP host and port"""
+        if socket_path:
+            return await asyncio.start_unix_server(self.handle, path=socket_path)
+        return await asyncio.start_server(self.handle, host=host, port=port)
+
+    def run(self, host='127.0.0.1', port=8080, socket_path=None):
+        """Serve requests until interrupted"""
+        async def serve():
+            server = await self.start(host, port, socket_path)
+            async with server:
+                await server.serve_forever()
+        try:
+            asyncio.run(serve())
+        except KeyboardInterrupt:
+            pass
+
@@ -0,0 +1,215 @@
+import os
+import time
+import shutil
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from .sleuth import Sleuth, check_fields
+from .cache import load_index, refresh_index, is_compacted, share_index, map_index
+from .memo import DEFAULT_MEMO_SIZE
+from .metrics import SUMMARIZE_SECONDS
+from .util import NoMatchingGames
+
+
+class SleuthSession(object):
+    """
+    Python API for summarizing games, without going through
+    the command line flags or printing anything.
+
+    A session loads the games data set and its index once, and
+    then returns the summary of any game as the same dict as
+    SleuthData.parse() (season and day are one-indexed):
+
+        from series_sleuth.session import SleuthSession
+
+        session = SleuthSession()
+        summary = session.summarize('e23e6d3-911e-45a6-87d2-3a2efbcbae6f')
+        summary = session.summarize_game('Millennials', 5, 104)
+        summaries = session.summarize_many(game_ids)
+
+    Every method takes an optional list of fields: then only those
+    keys of the summary are computed and returned (see Sleuth.summarize()).
+
+    A session keeps no state between calls, so one session
+    can be shared by any number of threads. refresh() brings a copy
+    of the index up to date and then swaps it in, so threads that
+    are summarizing games meanwhile go on reading the old one. To
+    summarize many games at once on a pool of threads or processes,
+    pass workers to summarize_many().
+    """
+    def __init__(self, index=None, cache=True, mapped=False, memo_size=DEFAULT_MEMO_SIZE):
+        """
+        Load the data set and index it (unless an already-loaded index is passed in).
+        cache and mapped are passed on to load_index(), and memo_size to Sleuth().
+        """
+        if index is None:
+            index = load_index(cache=cache, mapped=mapped)
+        self.cache = cache
+        self.mapped = mapped
+        self.memo_size = memo_size
+        self.sleuth = Sleuth(index, memo_size)
+
+    @property
+    def index(self):
+        """
+        The index of the session's Sleuth. Both are replaced at once by
+        refresh(): a call that needs both takes the Sleuth once, and its index.
+        """
+        return self.sleuth.index
+
+    def summarize(self, game_id, fields=None):
+        """
+        Return the summary dict of the game with the given id.
+        Raises NoMatchingGames if there is no such game.
+        """
+        start = time.perf_counter()
+        sleuth = self.sleuth
+        r = sleuth.index.get(game_id)
+        if r is None:
+            raise NoMatchingGames()
+        summary = sleuth.summarize(r, fields=fields)
+        SUMMARIZE_SECONDS.observe(time.perf_counter() - start, query='game_id')
+        return summary
+
+    def summarize_game(self, team, season, day, fields=None):
+        """
+        Return the summary dict of the game played by the given team
+        on the given season and day (one-indexed).
+        Raises NoMatchingGames if there is no such game.
+        """
+        start = time.perf_counter()
+        sleuth = self.sleuth
+        r = sleuth.index.team_game(int(season)-1, int(day)-1, team)
+        if r is None:
+            raise NoMatchingGames()
+        summary = sleuth.summarize(r, fields=fields)
+        SUMMARIZE_SECONDS.observe(time.perf_counter() - start, query='team_season_day')
+        return summary
+
+    def bracket(self, season):
+        """
+        Return the playoffs bracket of the given season (one-indexed)
+        as a list of rounds, each one a list of series dicts
+        (see PlayoffBracket.series())
+        """
+        return self.index.bracket(int(season)-1).rounds()
+
+    def refresh(self):
+        """
+        Add the days saved with cache.save_day() since the data set
+        was loaded (see GameIndex.update_day()), so that summaries
+        include them. Return True if any days were added.
+        The days are added to a copy of the index, which then replaces
+        the session's index (and memo) all at once. A frozen session
+        cannot be refreshed.
+        """
+        index = self.index
+        if index.frozen:
+            return False
+        if not is_compacted(index):
+            try:
+                index = refresh_index(index)
+            except ValueError:
+                # The delta file was replaced under us: start over from the cache
+                index = load_index(cache=self.cache, mapped=self.mapped)
+        else:
+            index = load_index(cache=self.cache, mapped=self.mapped)
+        if index is None:
+            return False
+        self.sleuth = Sleuth(index, self.memo_size)
+        return True
+
+    def memo_stats(self):
+        """
+        Return the hits, misses, and size of the memo of metric results
+        shared by every game the session summarizes (see MetricMemo),
+        or None if the memo is turned off
+        """
+        if self.sleuth.memo is None:
+            return None
+        return self.sleuth.memo.stats()
+
+    def freeze(self):
+        """
+        Build everything the session builds lazily, so that from
+        now on the shared index is only ever read (see GameIndex.freeze()).
+        A frozen session cannot be refreshed any more.
+        """
+        self.index.freeze()
+
+    def summarize_many(self, game_ids, fields=None, workers=None, processes=False):
+        """
+        Return a list with the summary dict of each of the given games,
+        in the same order, with None for games that cannot be found.
+
+        If workers is more than 1, the games are summarized on a pool
+        of that many threads (or processes, if processes is True).
+        The threads share this session's index, which is frozen until
+        they are done (so refresh() does nothing in the meantime). The
+        processes each memory-map a cache file with exactly the games of
+        this session's index (see cache.share_index()): the data cache
+        it was loaded from, or a snapshot of it if it has changed since
+        (or did not come from the cache), so they share one copy of the
+        data set too. Each process has a memo of memo_size results.
+        """
+        game_ids = list(game_ids)
+        if not workers or workers <= 1 or len(game_ids) <= 1:
+            return self._summarize_chunk(game_ids, fields)
+
+        # Split the games into a few chunks per worker, to keep
+        # the overhead per game low while still spreading the load
+        nchunks = min(len(game_ids), workers*4)
+        size = -(-len(game_ids)//nchunks)
+        chunks = [game_ids[i:i + size] for i in range(0, len(game_ids), size)]
+
+        # Only freeze the index for this batch if it is not frozen already
+        thaw = False
+        snapshot = False
+        if processes:
+            path, key, identity, snapshot = share_index(self.index)
+            executor = ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_init_worker,
+                initargs=(path, key, identity, self.memo_size)
+            )
+            summarize_chunk = partial(_summarize_chunk, fields=fields)
+        else:
+            thaw = not self.index.frozen
+            self.freeze()
+            executor = ThreadPoolExecutor(max_workers=workers)
+            summarize_chunk = partial(self._summarize_chunk, fields=fields)
+
+        summaries = []
+        try:
+            with executor:
+                for chunk_summaries in executor.map(summarize_chunk, chunks):
+                    summaries += chunk_summaries
+        finally:
+            if thaw:
+                self.index.unfreeze()
+            if snapshot:
+                shutil.rmtree(os.path.dirname(path), ignore_errors=True)
+        return summaries
+
+    def _summarize_chunk(self, game_ids, fields=None):
+        check_fields(fields)
+        summaries = []
+        for game_id in game_ids:
+            try:
+                summaries.append(self.summarize(game_id, fields))
+            except NoMatchingGames:
+                summaries.append(None)
+        return summaries
+
+
+# Session of each worker process of summarize_many()
+_worker_session = None
+
+
+def _init_worker(path, key, identity, memo_size):
+    """Start a worker process of summarize_many(), with its own session over the shared cache file"""
+    global _worker_session
+    _worker_session = SleuthSession(index=map_index(path, key, identity), memo_size=memo_size)
+
+
+def _summarize_chunk(game_ids, fields=None):
+    return _worker_session._summarize_chunk(game_ids, fields)
@@ -1,133 +1,104 @@
-import os
-import json
-import blaseball_core_game_data as gd
-from .util import NoMatchingGames, SEASON_MAX, PLAYOFFS_MAX
-
-class SleuthData(object):
-    """
-    Note: currently this class does things inefficiently,
-    we go through the entire data set for each thing.
-    A better way would be to use the parser class, pass
-    one game data json item at a time, and accumulate
-    each metric in a variable. Then the final json would
-    throw all of them together. (But it is still super fast.)
-    """
-    def __init__(self, options):
-        """Load the data set"""
-        self.data = json.loads(gd.get_games_data())
-
-        if options.game_id:
-            self.game_record = None
-            for j in self.data:
-                if j['id']==options.game_id:
-                    self.game_record = j
-                    break
-        else:
-            self.game_record = None
-            for j in self.data:
-                # Careful with season and day, zero-indexed in self.data and one-indexed in options
-                is_our_s = str(j['season']+1)==options.season
-                is_our_d = str(j['season']+1)==options.season
-                is_our_t = j['homeTeamNickname']==options.team or j['awayTeamnickname']==options.team
-                if is_our_s and is_our_d and is_our_t:
-                    self.game_record = j
+import time
+from .util import NoMatchingGames, SEASON_MAX, PLAYOFFS_MAX, SERIES_LENGTH
+from .cache import load_index
+from .memo import MetricMemo, DEFAULT_MEMO_SIZE
+from .metrics import SUMMARIZE_SECONDS
+
+# Every key of a game summary, in order
+FIELDS = [
+    'homeTeam',
+    'awayTeam',
+    'winner',
+    'season',
+    'day',
+    'playoffs',
+    'playoffsRound',
+    'finalScore',
+    'odds',
+    'seasonRecord',
+    'playoffsRecord',
+    'seasonRecordFinal',
+    'playoffsRecordFinal',
+    'opponentSeasonRecord',
+    'opponentPlayoffsRecord',
+    'opponentSeasonRecordFinal',
+    'opponentPlayoffsRecordFinal',
+    'seasonRunsVersusOpponent',
+    'playoffsRunsVersusOpponent',
+    'seasonRunsVersusOpponentFinal',
+    'playoffsRunsVersusOpponentFinal',
+    'seriesScore',
+    'seriesScoreFinal',
+    'seriesRunsVersusOpponent',
+    'seriesRunsVersusOpponentFinal',
+]
+
+
+def check_fields(fields):
+    """Raise a ValueError if any of the given summary fields does not exist"""
+    if fields is None:
+        return
+    unknown = [field for field in fields if field not in FIELDS]
+    if len(unknown) > 0:
+        raise ValueError("Unknown field(s): %s (choose from: %s)"%(", ".join(unknown), ", ".join(FIELDS)))
+
+
+def select_fields(sleuth_data, fields):
+    """Keep only the given fields of a summary (or all of them, if fields is None)"""
+    if fields is None:
+        return sleuth_data
+    return {key: value for key, value in sleuth_data.items() if key in fields}
 
-        if self.game_record is None:
-            raise NoMatchingGames()
 
-        self.game_id = self.game_record['id']
+class Sleuth(object):
+    """
+    Summarizes games from an indexed games data set.
 
-        # Useful to know for playoffs calculations
-        # Last day of playoffs, zero-indexed
-        self.last_day0 = 0
-        for j in self.data:
-            if j['season']==self.game_record['season']:
-                if j['day']>self.last_day0:
-                    self.last_day0 = j['day']
-        self.last_day = self.last_day0 + 1
+    The data set is indexed once with a GameIndex when it is
+    loaded. W/L records and run totals come from the season's
+    cumulative StandingsTable and HeadToHeadTable, so each one
+    is a single subtraction, and series scores are a handful of
+    direct lookups.
+    """
+    def __init__(self, index=None, memo_size=DEFAULT_MEMO_SIZE):
+        """
+        Load the data set and index it (unless an already-loaded index is passed in).
+        Metric results are memoized across games, up to memo_size results
+        per metric (see MetricMemo); pass memo_size=0 to turn that off.
+        """
+        if index is None:
+            index = load_index()
+        self.index = index
+        self.memo = None
+        if memo_size:
+            self.memo = MetricMemo(self, memo_size)
+
+    @property
+    def data(self):
+        """The GameStore of the index (the index may swap it out in update_day())"""
+        return self.index.store
+
+    def summarize(self, r, series=None, fields=None):
+        """
+        Return the summary dict for the given game data json item.
+        See SleuthData.parse() for the format.
 
-    def get_id(self):
-        return self.game_id
+        To reuse series scores already computed for another game
+        in the same series, pass the result of series_scores() or
+        series_scores_playoffs() for this game as series.
 
-    def parse(self):
+        To compute only some of the summary, pass a list of the keys
+        to return as fields (see FIELDS). Only those keys are returned,
+        in the usual order, and only what they need is computed.
+        (Playoffs keys are still left out for regular-season games.)
         """
-        This takes the current game id and does a few on-the-fly calculations to return the following dict:
-        (season/day are 1-indexed)
+        check_fields(fields)
+
+        def want(*keys):
+            return fields is None or any(key in fields for key in keys)
 
-        {
-            homeTeam: Millennials,
-            awayTeam: Shoe Thieves,
-            winner: home,
-            season: 5,
-            day: 104,
-            playoffs: True,
-            playoffsRound: 1,
-            finalScore: {
-                Millennials: 11,
-                Shoe Thieves: 10
-            },
-            odds: {
-                Millennials: 54,
-                Shoe Thieves: 46
-            },
-            seasonRecord: {
-                Millennials: [32, 17],
-                Shoe Thieves: [30, 19]
-            },
-            seasonRecordFinal: {
-                Millennials: [X, Y],
-                Shoe Thieves: [Y, X]
-            },
-            opponentSeasonRecord: {
-                Millennials: [5, 4],
-                Shoe Thieves: [4, 5]
-            },
-            opponentSeasonRecordFinal: {
-                Millennials: [X, Y],
-                Shoe Thieves: [Y, X]
-            },
-            seasonRunsVersusOpponent: {
-                Millennials: 35,
-                Shoe Thieves: 35
-            },
-            seasonRunsVersusOpponentFinal: {
-                Millennials: 35,
-                Shoe Thieves: 35
-            },
-            playoffsRecord: {
-            },
-            playoffsRecordFinal: {
-            },
-            opponentPlayoffsRecord: {
-            },
-            opponentPlayoffsRecordFinal: {
-            },
-            playoffsRunsVersusOpponent: {
-            },
-            playoffsRunsVersusOpponentFinal: {
-            },
-            seriesRunsVersusOpponent: {
-                Millennials: 5,
-                Shoe Thieves: 6
-            },
-            seriesRunsVersusOpponentFinal: {
-                Millennials: 32,
-                Shoe Thieves: 28
-            },
-            seriesScore: {
-                Millennials: 0,
-                Shoe Thieves, 1
-            },
-            seriesScoreFinal: {
-                Millennials: 1,
-                Shoe Thieves: 2
-            }
-        }
-        """
         # The final data structure returned
         sleuth_data = {}
-        d = self.data
-        r = self.game_record
 
         ht = r['homeTeamNickname']
         at = r['awayTeamNickname']
@@ -168,11 +139,12 @@ class SleuthData(object):
         # Season things:
 
         # season w/l record
-        sleuth_data['seasonRecord'] = {
-            ht: self.season_record(ht, season, day),
-            at: self.season_record(at, season, day)
-        }
-        if sleuth_data['playoffs']:
+        if want('seasonRecord'):
+            sleuth_data['seasonRecord'] = {
+                ht: self.season_record(ht, season, day),
+                at: self.season_record(at, season, day)
+            }
+        if sleuth_data['playoffs'] and want('playoffsRecord'):
             # playoffs w/l record
             sleuth_data['playoffsRecord'] = {
                 ht: self.playoffs_record(ht, season, day),
@@ -180,11 +152,12 @@ class SleuthData(object):
             }
 
         # final season w/l record
-        sleuth_data['seasonRecordFinal'] = {
-            ht: self.season_record(ht, season, SEASON_MAX),
-            at: self.season_record(at, season, SEASON_MAX)
-        }
-        if sleuth_data['playoffs']:
+        if want('seasonRecordFinal'):
+            sleuth_data['seasonRecordFinal'] = {
+                ht: self.season_record(ht, season, SEASON_MAX),
+                at: self.season_record(at, season, SEASON_MAX)
+            }
+        if sleuth_data['playoffs'] and want('playoffsRecordFinal'):
             # final playoffs w/l record
             sleuth_data['playoffsRecordFinal'] = {
                 ht: self.playoffs_record(ht, season, PLAYOFFS_MAX),
@@ -192,12 +165,13 @@ class SleuthData(object):
             }
 
         # season w/l record versus opponent
-        opp = self.opponent_season_record(ht, at, season, day)
-        sleuth_data['opponentSeasonRecord'] = {
-            ht: opp,
-            at: list(reversed(opp))
-        }
-        if sleuth_data['playoffs']:
+        if want('opponentSeasonRecord'):
+            opp = self.opponent_season_record(ht, at, season, day)
+            sleuth_data['opponentSeasonRecord'] = {
+                ht: opp,
+                at: list(reversed(opp))
+            }
+        if sleuth_data['playoffs'] and want('opponentPlayoffsRecord'):
             # playoffs w/l record versus opponent
             opp = self.opponent_playoffs_record(ht, at, season, day)
             sleuth_data['opponentPlayoffsRecord'] = {
@@ -206,12 +180,13 @@ class SleuthData(object):
             }
 
         # final season w/l record versus opponent
-        opp = self.opponent_season_record(ht, at, season, SEASON_MAX)
-        sleuth_data['opponentSeasonRecordFinal'] = {
-            ht: opp,
-            at: list(reversed(opp))
-        }
-        if sleuth_data['playoffs']:
+        if want('opponentSeasonRecordFinal'):
+            opp = self.opponent_season_record(ht, at, season, SEASON_MAX)
+            sleuth_data['opponentSeasonRecordFinal'] = {
+                ht: opp,
+                at: list(reversed(opp))
+            }
+        if sleuth_data['playoffs'] and want('opponentPlayoffsRecordFinal'):
             # final playoffs w/l record versus opponent
             opp = self.opponent_playoffs_record(ht, at, season, PLAYOFFS_MAX)
             sleuth_data['opponentPlayoffsRecordFinal'] = {
@@ -220,12 +195,13 @@ class SleuthData(object):
             }
 
         # season runs versus opponent
-        oppr = self.opponent_season_runs(ht, at, season, day)
-        sleuth_data['seasonRunsVersusOpponent'] = {
-            ht: oppr[0],
-            at: oppr[1]
-        }
-        if sleuth_data['playoffs']:
+        if want('seasonRunsVersusOpponent'):
+            oppr = self.opponent_season_runs(ht, at, season, day)
+            sleuth_data['seasonRunsVersusOpponent'] = {
+                ht: oppr[0],
+                at: oppr[1]
+            }
+        if sleuth_data['playoffs'] and want('playoffsRunsVersusOpponent'):
             # playoffs runs versus opponent
             oppr = self.opponent_playoffs_runs(ht, at, season, day)
             sleuth_data['playoffsRunsVersusOpponent'] = {
@@ -234,12 +210,13 @@ class SleuthData(object):
             }
 
         # final season runs versus opponent
-        oppr = self.opponent_season_runs(ht, at, season, SEASON_MAX)
-        sleuth_data['seasonRunsVersusOpponentFinal'] = {
-            ht: oppr[0],
-            at: oppr[1]
-        }
-        if sleuth_data['playoffs']:
+        if want('seasonRunsVersusOpponentFinal'):
+            oppr = self.opponent_season_runs(ht, at, season, SEASON_MAX)
+            sleuth_data['seasonRunsVersusOpponentFinal'] = {
+                ht: oppr[0],
+                at: oppr[1]
+            }
+        if sleuth_data['playoffs'] and want('playoffsRunsVersusOpponentFinal'):
             # final playoffs runs versus opponent
             oppr = self.opponent_playoffs_runs(ht, at, season, PLAYOFFS_MAX)
             sleuth_data['playoffsRunsVersusOpponentFinal'] = {
@@ -250,7 +227,16 @@ class SleuthData(object):
         # -------------------
         # Series things:
 
-        if day > SEASON_MAX:
+        # The playoffs round comes from the series too
+        series_keys = ['seriesScore', 'seriesScoreFinal', 'seriesRunsVersusOpponent', 'seriesRunsVersusOpponentFinal']
+        if sleuth_data['playoffs']:
+            series_keys.append('playoffsRound')
+        if not want(*series_keys):
+            return select_fields(sleuth_data, fields)
+
+        if series is not None:
+            res = series
+        elif day > SEASON_MAX:
             res = self.series_scores_playoffs(ht, at, season, day)
         else:
             res = self.series_scores(ht, season, day)
@@ -294,7 +280,7 @@ class SleuthData(object):
         if sleuth_data['playoffs']:
             sleuth_data['playoffsRound'] = res['playoffsRound']
 
-        return sleuth_data
+        return select_fields(sleuth_data, fields)
 
     def season_record(self, team, season, day):
         """
@@ -308,24 +294,8 @@ class SleuthData(object):
         Season and day parameters are 1-indexed.
         To get a team's season record, pass in day 100.
         """
-        wl = [0, 0]
-        day0 = day - 1
-        season0 = season - 1
-        for j in self.data:
-            if j['season']==season0:
-                if j['day']<SEASON_MAX:
-                    if j['day']<day0:
-                        if j['homeTeamNickname']==team:
-                            if j['whoWon']=='home':
-                                wl[0] += 1
-                            else:
-                                wl[1] += 1
-                        elif j['awayTeamNickname']==team:
-                            if j['whoWon']=='away':
-                                wl[0] += 1
-                            else:
-                                wl[1] += 1
-        return wl
+        table = self.index.standings(season - 1)
+        return table.record(team, 0, min(day - 1, SEASON_MAX))
 
     def playoffs_record(self, team, season, day):
         """
@@ -338,24 +308,8 @@ class SleuthData(object):
 
         Season and day parameters are 1-indexed.
         """
-        wl = [0, 0]
-        day0 = day - 1
-        season0 = season - 1
-        for j in self.data:
-            if j['season']==season0:
-                if j['day']>=SEASON_MAX:
-                    if j['day']<day0:
-                        if j['homeTeamNickname']==team:
-                            if j['whoWon']=='home':
-                                wl[0] += 1
-                            else:
-                                wl[1] += 1
-                        elif j['awayTeamNickname']==team:
-                            if j['whoWon']=='away':
-                                wl[0] += 1
-                            else:
-                                wl[1] += 1
-        return wl
+        table = self.index.standings(season - 1)
+        return table.record(team, SEASON_MAX, day - 1)
 
     def opponent_season_record(self, team, versus_team, season, day):
         """
@@ -369,24 +323,8 @@ class SleuthData(object):
 
         Season and day parameters are 1-indexed.
         """
-        wl = [0, 0]
-        day0 = day - 1
-        season0 = season - 1
-        for j in self.data:
-            if j['season']==season0:
-                if j['day']<SEASON_MAX:
-                    if j['day']<day0:
-                        if j['homeTeamNickname']==team and j['awayTeamNickname']==versus_team:
-                            if j['whoWon']=='home':
-                                wl[0] += 1
-                            else:
-                                wl[1] += 1
-                        elif j['awayTeamNickname']==team and j['homeTeamNickname']==versus_team:
-                            if j['whoWon']=='away':
-                                wl[0] += 1
-                            else:
-                                wl[1] += 1
-        return wl
+        table = self.index.head_to_head(season - 1)
+        return table.record(team, versus_team, 0, min(day - 1, SEASON_MAX))
 
     def opponent_playoffs_record(self, team, versus_team, season, day):
         """
@@ -399,24 +337,8 @@ class SleuthData(object):
 
         Season and day parameters are 1-indexed.
         """
-        wl = [0, 0]
-        day0 = day - 1
-        season0 = season - 1
-        for j in self.data:
-            if j['season']==season0:
-                if j['day']>=SEASON_MAX:
-                    if j['day']<day0:
-                        if j['homeTeamNickname']==team and j['awayTeamNickname']==versus_team:
-                            if j['whoWon']=='home':
-                                wl[0] += 1
-                            else:
-                                wl[1] += 1
-                        elif j['awayTeamNickname']==team and j['homeTeamNickname']==versus_team:
-                            if j['whoWon']=='away':
-                                wl[0] += 1
-                            else:
-                                wl[1] += 1
-        return wl
+        table = self.index.head_to_head(season - 1)
+        return table.record(team, versus_team, SEASON_MAX, day - 1)
 
     def opponent_season_runs(self, team, versus_team, season, day):
         """
@@ -430,20 +352,8 @@ class SleuthData(object):
 
         Season and day parameters are 1-indexed.
         """
-        runs = [0, 0]
-        day0 = day - 1
-        season0 = season - 1
-        for j in self.data:
-            if j['season']==season0:
-                if j['day']<SEASON_MAX:
-                    if j['day']<day0:
-                        if j['homeTeamNickname']==team and j['awayTeamNickname']==versus_team:
-                            runs[0] += j['homeScore']
-                            runs[1] += j['awayScore']
-                        elif j['awayTeamNickname']==team and j['homeTeamNickname']==versus_team:
-                            runs[0] += j['awayScore']
-                            runs[1] += j['homeScore']
-        return runs
+        table = self.index.head_to_head(season - 1)
+        return table.runs_versus(team, versus_team, 0, min(day - 1, SEASON_MAX))
 
     def opponent_playoffs_runs(self, team, versus_team, season, day):
         """
@@ -457,20 +367,8 @@ class SleuthData(object):
 
         Season and day parameters are 1-indexed.
         """
-        runs = [0, 0]
-        day0 = day - 1
-        season0 = season - 1
-        for j in self.data:
-            if j['season']==season0:
-                if j['day']>=SEASON_MAX:
-                    if j['day']<day0:
-                        if j['homeTeamNickname']==team and j['awayTeamNickname']==versus_team:
-                            runs[0] += j['homeScore']
-                            runs[1] += j['awayScore']
-                        elif j['awayTeamNickname']==team and j['homeTeamNickname']==versus_team:
-                            runs[0] += j['awayScore']
-                            runs[1] += j['homeScore']
-        return runs
+        table = self.index.head_to_head(season - 1)
+        return table.runs_versus(team, versus_team, SEASON_MAX, day - 1)
 
     def series_scores(self, team, season, day):
         """
@@ -499,8 +397,6 @@ class SleuthData(object):
         """
         assert day <= SEASON_MAX
         day0 = day - 1
-        ht = self.game_record['homeTeamNickname']
-        at = self.game_record['awayTeamNickname']
 
         result = {
             "days": [],
@@ -509,19 +405,16 @@ class SleuthData(object):
 
         # Every regular-season series lasts 3 games.
         # Dividing the day mod 3 gives the series index.
-        SL = 3
+        SL = SERIES_LENGTH
         series_start_day0 = (day0//SL)*SL
         series_end_day0 = series_start_day0 + SL - 1
         series_index = day0%SL
 
         season0 = season - 1
-        seasons_games = [j for j in self.data if j['season']==season0]
         for this_day0 in range(series_start_day0, series_end_day0+1):
             this_day = this_day0 + 1
-            todays_games = [j for j in seasons_games if j['day']==this_day0]
-            our_game = [j for j in todays_games if (j['homeTeamNickname']==team or j['awayTeamNickname']==team)]
-            assert len(our_game)>0
-            our_game = our_game[0]
+            our_game = self.index.team_game(season0, this_day0, team)
+            assert our_game is not None
             score = {
                 our_game['homeTeamNickname']: our_game['homeScore'],
                 our_game['awayTeamNickname']: our_game['awayScore']
@@ -561,62 +454,21 @@ class SleuthData(object):
         So are the days returned.
         """
         assert day > SEASON_MAX
-        ht = self.game_record['homeTeamNickname']
-        at = self.game_record['awayTeamNickname']
-
-        result = {
-            "days": [],
-            "scores": []
-        }
 
         # Every playoffs series lasts 5 games, but not all playoffs series
         # are 5 games, so day number does not give you series index.
-
-        # Loop structure:
-        # Start at day 100, loop over each day
-        # Check if team name matches our team, and if opponent matches opponent on our day
-        # If so, add day to days list, and add score to scores list
-        playoffs_round = 0
-        opponents = set()
-        season0 = season - 1
-        day0 = day - 1
-        seasons_games = [j for j in self.data if j['season']==season0]
-        for playoffs_day in range(100, self.last_day+1):
-            # Find the JSON for all games on this day,
-            # then find the one with the specified team
-            playoffs_day0 = playoffs_day - 1
-            todays_games = [j for j in seasons_games if j['day']==playoffs_day0]
-            our_game = [j for j in todays_games if (j['homeTeamNickname']==team or j['awayTeamNickname']==team)]
-            if len(our_game)==0:
-                # Team did not play this day
-                continue
-            our_game = our_game[0]
-
-            # Update opponents we have seen
-            if our_game['homeTeamNickname']==team:
-                opponents.add(our_game['awayTeamNickname'])
-            elif our_game['awayTeamNickname']==team:
-                opponents.add(our_game['homeTeamNickname'])
-
-            # If we have reached the date of the game the user specified,
-            # determine the playoffs round number
-            if playoffs_day0 == day0:
-                playoffs_round = len(opponents)
-
-            # If versus team is correct too, record the score in a dict
-            if (our_game['homeTeamNickname']==versus_team or our_game['awayTeamNickname']==versus_team):
-                score = {
-                    our_game['homeTeamNickname']: our_game['homeScore'],
-                    our_game['awayTeamNickname']: our_game['awayScore']
-                }
-
-                # Append days and corresponding scores to final data structure
-                result['days'] = result['days'] + [playoffs_day]
-                result['scores'] = result['scores'] + [score]
-
+        # The season's bracket has already worked out which round each
+        # of the team's games was in, and every game against each opponent.
+        bracket = self.index.bracket(season - 1)
+        playoffs_round = bracket.round_of(team, day - 1)
         if playoffs_round == 0:
             raise Exception("Error playoffs_round is still 0 after going through all playoffs games")
 
+        days, scores = bracket.pair_scores(team, versus_team)
+        result = {
+            "days": days,
+            "scores": scores
+        }
         result['playoffsRound'] = playoffs_round
         result['season'] = season
         return result
@@ -640,18 +492,8 @@ class SleuthData(object):
 
         Season and day parameters are 1-indexed.
         """
-        wl = [0, 0]
-        season0 = season - 1
-        day0 = day - 1
-        for j in self.data:
-            if j['season']==season0:
-                if j['day']<day0:
-                    if j['homeTeamNickname']==team:
-                        if j['whoWon']=='home':
-                            wl[0] += 1
-                        else:
-                            wl[1] += 1
-        return wl
+        table = self.index.standings(season - 1)
+        return table.home_record(team, 0, day - 1)
 
     def away_wl_record(self, team, season, day):
         """
@@ -662,16 +504,128 @@ class SleuthData(object):
         Format is a list [X, Y]
         (X = n wins, Y = n losses)
         """
-        wl = [0, 0]
-        season0 = season - 1
-        day0 = day - 1
-        for j in self.data:
-            if j['season']==season0:
-                if j['day']<day0:
-                    if j['awayTeamNickname']==team:
-                        if j['whoWon']=='away':
-                            wl[0] += 1
-                        else:
-                            wl[1] += 1
-        return wl
+        table = self.index.standings(season - 1)
+        return table.away_record(team, 0, day - 1)
+
+
+class SleuthData(Sleuth):
+    """
+    Wraps the games data set and summarizes a single game.
+    """
+    def __init__(self, options, index=None, sleuth=None):
+        """
+        Load the data set and index it (unless an already-loaded index is passed in).
+        Pass a Sleuth to summarize the game with it instead, sharing its index
+        and its memo with every other game it summarizes (e.g. in batch mode).
+        """
+        if sleuth is None:
+            super().__init__(index)
+        else:
+            super().__init__(sleuth.index, memo_size=0)
+        self.sleuth = sleuth or self
+
+        if options.game_id:
+            self.query = 'game_id'
+            self.game_record = self.index.get(options.game_id)
+        else:
+            self.query = 'team_season_day'
+            # Careful with season and day, zero-indexed in self.data and one-indexed in options
+            team = options.team
+            if isinstance(team, list):
+                team = team[0]
+            self.game_record = self.index.team_game(int(options.season)-1, int(options.day)-1, team)
+
+        if self.game_record is None:
+            raise NoMatchingGames()
 
+        self.game_id = self.game_record['id']
+
+        # Useful to know for playoffs calculations
+        # Last day of playoffs, zero-indexed
+        self.last_day0 = self.index.last_day0(self.game_record['season'])
+        self.last_day = self.last_day0 + 1
+
+    def get_id(self):
+        return self.game_id
+
+    def parse(self, fields=None):
+        """
+        This takes the current game id and does a few on-the-fly calculations to return the following dict:
+        (season/day are 1-indexed)
+
+        {
+            homeTeam: Millennials,
+            awayTeam: Shoe Thieves,
+            winner: home,
+            season: 5,
+            day: 104,
+            playoffs: True,
+            playoffsRound: 1,
+            finalScore: {
+                Millennials: 11,
+                Shoe Thieves: 10
+            },
+            odds: {
+                Millennials: 54,
+                Shoe Thieves: 46
+            },
+            seasonRecord: {
+                Millennials: [32, 17],
+                Shoe Thieves: [30, 19]
+            },
+            seasonRecordFinal: {
+                Millennials: [X, Y],
+                Shoe Thieves: [Y, X]
+            },
+            opponentSeasonRecord: {
+                Millennials: [5, 4],
+                Shoe Thieves: [4, 5]
+            },
+            opponentSeasonRecordFinal: {
+                Millennials: [X, Y],
+                Shoe Thieves: [Y, X]
+            },
+            seasonRunsVersusOpponent: {
+                Millennials: 35,
+                Shoe Thieves: 35
+            },
+            seasonRunsVersusOpponentFinal: {
+                Millennials: 35,
+                Shoe Thieves: 35
+            },
+            playoffsRecord: {
+            },
+            playoffsRecordFinal: {
+            },
+            opponentPlayoffsRecord: {
+            },
+            opponentPlayoffsRecordFinal: {
+            },
+            playoffsRunsVersusOpponent: {
+            },
+            playoffsRunsVersusOpponentFinal: {
+            },
+            seriesRunsVersusOpponent: {
+                Millennials: 5,
+                Shoe Thieves: 6
+            },
+            seriesRunsVersusOpponentFinal: {
+                Millennials: 32,
+                Shoe Thieves: 28
+            },
+            seriesScore: {
+                Millennials: 0,
+                Shoe Thieves, 1
+            },
+            seriesScoreFinal: {
+                Millennials: 1,
+                Shoe Thieves: 2
+            }
+        }
+
+        Pass a list of keys as fields to compute and return only those.
+        """
+        start = time.perf_counter()
+        summary = self.sleuth.summarize(self.game_record, fields=fields)
+        SUMMARIZE_SECONDS.observe(time.perf_counter() - start, query=self.query)
+        return summary
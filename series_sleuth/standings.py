@@ -0,0 +1,385 @@
+import copy
+from array import array
+from .store import copy_column
+from .backend import numpy as np, use_numpy
+
+
+class CumulativeTable(object):
+    """
+    Base class for day-indexed running totals over a single season.
+
+    Each counter is a flat array with one row per key (a team,
+    or a pair of teams), and each row has one entry per day plus
+    one: entry d holds the total over all games played BEFORE
+    day d. The total over any range of days is then a single
+    subtraction. Days are zero-indexed.
+
+    Fractional runs (float counters) are the exception: they keep
+    the count of each day instead of the running total, and a range
+    of days is added up one day at a time, in day order, the way
+    the games data set adds them up. Subtracting running totals
+    of floats gives a slightly different total (e.g. 16.800000000000004
+    instead of 16.8).
+
+    Subclasses list their counters in COUNTERS, say how many
+    rows they need in nrows(), and count each game in count().
+
+    With the numpy backend (see backend.py), all of the games are
+    counted at once instead: subclasses turn the season's columns
+    into the entries to add to each counter in count_columns(),
+    and the running totals are taken with cumsum(). The counts are
+    the same as with the python backend, down to the order in which
+    fractional runs are added up.
+    """
+    COUNTERS = []
+
+    def __init__(self, store, rows, last_day0):
+        """Build the table from the GameStore rows of all games in one season"""
+        self.store = store
+        self.ndays = last_day0 + 1
+        self.stride = self.ndays + 1
+
+        # Number the teams playing this season
+        if use_numpy():
+            codes = np.unique(np.concatenate(self.columns(store.home_team, store.away_team, rows=rows))).tolist()
+        else:
+            codes = set()
+            for row in rows:
+                codes.add(store.home_team[row])
+                codes.add(store.away_team[row])
+        codes = sorted(codes, key=lambda code: store.teams[code])
+        self.codes = {code: i for i, code in enumerate(codes)}
+        self.teams = {store.teams[code]: i for i, code in enumerate(codes)}
+
+        # Runs are stored as integers unless the data has fractional runs,
+        # in which case they are stored as daily counts (see _span())
+        size = self.nrows()*self.stride
+        for counter in self.COUNTERS:
+            typecode = 'l'
+            if counter.startswith('runs') and store.fractional_runs:
+                typecode = 'd'
+            setattr(self, counter, array(typecode, [0])*size)
+
+        self.count_rows(rows)
+
+    def update(self, store, rows, start_day0, last_day0):
+        """
+        Bring the table up to date after the season's games changed
+        from start_day0 on: rows are the GameStore rows of all of the
+        season's games played on or after start_day0, and last_day0
+        is the season's new last day.
+
+        Only the totals after start_day0 are counted again. Returns
+        False, without changing the table, if a team that is new to
+        this season played, in which case the table must be rebuilt.
+        """
+        for row in rows:
+            if store.home_team[row] not in self.codes or store.away_team[row] not in self.codes:
+                return False
+        self.store = store
+        if last_day0 + 1 > self.ndays:
+            self.resize(last_day0 + 1)
+
+        # Forget the counts after start_day0...
+        for counter in self.COUNTERS:
+            arr = getattr(self, counter)
+            for table_row in range(self.nrows()):
+                base = table_row*self.stride
+                for d in range(base + start_day0 + 1, base + self.stride):
+                    arr[d] = 0
+
+        # ...and count those games again
+        self.count_rows(rows, start_day0)
+        return True
+
+    def copy(self):
+        """Return a copy of the table, which update() can change without changing this one"""
+        table = copy.copy(self)
+        for counter in self.COUNTERS:
+            arr = getattr(self, counter)
+            setattr(table, counter, copy_column(arr, 0, len(arr)))
+        return table
+
+    def count_rows(self, rows, start_day0=0):
+        """
+        Count the games in the given rows (a range of GameStore rows),
+        then take the running totals from start_day0 on. Every count
+        after start_day0 must be zero to begin with.
+        """
+        if use_numpy():
+            self.count_rows_numpy(rows, start_day0)
+            return
+
+        # Count each game on the day after it was played...
+        store = self.store
+        for row in rows:
+            self.count(row, store.day[row] + 1)
+
+        # ...then turn the daily counts into running totals
+        for counter in self.COUNTERS:
+            arr = getattr(self, counter)
+            if arr.typecode=='d':
+                continue
+            for table_row in range(self.nrows()):
+                base = table_row*self.stride
+                for d in range(base + start_day0 + 1, base + self.stride):
+                    arr[d] += arr[d-1]
+
+    def count_rows_numpy(self, rows, start_day0=0):
+        """count_rows() for the numpy backend, with masks and sums over the store's columns"""
+        store = self.store
+        home_team, away_team, day, flags, home_score, away_score = self.columns(
+            store.home_team, store.away_team, store.day, store.flags, store.home_score, store.away_score,
+            rows=rows
+        )
+
+        # Table row of each team code
+        team_rows = np.full(len(store.teams), -1, dtype=np.intp)
+        for code, i in self.codes.items():
+            team_rows[code] = i
+
+        games = {
+            'home': team_rows[home_team],
+            'away': team_rows[away_team],
+            'offset': day.astype(np.intp) + 1,
+            'home_won': (flags & store.HOME_WON)!=0,
+            'home_score': home_score,
+            'away_score': away_score,
+        }
+        for counter, entries, values in self.count_columns(games):
+            arr = getattr(self, counter)
+            np.add.at(np.frombuffer(arr, dtype=arr.typecode), entries, values)
+
+        for counter in self.COUNTERS:
+            arr = getattr(self, counter)
+            if arr.typecode=='d':
+                continue
+            totals = np.frombuffer(arr, dtype=arr.typecode).reshape(self.nrows(), self.stride)
+            totals[:, start_day0:] = np.cumsum(totals[:, start_day0:], axis=1)
+
+    def columns(self, *columns, rows):
+        """Return NumPy views of the given GameStore columns over a range of rows"""
+        return [np.asarray(column)[rows.start:rows.stop] for column in columns]
+
+    def resize(self, ndays):
+        """Make room for more days, carrying each row's final totals forward (daily counts start at zero)"""
+        stride = ndays + 1
+        for counter in self.COUNTERS:
+            arr = getattr(self, counter)
+            resized = array(arr.typecode)
+            for table_row in range(self.nrows()):
+                base = table_row*self.stride
+                last = 0 if arr.typecode=='d' else arr[base + self.stride - 1]
+                resized.extend(copy_column(arr, base, base + self.stride))
+                resized.extend(array(arr.typecode, [last])*(stride - self.stride))
+            setattr(self, counter, resized)
+        self.ndays = ndays
+        self.stride = stride
+
+    def nrows(self):
+        raise NotImplementedError()
+
+    def count(self, row, offset):
+        raise NotImplementedError()
+
+    def count_columns(self, games):
+        raise NotImplementedError()
+
+    def _span(self, arr, row, start_day0, end_day0):
+        """Total of the given counter in the given row over days [start_day0, end_day0)"""
+        if row is None:
+            return 0
+        start_day0 = min(max(start_day0, 0), self.ndays)
+        end_day0 = min(max(end_day0, 0), self.ndays)
+        if end_day0 <= start_day0:
+            return 0
+        base = row*self.stride
+        if arr.typecode=='d':
+            # Fractional runs: add up the daily counts, in day order.
+            # Whole counts are added as integers (like GameStore.score()),
+            # so the total is only a float if a game in it had fractional runs.
+            total = 0
+            for d in range(base + start_day0 + 1, base + end_day0 + 1):
+                value = arr[d]
+                total += int(value) if value.is_integer() else value
+            return total
+        return arr[base + end_day0] - arr[base + start_day0]
+
+
+class StandingsTable(CumulativeTable):
+    """
+    Cumulative standings for a single season, built once.
+
+    For every team and every day of the season, this holds
+    running totals over all games played BEFORE that day
+    (regular season and postseason games alike):
+    - wins and losses
+    - home wins and losses
+    - away wins and losses
+    - runs scored and runs allowed
+    """
+    COUNTERS = [
+        'wins',
+        'losses',
+        'home_wins',
+        'home_losses',
+        'away_wins',
+        'away_losses',
+        'runs_scored',
+        'runs_allowed',
+    ]
+
+    def nrows(self):
+        return len(self.teams)
+
+    def count(self, row, offset):
+        store = self.store
+        h = self.codes[store.home_team[row]]*self.stride + offset
+        a = self.codes[store.away_team[row]]*self.stride + offset
+        home_score = store.home_score[row]
+        away_score = store.away_score[row]
+        if store.flags[row] & store.HOME_WON:
+            self.wins[h] += 1
+            self.home_wins[h] += 1
+            self.losses[a] += 1
+            self.away_losses[a] += 1
+        else:
+            self.losses[h] += 1
+            self.home_losses[h] += 1
+            self.wins[a] += 1
+            self.away_wins[a] += 1
+        self.runs_scored[h] += home_score
+        self.runs_allowed[h] += away_score
+        self.runs_scored[a] += away_score
+        self.runs_allowed[a] += home_score
+
+    def count_columns(self, games):
+        h = games['home']*self.stride + games['offset']
+        a = games['away']*self.stride + games['offset']
+        won = games['home_won']
+        lost = ~won
+        # Runs go in game order, home team first, like in count()
+        both = interleave(h, a)
+        return [
+            ('wins', np.where(won, h, a), 1),
+            ('losses', np.where(won, a, h), 1),
+            ('home_wins', h[won], 1),
+            ('home_losses', h[lost], 1),
+            ('away_wins', a[lost], 1),
+            ('away_losses', a[won], 1),
+            ('runs_scored', both, interleave(games['home_score'], games['away_score'])),
+            ('runs_allowed', both, interleave(games['away_score'], games['home_score'])),
+        ]
+
+    def row(self, team):
+        return self.teams.get(team)
+
+    def record(self, team, start_day0, end_day0):
+        """W/L record [X, Y] of the given team over days [start_day0, end_day0)"""
+        row = self.row(team)
+        return [
+            self._span(self.wins, row, start_day0, end_day0),
+            self._span(self.losses, row, start_day0, end_day0)
+        ]
+
+    def home_record(self, team, start_day0, end_day0):
+        """Home W/L record [X, Y] of the given team over days [start_day0, end_day0)"""
+        row = self.row(team)
+        return [
+            self._span(self.home_wins, row, start_day0, end_day0),
+            self._span(self.home_losses, row, start_day0, end_day0)
+        ]
+
+    def away_record(self, team, start_day0, end_day0):
+        """Away W/L record [X, Y] of the given team over days [start_day0, end_day0)"""
+        row = self.row(team)
+        return [
+            self._span(self.away_wins, row, start_day0, end_day0),
+            self._span(self.away_losses, row, start_day0, end_day0)
+        ]
+
+    def runs(self, team, start_day0, end_day0):
+        """Runs [scored, allowed] by the given team over days [start_day0, end_day0)"""
+        row = self.row(team)
+        return [
+            self._span(self.runs_scored, row, start_day0, end_day0),
+            self._span(self.runs_allowed, row, start_day0, end_day0)
+        ]
+
+
+class HeadToHeadTable(CumulativeTable):
+    """
+    Cumulative head-to-head results for a single season, built once.
+
+    This is a teams x teams matrix: for every ordered pair
+    (team, versus_team) and every day of the season, it holds
+    running totals over all games the two teams played against
+    each other BEFORE that day (regular season and postseason
+    games alike):
+    - wins by team over versus_team
+    - runs scored by team against versus_team
+
+    Losses and runs allowed are read off the mirrored pair.
+    """
+    COUNTERS = [
+        'wins',
+        'runs',
+    ]
+
+    def nrows(self):
+        return len(self.teams)*len(self.teams)
+
+    def count(self, row, offset):
+        store = self.store
+        h = self.codes[store.home_team[row]]
+        a = self.codes[store.away_team[row]]
+        ha = self.row_codes(h, a)*self.stride + offset
+        ah = self.row_codes(a, h)*self.stride + offset
+        if store.flags[row] & store.HOME_WON:
+            self.wins[ha] += 1
+        else:
+            self.wins[ah] += 1
+        self.runs[ha] += store.home_score[row]
+        self.runs[ah] += store.away_score[row]
+
+    def count_columns(self, games):
+        h = games['home']
+        a = games['away']
+        ha = self.row_codes(h, a)*self.stride + games['offset']
+        ah = self.row_codes(a, h)*self.stride + games['offset']
+        return [
+            ('wins', np.where(games['home_won'], ha, ah), 1),
+            ('runs', interleave(ha, ah), interleave(games['home_score'], games['away_score'])),
+        ]
+
+    def row_codes(self, t, v):
+        return t*len(self.teams) + v
+
+    def rows(self, team, versus_team):
+        """Rows for (team, versus_team) and (versus_team, team), or Nones"""
+        if team not in self.teams or versus_team not in self.teams:
+            return None, None
+        t = self.teams[team]
+        v = self.teams[versus_team]
+        return self.row_codes(t, v), self.row_codes(v, t)
+
+    def record(self, team, versus_team, start_day0, end_day0):
+        """W/L record [X, Y] of team versus versus_team over days [start_day0, end_day0)"""
+        tv, vt = self.rows(team, versus_team)
+        return [
+            self._span(self.wins, tv, start_day0, end_day0),
+            self._span(self.wins, vt, start_day0, end_day0)
+        ]
+
+    def runs_versus(self, team, versus_team, start_day0, end_day0):
+        """Runs [X, Y] scored by team and by versus_team against each other over days [start_day0, end_day0)"""
+        tv, vt = self.rows(team, versus_team)
+        return [
+            self._span(self.runs, tv, start_day0, end_day0),
+            self._span(self.runs, vt, start_day0, end_day0)
+        ]
+
+
+def interleave(x, y):
+    """Return the NumPy array x[0], y[0], x[1], y[1], ..."""
+    return np.stack([x, y], axis=1).ravel()
@@ -0,0 +1,255 @@
+from array import array
+
+
+def smallest_typecode(values):
+    """
+    Return the smallest signed integer array typecode
+    that can hold all of the given values, or 'd' (float)
+    if any of them is not an integer
+    """
+    lo = min(values, default=0)
+    hi = max(values, default=0)
+    if not all(isinstance(v, int) for v in values):
+        return 'd'
+    for typecode, bits in (('b', 8), ('h', 16), ('i', 32)):
+        if -2**(bits-1) <= lo and hi < 2**(bits-1):
+            return typecode
+    return 'q'
+
+
+def column_typecode(column):
+    """Return the typecode of an array (or the format of a memoryview)"""
+    return getattr(column, 'typecode', None) or column.format
+
+
+def copy_column(column, start, stop, typecode=None):
+    """
+    Return a copy of rows [start, stop) of an array (or memoryview)
+    as a new array, converted to the given typecode if needed
+    """
+    old_typecode = column_typecode(column)
+    if typecode is None or typecode==old_typecode:
+        copy = array(old_typecode)
+        copy.frombytes(memoryview(column)[start:stop].cast('B'))
+        return copy
+    return array(typecode, column[start:stop])
+
+
+class GameStore(object):
+    """
+    Compact columnar store of the games data set.
+
+    Instead of one dict with ~30 string keys per game, the store
+    keeps one array per field that the sleuth reads:
+    - season, day: small integer arrays
+    - home_team, away_team: integer codes into the teams list
+    - home_score, away_score: small integer arrays
+      (float arrays if the data set has fractional runs)
+    - home_odds, away_odds: float arrays
+    - flags: one byte per game, with the HOME_WON bit set if
+      the home team won and the POSTSEASON bit set for
+      postseason games
+    - ids: every game id, packed into one bytes object with
+      id_width bytes per game
+
+    Odds are kept as doubles: with single precision floats,
+    odds close to a half percent can round to a different
+    percentage than they do in the data set.
+
+    Games are sorted by season and day, keeping data set order
+    within each day. A row is the position of a game in the arrays.
+    Seasons and days are zero-indexed, like in the data set.
+
+    Columns can be arrays, or memoryviews over a memory-mapped
+    cache file (see cache.py); both are read the same way.
+    """
+    HOME_WON = 1
+    POSTSEASON = 2
+
+    INT_COLUMNS = ['season', 'day', 'home_team', 'away_team', 'home_score', 'away_score', 'flags']
+    FLOAT_COLUMNS = ['home_odds', 'away_odds']
+    COLUMNS = INT_COLUMNS + FLOAT_COLUMNS
+
+    def __init__(self, columns, teams, ids, id_width):
+        """Wrap already-built columns; use from_games() to build a store from game data json items"""
+        for name in self.COLUMNS:
+            setattr(self, name, columns[name])
+        self.teams = teams
+        self.team_codes = {team: i for i, team in enumerate(teams)}
+        self.ids = ids
+        self.id_width = id_width
+        self.fractional_runs = column_typecode(self.home_score)=='d' or column_typecode(self.away_score)=='d'
+
+    @classmethod
+    def from_games(cls, games):
+        """
+        Build a store from an iterable of game data json items.
+        The games are read one at a time, so they can come straight
+        from a streaming parser (see stream.py) without ever being
+        held in memory all at once.
+        """
+        team_codes = {}
+        values, ids = cls.game_values(games, team_codes)
+
+        # Number the teams in sorted order
+        teams = sorted(team_codes)
+        sorted_codes = {team_codes[team]: i for i, team in enumerate(teams)}
+        for name in ['home_team', 'away_team']:
+            values[name] = [sorted_codes[code] for code in values[name]]
+
+        # Sort games by season and day (sorted() is stable,
+        # so games on the same day keep their data set order)
+        season = values['season']
+        day = values['day']
+        order = sorted(range(len(ids)), key=lambda i: (season[i], day[i]))
+
+        columns = {}
+        for name in cls.COLUMNS:
+            column = [values[name][i] for i in order]
+            columns[name] = array(cls.column_typecode_for(name, column), column)
+
+        id_width = max((len(i) for i in ids), default=0)
+        packed_ids = b''.join(ids[i].ljust(id_width, b'\0') for i in order)
+        return cls(columns, teams, packed_ids, id_width)
+
+    @classmethod
+    def game_values(cls, games, team_codes):
+        """
+        Read game data json items into column values and game ids
+        (as bytes), in the same order. Teams are numbered with
+        team_codes, and teams not in it yet are added to it.
+
+        Columns that always fit in an array are collected in one
+        as they are read, instead of in a list of Python objects.
+        """
+        values = {name: [] for name in cls.COLUMNS}
+        for name in cls.FLOAT_COLUMNS:
+            values[name] = array('d')
+        values['flags'] = array('B')
+        for name in ['season', 'day', 'home_team', 'away_team']:
+            values[name] = array('q')
+        ids = []
+        for j in games:
+            values['season'].append(j['season'])
+            values['day'].append(j['day'])
+            for name, key in [('home_team', 'homeTeamNickname'), ('away_team', 'awayTeamNickname')]:
+                team = j[key]
+                if team not in team_codes:
+                    team_codes[team] = len(team_codes)
+                values[name].append(team_codes[team])
+            values['home_score'].append(j['homeScore'])
+            values['away_score'].append(j['awayScore'])
+            values['home_odds'].append(j['homeOdds'])
+            values['away_odds'].append(j['awayOdds'])
+            flags = 0
+            if j['whoWon']=='home':
+                flags |= cls.HOME_WON
+            if j['isPostseason']:
+                flags |= cls.POSTSEASON
+            values['flags'].append(flags)
+            ids.append(j['id'].encode('utf-8'))
+        return values, ids
+
+    @classmethod
+    def column_typecode_for(cls, name, values):
+        """Return the array typecode used for the given column values"""
+        if name in cls.FLOAT_COLUMNS:
+            return 'd'
+        elif name=='flags':
+            return 'B'
+        return smallest_typecode(values)
+
+    def replace_rows(self, rows, games):
+        """
+        Return a new store with the given contiguous range of rows
+        replaced by the given game data json items, in that order.
+        (To insert games without replacing any, pass an empty range.)
+
+        The caller is responsible for keeping the store sorted by
+        season and day (see GameIndex.update_day()). Teams that are
+        new to the store are added to the end of the teams list, and
+        columns are widened if the new values do not fit in them.
+        """
+        team_codes = dict(self.team_codes)
+        values, ids = self.game_values(games, team_codes)
+        teams = sorted(team_codes, key=team_codes.get)
+
+        columns = {}
+        for name in self.COLUMNS:
+            column = getattr(self, name)
+            typecode = column_typecode(column)
+            new_typecode = self.column_typecode_for(name, values[name])
+            if typecode!='d' and (new_typecode=='d' or array(new_typecode).itemsize > array(typecode).itemsize):
+                typecode = new_typecode
+            columns[name] = copy_column(column, 0, rows.start, typecode)
+            columns[name].extend(array(typecode, values[name]))
+            columns[name].extend(copy_column(column, rows.stop, len(self), typecode))
+
+        id_width = max([self.id_width] + [len(i) for i in ids])
+        new_ids = b''.join(i.ljust(id_width, b'\0') for i in ids)
+        if id_width==self.id_width:
+            packed_ids = bytes(self.ids[:rows.start*id_width]) + new_ids + bytes(self.ids[rows.stop*id_width:])
+        else:
+            # Longer game ids than before, pad every id again
+            old_ids = [self.game_id_bytes(row).rstrip(b'\0').ljust(id_width, b'\0') for row in range(len(self))]
+            packed_ids = b''.join(old_ids[:rows.start]) + new_ids + b''.join(old_ids[rows.stop:])
+        return GameStore(columns, teams, packed_ids, id_width)
+
+    def slice(self, rows):
+        """
+        Return a new store with only the given contiguous range of
+        rows (e.g. one season, see GameIndex.season_rows()).
+        The new store holds plain copies of the arrays, even if this
+        store is memory-mapped, so it can be sent to another process.
+        """
+        columns = {}
+        for name in self.COLUMNS:
+            columns[name] = copy_column(getattr(self, name), rows.start, rows.stop)
+        ids = bytes(self.ids[rows.start*self.id_width:rows.stop*self.id_width])
+        return GameStore(columns, self.teams, ids, self.id_width)
+
+    def __len__(self):
+        return len(self.season)
+
+    def __getitem__(self, row):
+        return self.record(row)
+
+    def __iter__(self):
+        for row in range(len(self)):
+            yield self.record(row)
+
+    def game_id_bytes(self, row):
+        """Return the game id of the given row, as (padded) bytes"""
+        start = row*self.id_width
+        return bytes(self.ids[start:start + self.id_width])
+
+    def game_id(self, row):
+        """Return the game id of the given row"""
+        return self.game_id_bytes(row).rstrip(b'\0').decode('utf-8')
+
+    def score(self, column, row):
+        """Return a score, as an integer if the score has no fractional part"""
+        value = column[row]
+        if isinstance(value, float) and value.is_integer():
+            return int(value)
+        return value
+
+    def record(self, row):
+        """
+        Return the given row as a game data json item,
+        with only the keys used by the sleuth
+        """
+        flags = self.flags[row]
+        return {
+            'id': self.game_id(row),
+            'season': self.season[row],
+            'day': self.day[row],
+            'homeTeamNickname': self.teams[self.home_team[row]],
+            'awayTeamNickname': self.teams[self.away_team[row]],
+            'homeScore': self.score(self.home_score, row),
+            'awayScore': self.score(self.away_score, row),
+            'homeOdds': self.home_odds[row],
+            'awayOdds': self.away_odds[row],
+            'whoWon': 'home' if flags & self.HOME_WON else 'away',
+            'isPostseason': bool(flags & self.POSTSEASON),
+        }
@@ -0,0 +1,127 @@
+import os
+import json
+import blaseball_core_game_data as gd
+
+
+CHUNK_SIZE = 1 << 16
+
+_decoder = json.JSONDecoder()
+_whitespace = ' \t\n\r'
+
+
+def iter_json_array(source, chunk_size=CHUNK_SIZE):
+    """
+    Generate the items of a JSON array one at a time, without
+    building the whole list. source is the JSON text, or a text
+    file object that is read chunk_size characters at a time
+    (so only about one item and one chunk are in memory at once).
+
+    Raises ValueError if the text is not a complete JSON array, with
+    the position of the problem counted from the start of the text.
+    """
+    if isinstance(source, str):
+        text = source
+        read = None
+    else:
+        text = ''
+        read = source.read
+
+    pos = 0
+    # Characters of the source before text (dropped once they were read)
+    dropped = 0
+    state = 'start'
+    while True:
+        # Skip whitespace, reading more text if we run out
+        while pos < len(text) and text[pos] in _whitespace:
+            pos += 1
+        if pos==len(text):
+            if read is None:
+                break
+            dropped += len(text)
+            text = read(chunk_size)
+            pos = 0
+            if not text:
+                break
+            continue
+
+        c = text[pos]
+        if state=='start':
+            if c!='[':
+                raise ValueError("Expected a JSON array, found %r at character %d"%(c, dropped + pos))
+            pos += 1
+            state = 'first'
+            continue
+        if c==']' and state!='item':
+            return
+        if state=='comma':
+            if c!=',':
+                raise ValueError("Expected , or ] in JSON array, found %r at character %d"%(c, dropped + pos))
+            pos += 1
+            state = 'item'
+            continue
+
+        # Decode the next item, reading more text until it is complete
+        # (a number or literal is only complete once it is followed
+        # by something else, it might continue in the next chunk)
+        while True:
+            try:
+                item, end = _decoder.raw_decode(text, pos)
+                complete = end < len(text) and (isinstance(item, (dict, list, str)) or text[end] in ',]' + _whitespace)
+                if complete or read is None:
+                    break
+            except json.JSONDecodeError as e:
+                if read is None:
+                    raise ValueError("Invalid JSON array item at character %d: %s"%(dropped + e.pos, e.msg))
+            more = read(chunk_size)
+            if not more:
+                try:
+                    item, end = _decoder.raw_decode(text, pos)
+                except json.JSONDecodeError as e:
+                    raise ValueError("Invalid JSON array item at character %d: %s"%(dropped + e.pos, e.msg))
+                break
+            dropped += pos
+            text = text[pos:] + more
+            pos = 0
+        yield item
+        pos = end
+        state = 'comma'
+
+        # Drop the text we are done with
+        if read is not None and pos > chunk_size:
+            dropped += pos
+            text = text[pos:]
+            pos = 0
+
+    raise ValueError("Unterminated JSON array")
+
+
+def iter_ndjson(f):
+    """Generate the item on each line of a file of newline-delimited JSON"""
+    for line in f:
+        line = line.strip()
+        if line:
+            yield json.loads(line)
+
+
+def get_games_data_file():
+    """
+    Get the games data JSON file to use instead of the games data
+    of blaseball-core-game-data ($SERIES_SLEUTH_GAMES_DATA,
+    e.g. a synthetic data set), or None to use the package's
+    """
+    return os.environ.get('SERIES_SLEUTH_GAMES_DATA') or None
+
+
+def iter_games_data():
+    """Generate every game in the games data set one at a time, as game data json items"""
+    path = get_games_data_file()
+    if path is None:
+        return iter_json_array(gd.get_games_data())
+    return iter_games_data_file(path)
+
+
+def iter_games_data_file(path):
+    """Generate every game in a games data JSON file, reading it a chunk at a time"""
+    with open(path, 'r', encoding='utf-8') as f:
+        for j in iter_json_array(f):
+            yield j
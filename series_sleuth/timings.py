@@ -0,0 +1,188 @@
+import sys
+import json
+import time
+import threading
+from functools import wraps
+import blaseball_core_game_data as gd
+from . import cache, view, backfill, server
+from .store import GameStore
+from .index import GameIndex
+from .standings import StandingsTable, HeadToHeadTable
+from .bracket import PlayoffBracket
+from .sleuth import Sleuth
+from .memo import MetricMemo
+
+
+class Timings(object):
+    """
+    Wall time and number of calls of each phase of a run
+    (loading the data set, finding the game, building the
+    season tables, summarizing, writing JSON) and of each
+    metric method, to find out where the time goes:
+
+        with Timings() as timings:
+            summary = session.summarize(game_id)
+        print(timings.report())
+
+    While the timings are started, the function behind each phase
+    (see PHASES) and each metric method (see MetricMemo.METRICS) is
+    replaced by a wrapper that times it, and stop() puts the originals
+    back, so nothing is timed, and nothing costs any extra, the rest of
+    the time. Only one Timings can be started at a time.
+
+    Times include the time of the phases they call: summarize includes
+    the metric methods, and the season tables they build the first time.
+    Metric methods are only timed when they compute their result, not
+    when the memo has it (see MetricMemo), and only for Sleuths made
+    after the timings started. Calls in worker processes are not counted.
+    """
+    # Phase name, and the module or class and the name of the function behind it
+    PHASES = [
+        ('getGamesData', gd, 'get_games_data'),
+        ('parseGamesData', GameStore, 'from_games'),
+        ('buildIndex', GameIndex, 'build_arrays'),
+        ('readCache', cache, 'read_cache'),
+        ('mapCache', cache, 'map_cache'),
+        ('writeCache', cache, 'write_cache'),
+        ('readDelta', cache, 'read_delta'),
+        ('findGame', GameIndex, 'get'),
+        ('findTeamGame', GameIndex, 'team_game'),
+        ('lastDay', GameIndex, 'last_day0'),
+        ('buildStandings', StandingsTable, '__init__'),
+        ('buildHeadToHead', HeadToHeadTable, '__init__'),
+        ('buildBracket', PlayoffBracket, '__init__'),
+        ('summarize', Sleuth, 'summarize'),
+    ]
+
+    # Modules whose JSON output is timed, as the jsonDumps phase
+    JSON_MODULES = [view, backfill, server]
+
+    _active = None
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.phases = {}
+        self.metrics = {}
+        self.started = None
+        self.stopped = None
+        self.originals = []
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def start(self):
+        """Start timing every phase and metric method"""
+        if Timings._active is not None:
+            raise RuntimeError("Timings are already started")
+        Timings._active = self
+        for name, owner, attr in self.PHASES:
+            self.replace(owner, attr, self.phases, name)
+        for name in MetricMemo.METRICS:
+            self.replace(Sleuth, name, self.metrics, name)
+        dumps = self.timer(self.phases, 'jsonDumps', json.dumps)
+        for module in self.JSON_MODULES:
+            self.originals.append((module, 'json', module.json))
+            module.json = TimedJson(dumps)
+        self.started = time.perf_counter()
+        self.stopped = None
+
+    def stop(self):
+        """Stop timing, and put back the functions that were timed"""
+        if Timings._active is not self:
+            return
+        self.stopped = time.perf_counter()
+        for owner, attr, original in reversed(self.originals):
+            if original is None:
+                # It was inherited, uncover the inherited one again
+                delattr(owner, attr)
+            else:
+                setattr(owner, attr, original)
+        self.originals = []
+        Timings._active = None
+
+    def replace(self, owner, attr, counts, name):
+        """Replace owner.attr with a timed wrapper, counted in counts[name]"""
+        original = owner.__dict__.get(attr)
+        if original is None:
+            # Inherited (e.g. StandingsTable.__init__), time the inherited one
+            timed = self.timer(counts, name, getattr(owner, attr))
+        elif isinstance(original, classmethod):
+            timed = classmethod(self.timer(counts, name, original.__func__))
+        elif isinstance(original, staticmethod):
+            timed = staticmethod(self.timer(counts, name, original.__func__))
+        else:
+            timed = self.timer(counts, name, original)
+        self.originals.append((owner, attr, original))
+        setattr(owner, attr, timed)
+
+    def timer(self, counts, name, f):
+        """Wrap f to add the wall time and number of its calls to counts[name]"""
+        lock = self.lock
+        counts[name] = [0, 0.0]
+
+        @wraps(f)
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return f(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                with lock:
+                    count = counts[name]
+                    count[0] += 1
+                    count[1] += elapsed
+        return timed
+
+    def report(self):
+        """
+        Return the timings as a dict, leaving out what was never called
+        (seconds are wall time, totalled over every call):
+
+        {
+            seconds: 0.412,
+            phases: {
+                parseGamesData: {calls: 1, seconds: 0.351},
+                ...
+            },
+            metrics: {
+                season_record: {calls: 4, seconds: 0.0002},
+                ...
+            }
+        }
+        """
+        end = self.stopped if self.stopped is not None else time.perf_counter()
+        with self.lock:
+            return {
+                'seconds': end - self.started if self.started is not None else 0.0,
+                'phases': self._counts(self.phases),
+                'metrics': self._counts(self.metrics),
+            }
+
+    def _counts(self, counts):
+        return {
+            name: {'calls': calls, 'seconds': seconds}
+            for name, (calls, seconds) in counts.items()
+            if calls
+        }
+
+    def write(self, path='-'):
+        """Write the report as JSON to the given file, or to stderr if the path is -"""
+        text = json.dumps(self.report(), indent=4)
+        if path=='-':
+            print(text, file=sys.stderr)
+        else:
+            with open(path, 'w') as f:
+                f.write(text + '\n')
+
+
+class TimedJson(object):
+    """Stands in for the json module, with a timed dumps()"""
+    def __init__(self, dumps):
+        self.dumps = dumps
+
+    def __getattr__(self, name):
+        return getattr(json, name)
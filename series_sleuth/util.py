@@ -18,6 +18,7 @@ FULL_DALE_UTF8 = "Miami Dal\u00e9"
 
 SEASON_MAX = 99  # never more than 99 games per season
 PLAYOFFS_MAX = SEASON_MAX + 20  # playoffs never go past 20 games
+SERIES_LENGTH = 3  # every regular-season series lasts 3 games
 
 
 class NoMatchingGames(Exception):
@@ -53,6 +54,19 @@ def get_short2long():
     return short2long
 
 
+def read_game_ids(filename):
+    """
+    Read game IDs from a file (or from stdin if filename is -).
+    IDs are separated by whitespace, e.g. one ID per line.
+    """
+    if filename=='-':
+        text = sys.stdin.read()
+    else:
+        with open(filename, 'r') as f:
+            text = f.read()
+    return text.split()
+
+
 def sanitize_dale(s):
     """Utility function to make CLI flag value easier to set"""
     if s == DALE_UTF8:
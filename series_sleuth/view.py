@@ -1,7 +1,9 @@
 import sys
 import json
-from .util import get_short2long
+from .util import get_short2long, SERIES_LENGTH
 from .sleuth import SleuthData
+from .report import SeriesReport
+from .backfill import Backfill
 
 class BaseView(object):
     """
@@ -10,16 +12,23 @@ class BaseView(object):
     - create an object (or method) to parse the data, create the series summary
     - display the game summary using format-specific methods
     """
-    def __init__(self, options):
+    def __init__(self, options, index=None, sleuth=None):
         """
         Create the data wrapper class here
+        (pass an already-loaded index, or a Sleuth, to reuse it across games)
         """
-        self.data = SleuthData(options)
+        self.data = SleuthData(options, index=index, sleuth=sleuth)
         self.game_id = self.data.get_id()
+        self.fields = getattr(options, 'fields', None)
 
 class JsonView(BaseView):
     def show(self):
-        print(json.dumps(self.data.parse(), indent=4))
+        print(json.dumps(self.data.parse(self.fields), indent=4))
+
+class NdjsonView(BaseView):
+    def show(self):
+        """Print the game summary as a single line of JSON (for batch mode)"""
+        print(json.dumps(self.data.parse(self.fields)), flush=True)
 
 class TextView(BaseView):
     def show(self):
@@ -65,7 +74,11 @@ class TextView(BaseView):
         Millennials     2
         Shoe Thieves    3
         """
-        data = self.data.parse()
+        fields = self.fields
+        if fields is not None:
+            # The header needs these too
+            fields = fields + ['homeTeam', 'awayTeam', 'season', 'day', 'playoffs', 'playoffsRound', 'seriesScore']
+        data = self.data.parse(fields)
         ht = data['homeTeam']
         at = data['awayTeam']
         short2long = get_short2long()
@@ -80,7 +93,7 @@ class TextView(BaseView):
         if data['playoffs']:
             bestof = 5
         else:
-            bestof = 3
+            bestof = SERIES_LENGTH
         header.append("Game %d, Best of %d"%(which_game, bestof))
         if data['playoffs']:
             header.append("Playoffs Round %d"%(data['playoffsRound']))
@@ -116,6 +129,8 @@ class TextView(BaseView):
         for label, description in labels_map.items():
             if 'playoffs' in label.lower() and data['playoffs'] is False:
                 continue
+            if self.fields is not None and label not in self.fields:
+                continue
             body.append(description + ":")
             if label in wlrecordlabels:
                 body.append("%-22s%6s"%(at, "-".join([str(j) for j in data[label][at]])))
@@ -130,3 +145,64 @@ class TextView(BaseView):
 
         text = header + [""] + body
         print("\n".join(text))
+
+
+class BaseSeriesView(object):
+    """
+    View class for the all-series report.
+    - create a report object over the whole data set
+    - generate every series in the requested season (or all seasons)
+    - display each series using format-specific methods
+    """
+    def __init__(self, options, index=None):
+        self.report = SeriesReport(index)
+        if options.season:
+            self.season0 = int(options.season) - 1
+        else:
+            self.season0 = None
+
+    def show(self):
+        for series in self.report.series(self.season0):
+            self.show_series(series)
+
+class SeriesJsonView(BaseSeriesView):
+    def show_series(self, series):
+        """Print one series per line of JSON"""
+        print(json.dumps(series), flush=True)
+
+class SeriesTextView(BaseSeriesView):
+    def show_series(self, series):
+        """
+        Season 5, Days 100-103, Playoffs Round 1
+        Millennials           3
+        Shoe Thieves          1
+        """
+        days = series['days']
+        header = "Season %d, Days %d-%d"%(series['season'], days[0], days[-1])
+        if series['playoffs']:
+            header += ", Playoffs Round %d"%(series['playoffsRound'])
+        final = series['games'][-1]['seriesScoreFinal']
+        lines = [header]
+        for team in series['teams']:
+            lines.append("%-22s%6s"%(team, final[team]))
+        lines.append("")
+        print("\n".join(lines))
+
+
+class BackfillView(object):
+    """
+    View class for the backfill of every game:
+    print the summary of every game in the requested season
+    (or all seasons), one game per line of JSON
+    """
+    def __init__(self, options, index=None):
+        self.backfill = Backfill(index, workers=options.parallel, fields=getattr(options, 'fields', None))
+        if options.season:
+            self.season0 = int(options.season) - 1
+        else:
+            self.season0 = None
+
+    def show(self):
+        for line in self.backfill.lines(self.season0):
+            print(line)
+        sys.stdout.flush()
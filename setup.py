@@ -32,6 +32,9 @@ setup(
     {program} = series_sleuth.command:main
     """.format(program = _program),
     install_requires=required,
+    extras_require={
+        'numpy': ['numpy'],
+    },
     keywords=[],
     zip_safe=False,
     long_description=long_description,
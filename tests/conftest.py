@@ -0,0 +1,77 @@
+import os
+import sys
+import random
+from types import SimpleNamespace
+import pytest
+
+# The scripts are not a package, import them from their directory
+scripts_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+sys.path.insert(0, scripts_path)
+
+from generate_games_data import generate_games, postprocess_game, write_games_data
+
+
+def synthetic_games(**settings):
+    """
+    Return a small synthetic games data set (see generate_games_data.py)
+    as a list of game data json items: 8 teams over 2 seasons by default,
+    so the baseline sleuth can go through all of it for every game
+    """
+    args = {
+        'teams': 8,
+        'seasons': 2,
+        'days': 99,
+        'bracket_size': 8,
+        'playoffs_series_length': 5,
+        'seed': 1,
+    }
+    args.update(settings)
+    return list(generate_games(SimpleNamespace(**args)))
+
+
+def with_fractional_runs(games, seed=1):
+    """
+    Return a copy of games where about a third of the scores have a
+    fractional part, like the runs of some games in the real data set
+    """
+    rng = random.Random(seed)
+    fractional = []
+    for j in games:
+        j = dict(j)
+        for key in ['homeScore', 'awayScore']:
+            if rng.random() < 0.3:
+                j[key] += rng.choice([0.1, 0.2, 0.3, 0.5, 0.7])
+        fractional.append(postprocess_game(j))
+    return fractional
+
+
+@pytest.fixture(scope='session')
+def games():
+    return synthetic_games()
+
+
+@pytest.fixture(scope='session')
+def fractional_games(games):
+    return with_fractional_runs(games)
+
+
+@pytest.fixture
+def games_data(games, tmp_path, monkeypatch):
+    """Load the games fixture instead of the installed games data set, from a games data JSON file"""
+    path = str(tmp_path / 'games_data.json')
+    write_games_data(path, games)
+    monkeypatch.setenv('SERIES_SLEUTH_GAMES_DATA', path)
+    return path
+
+
+@pytest.fixture(autouse=True)
+def environment(tmp_path, monkeypatch):
+    """Give every test its own data cache, and the default backend"""
+    monkeypatch.setenv('SERIES_SLEUTH_CACHE_DIR', str(tmp_path / 'cache'))
+    monkeypatch.delenv('SERIES_SLEUTH_BACKEND', raising=False)
+    monkeypatch.delenv('SERIES_SLEUTH_GAMES_DATA', raising=False)
+
+
+def swap_scores(j):
+    """Return a copy of a game with the home and away scores swapped"""
+    return postprocess_game(dict(j, homeScore=j['awayScore'], awayScore=j['homeScore']))
@@ -0,0 +1,21 @@
+import pytest
+from series_sleuth import backend
+from test_sleuth import index_of, parse, check_same
+
+pytestmark = pytest.mark.skipif(backend.numpy is None, reason="the numpy backend needs NumPy")
+
+
+@pytest.fixture
+def numpy_backend(monkeypatch):
+    monkeypatch.setenv(backend.BACKEND_ENV, 'numpy')
+    assert backend.use_numpy()
+
+
+def test_numpy_same_summaries(games, numpy_backend):
+    index = index_of(games)
+    check_same(games, lambda game_id: parse(index, game_id), lambda j: True)
+
+
+def test_numpy_fractional_runs(fractional_games, numpy_backend):
+    index = index_of(fractional_games)
+    check_same(fractional_games, lambda game_id: parse(index, game_id), lambda j: True)
@@ -0,0 +1,18 @@
+from series_sleuth.backfill import Backfill
+from series_sleuth.metrics import REGISTRY, SUMMARIZE_SECONDS, MEMO_LOOKUPS
+from test_sleuth import index_of, baseline
+
+
+def test_backfill(games):
+    index = index_of(games)
+    expected = [baseline(games, j['id']) for j in sorted(games, key=lambda j: (j['season'], j['day']))]
+    counts = {}
+    for workers in [1, 2]:
+        REGISTRY.clear()
+        assert list(Backfill(index, workers).lines())==expected
+
+        # Metrics recorded by worker processes are added up in this one
+        (buckets, _), = SUMMARIZE_SECONDS.collect().values()
+        assert sum(buckets)==len(games)
+        counts[workers] = MEMO_LOOKUPS.collect()
+    assert counts[1]==counts[2]
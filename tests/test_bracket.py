@@ -0,0 +1,65 @@
+from series_sleuth.session import SleuthSession
+from series_sleuth.util import SEASON_MAX
+from test_sleuth import index_of
+
+# Settings of the synthetic data set (see conftest.synthetic_games())
+BRACKET_SIZE = 8
+PLAYOFFS_SERIES_LENGTH = 5
+
+
+def playoffs_series(games, season0):
+    """The playoffs games of a season, by pair of teams, in day order"""
+    series = {}
+    for j in games:
+        if j['season']==season0 and j['day'] >= SEASON_MAX:
+            pair = tuple(sorted([j['homeTeamNickname'], j['awayTeamNickname']]))
+            series.setdefault(pair, []).append(j)
+    return series
+
+
+def series_winner(series_games):
+    wins = {}
+    for j in series_games:
+        wins[j['winningTeamNickname']] = wins.get(j['winningTeamNickname'], 0) + 1
+    return max(wins, key=wins.get)
+
+
+def test_bracket(games):
+    session = SleuthSession(index=index_of(games))
+    for season0 in [0, 1]:
+        expected = playoffs_series(games, season0)
+        rounds = session.bracket(season0 + 1)
+
+        # Single elimination: half as many series every round
+        assert [len(series) for series in rounds]==[4, 2, 1]
+        assert sum(len(series) for series in rounds)==len(expected)
+
+        teams = None
+        for number, playoffs_round in enumerate(rounds, 1):
+            # Every round starts on its own day, and the teams of a round are the winners of the last one
+            round_teams = sorted(team for series in playoffs_round for team in series['teams'])
+            if teams is None:
+                assert len(set(round_teams))==BRACKET_SIZE
+            else:
+                assert round_teams==teams
+            teams = []
+            for series in playoffs_round:
+                series_games = expected[tuple(series['teams'])]
+                assert series['round']==number
+                assert series['days']==[j['day'] + 1 for j in series_games]
+                assert series['days'][0]==SEASON_MAX + 1 + (number - 1)*PLAYOFFS_SERIES_LENGTH
+                assert len(series['days']) <= PLAYOFFS_SERIES_LENGTH
+                assert series['gameIds']==[j['id'] for j in series_games]
+                assert series['scores']==[
+                    {j['homeTeamNickname']: j['homeScore'], j['awayTeamNickname']: j['awayScore']}
+                    for j in series_games
+                ]
+                teams.append(series_winner(series_games))
+            teams.sort()
+        assert len(round_teams)==2
+
+
+def test_bracket_before_playoffs(games):
+    regular_season = [j for j in games if j['day'] < SEASON_MAX]
+    session = SleuthSession(index=index_of(regular_season))
+    assert session.bracket(1)==[]
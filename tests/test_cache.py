@@ -0,0 +1,116 @@
+import os
+from series_sleuth import cache
+from series_sleuth.cache import load_index, map_cache, get_cache_path, get_cache_key
+from series_sleuth.cache import save_day, compact_cache, get_delta_path
+from series_sleuth.session import SleuthSession
+from generate_games_data import write_games_data
+from conftest import swap_scores
+from test_sleuth import parse, check_same
+
+
+def test_load_from_cache(games, games_data):
+    # The first load parses the games data JSON and writes the cache...
+    load_index()
+    assert os.path.exists(get_cache_path())
+
+    # ...and later loads read it back, or map it
+    for mapped in [False, True]:
+        index = load_index(mapped=mapped)
+        assert isinstance(index.store.season, memoryview)==mapped
+        check_same(games, lambda game_id: parse(index, game_id), lambda j: True)
+
+
+def test_stale_cache(games, games_data):
+    load_index()
+    # Once the games data changes, the cache is stale and is not used
+    first_season = [j for j in games if j['season']==0]
+    write_games_data(games_data, first_season)
+    index = load_index()
+    assert len(index.store)==len(first_season)
+    check_same(first_season, lambda game_id: parse(index, game_id), lambda j: True)
+
+
+def test_truncated_cache(games, games_data):
+    load_index()
+    path = get_cache_path()
+    with open(path, 'r+b') as f:
+        f.truncate(os.path.getsize(path) - 64)
+
+    # The truncated file is unmapped again, and the data set is loaded from JSON instead
+    assert map_cache(path, get_cache_key()) is None
+    index = load_index(mapped=True)
+    check_same(games, lambda game_id: parse(index, game_id), lambda j: True)
+
+
+def test_data_version_found_once(games_data, monkeypatch):
+    # The data version can be a hash of the whole games data, so find it once per load
+    calls = []
+    get_data_version = cache.get_data_version
+
+    def counted():
+        calls.append(1)
+        return get_data_version()
+    monkeypatch.setattr(cache, 'get_data_version', counted)
+    for mapped in [False, True]:
+        del calls[:]
+        load_index(mapped=mapped)
+        assert len(calls)==1
+
+
+def changed_days(games, days):
+    """Return the games with the scores of the given (season, day) days swapped, and those days' games"""
+    changed = {j['id']: swap_scores(j) for j in games if (j['season'], j['day']) in days}
+    saved = {}
+    for j in changed.values():
+        saved.setdefault((j['season'], j['day']), []).append(j)
+    return [changed.get(j['id'], j) for j in games], saved
+
+
+def test_refresh_after_compact(games, games_data):
+    session = SleuthSession()
+    updated, saved = changed_days(games, [(0, 50)])
+    save_day(0, 50, saved[(0, 50)])
+    assert session.refresh()
+    old_offset = session.index.delta_offset
+
+    # The delta is folded into the cache file, and a new delta file grows past where the old one ended
+    compact_cache()
+    updated, saved = changed_days(updated, [(0, day0) for day0 in range(20, 26)])
+    for (season0, day0), day in sorted(saved.items()):
+        save_day(season0, day0, day)
+    assert os.path.getsize(get_delta_path()) > old_offset
+
+    assert session.refresh()
+    check_same(updated, session.summarize, lambda j: j['season']==0)
+
+
+def test_refresh_after_delta_replaced(games, games_data):
+    session = SleuthSession()
+    updated, saved = changed_days(games, [(0, 50)])
+    save_day(0, 50, saved[(0, 50)])
+    assert session.refresh()
+    old_offset = session.index.delta_offset
+
+    # The delta file is removed (without compacting it) and a new one is started: the session starts over
+    os.remove(get_delta_path())
+    updated, saved = changed_days(games, [(0, day0) for day0 in range(20, 26)])
+    for (season0, day0), day in sorted(saved.items()):
+        save_day(season0, day0, day)
+    assert os.path.getsize(get_delta_path()) > old_offset
+
+    assert session.refresh()
+    check_same(updated, session.summarize, lambda j: j['season']==0)
+
+
+def test_refresh_garbled_delta(games, games_data):
+    session = SleuthSession()
+    updated, saved = changed_days(games, [(0, 50), (0, 60)])
+    save_day(0, 50, saved[(0, 50)])
+    assert session.refresh()
+    with open(get_delta_path(), 'ab') as f:
+        f.write(b'{"season": 0, "day": \n')
+    save_day(0, 60, saved[(0, 60)])
+
+    # An unreadable line loads the data set again, from the cache and every readable day of the delta
+    assert session.refresh()
+    check_same(updated, session.summarize, lambda j: j['season']==0)
@@ -0,0 +1,35 @@
+import json
+from types import SimpleNamespace
+from series_sleuth import command
+from series_sleuth.sleuth import Sleuth
+from test_sleuth import baseline
+
+
+def batch_options(**settings):
+    options = dict(no_cache=False, mmap=False, text=False, json=True, fields=None, team=None, season=None, day=None)
+    options.update(settings)
+    return SimpleNamespace(**options)
+
+
+def test_batch_shares_memo(games, games_data, capsys, monkeypatch):
+    sleuths = []
+
+    class CountedSleuth(Sleuth):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            sleuths.append(self)
+    monkeypatch.setattr(command, 'Sleuth', CountedSleuth)
+
+    # Every game of the first few series of the first season
+    game_ids = [j['id'] for j in games if j['season']==0 and j['day'] < 6]
+    command.batch(batch_options(), game_ids + ['not a game id'])
+
+    out, err = capsys.readouterr()
+    assert [json.dumps(json.loads(line)) for line in out.splitlines()]==[baseline(games, game_id) for game_id in game_ids]
+    assert "not a game id" in err
+
+    # One Sleuth for the whole batch, whose memo answers the later games of each series
+    assert len(sleuths)==1
+    info = sleuths[0].memo.caches['series_scores'].cache_info()
+    assert info.hits > 0
+    assert info.misses < len(game_ids)
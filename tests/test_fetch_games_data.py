@@ -0,0 +1,252 @@
+import os
+import json
+import time
+import threading
+from types import SimpleNamespace
+from urllib.parse import urlsplit, parse_qs
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+import pytest
+import requests
+import fetch_games_data as fetch
+
+
+class StubServer(object):
+    """
+    Stub of the blaseball API's /database/games endpoint, on a local port.
+    Each day is answered with its games, except that the first requests
+    for a day can be made to fail with the statuses given in failures.
+    Every request is recorded as (time, (season, day)).
+    """
+    def __init__(self, days, failures=None):
+        self.days = days
+        self.failures = {date: list(statuses) for date, statuses in (failures or {}).items()}
+        self.requests = []
+        self.lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                stub.answer(self)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = 'http://127.0.0.1:%d'%(self.httpd.server_port)
+        self.thread = threading.Thread(target=self.httpd.serve_forever, args=(0.05,), daemon=True)
+        self.thread.start()
+
+    def answer(self, handler):
+        params = parse_qs(urlsplit(handler.path).query)
+        date = (int(params['season'][0]), int(params['day'][0]))
+        with self.lock:
+            self.requests.append((time.monotonic(), date))
+            failures = self.failures.get(date)
+            status = failures.pop(0) if failures else 200
+        body = json.dumps(self.days.get(date, []) if status==200 else {'error': status}).encode('utf-8')
+        handler.send_response(status)
+        handler.send_header('Content-Type', 'application/json')
+        handler.send_header('Content-Length', str(len(body)))
+        handler.end_headers()
+        handler.wfile.write(body)
+
+    def times(self, date):
+        return [t for t, d in self.requests if d==date]
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@pytest.fixture
+def stub(games):
+    days = {}
+    for j in games:
+        if j['season']==0 and j['day'] < 12:
+            days.setdefault((0, j['day']), []).append(j)
+    servers = []
+
+    def start(failures=None):
+        server = StubServer(days, failures)
+        servers.append(server)
+        return server
+    yield start
+    for server in servers:
+        server.close()
+
+
+def test_fetch_in_order(stub):
+    server = stub()
+    dates = [(0, day) for day in range(12)]
+    fetched = list(fetch.fetch_game_days(dates, base_url=server.url, workers=4, rate=0))
+    assert [date for date, _ in fetched]==dates
+    assert [games for _, games in fetched]==[server.days[date] for date in dates]
+
+
+def test_retry_with_backoff(stub):
+    # Two failures that are worth trying again, then the day comes back
+    server = stub({(0, 3): [503, 429]})
+    backoff = 0.1
+    fetched = dict(fetch.fetch_game_days([(0, day) for day in range(6)], base_url=server.url,
+                                         workers=2, rate=0, retries=3, backoff=backoff))
+    assert fetched[(0, 3)]==server.days[(0, 3)]
+
+    # Each retry waits at least twice as long as the one before
+    times = server.times((0, 3))
+    assert len(times)==3
+    assert times[1] - times[0] >= backoff
+    assert times[2] - times[1] >= 2*backoff
+
+
+def test_give_up_after_retries(stub):
+    server = stub({(0, 1): [500]*10})
+    with pytest.raises(Exception, match="could not fetch season 1, day 2"):
+        list(fetch.fetch_game_days([(0, 0), (0, 1)], base_url=server.url, workers=2, rate=0, retries=2, backoff=0.01))
+    assert len(server.times((0, 1)))==3
+
+
+def test_no_retry_for_client_errors(stub):
+    server = stub({(0, 1): [404]})
+    with pytest.raises(requests.HTTPError):
+        list(fetch.fetch_game_days([(0, 1)], base_url=server.url, workers=1, rate=0, retries=3, backoff=0.01))
+    assert len(server.times((0, 1)))==1
+
+
+def test_retry_connection_errors(stub):
+    server = stub()
+    url = server.url
+    server.close()
+    with pytest.raises(Exception, match="ConnectionError"):
+        list(fetch.fetch_game_days([(0, 0)], base_url=url, workers=1, rate=0, retries=2, backoff=0.01))
+
+
+def test_rate_limit(stub):
+    server = stub()
+    rate = 20
+    dates = [(0, day) for day in range(10)]
+    list(fetch.fetch_game_days(dates, base_url=server.url, workers=8, rate=rate))
+
+    # However many workers, requests start 1/rate seconds apart
+    times = sorted(t for t, _ in server.requests)
+    assert len(times)==len(dates)
+    assert times[-1] - times[0] >= 0.9*(len(dates) - 1)/rate
+
+
+@pytest.fixture
+def data_files(tmp_path, monkeypatch):
+    """Keep the games data JSON, the update data, and the segments in a directory of their own"""
+    monkeypatch.setattr(fetch, 'SEGMENTS_DIR', str(tmp_path / 'segments'))
+    monkeypatch.setattr(fetch, 'MANIFEST_JSON', str(tmp_path / 'segments' / 'manifest.json'))
+    monkeypatch.setattr(fetch, 'UPDATE_DATA_JSON', str(tmp_path / 'update_data.json'))
+    monkeypatch.setattr(fetch, 'GAMES_DATA_JSON', str(tmp_path / 'games_data_trim.json'))
+    return tmp_path
+
+
+def test_skip_days_without_games(stub, data_files, monkeypatch):
+    server = stub()
+    del server.days[(0, 3)]
+    monkeypatch.setattr(fetch, 'get_game_day', lambda base_url: (0, 6))
+
+    saved = []
+    monkeypatch.setattr(fetch, 'save_sleuth_day', lambda date, games: saved.append(date))
+
+    args = SimpleNamespace(compact=False, export=False, base_url=server.url, workers=2, rate=0, retries=0)
+    fetch.main(args)
+
+    # Days 1 to 5 (zero-indexed) are missing, and day 3 has no games: it is not
+    # saved, but it does count as fetched, so it is not fetched again next time
+    update_data = fetch.load_update_data()
+    assert sorted(update_data['segments']['0']['days'], key=int)==['1', '2', '4', '5']
+    assert saved==[(0, 1), (0, 2), (0, 4), (0, 5)]
+    assert update_data['lastDate']==[0, 5]
+
+
+def days_of(games, dates):
+    """The games of each of the given (season, day) dates"""
+    return {date: [j for j in games if (j['season'], j['day'])==date] for date in dates}
+
+
+def segment_path(updateData, season):
+    return os.path.join(fetch.SEGMENTS_DIR, updateData['segments'][str(season)]['file'])
+
+
+def test_interrupted_append(games, data_files):
+    days = days_of(games, [(0, 0), (0, 1), (0, 2)])
+    updateData = fetch.load_update_data()
+    fetch.save_game_day(updateData, (0, 0), days[(0, 0)])
+    fetch.save_game_day(updateData, (0, 1), days[(0, 1)])
+    committed = os.path.getsize(segment_path(updateData, 0))
+
+    # A day is appended but the manifest is never written, and a crash leaves half a line after it
+    fetch.append_game_day(updateData, (0, 2), days[(0, 2)])
+    with open(segment_path(updateData, 0), 'ab') as f:
+        f.write(b'{"season": 0, "day": 3, "ga')
+
+    # Only the committed days are seen...
+    updateData = fetch.load_update_data()
+    assert sorted(updateData['segments']['0']['days'], key=int)==['0', '1']
+    assert list(fetch.load_game_data())==days[(0, 0)] + days[(0, 1)]
+
+    # ...and the next day saved overwrites whatever was left past them
+    fetch.save_game_day(updateData, (0, 2), days[(0, 2)])
+    assert list(fetch.load_game_data())==days[(0, 0)] + days[(0, 1)] + days[(0, 2)]
+    assert os.path.getsize(segment_path(updateData, 0))==committed + updateData['segments']['0']['days']['2'][1]
+
+
+def test_compact_replaced_days(games, data_files):
+    dates = [(0, day) for day in range(4)]
+    days = days_of(games, dates)
+    updateData = fetch.load_update_data()
+    for date in dates:
+        fetch.save_game_day(updateData, date, days[date])
+    first_file = segment_path(updateData, 0)
+
+    # Saving the same day again and again replaces it, until the replaced copies are over half the segment
+    compacted = False
+    for _ in range(10):
+        fetch.save_game_day(updateData, (0, 1), days[(0, 1)])
+        if segment_path(updateData, 0)!=first_file:
+            compacted = True
+            break
+    assert compacted
+    assert not os.path.exists(first_file)
+
+    segment = updateData['segments']['0']
+    assert segment['length']==sum(length for offset, length in segment['days'].values())
+    assert segment['length']==os.path.getsize(segment_path(updateData, 0))
+    assert list(fetch.load_game_data())==[j for date in dates for j in days[date]]
+    assert list(fetch.load_game_data(fetch.load_update_data()))==[j for date in dates for j in days[date]]
+
+
+def test_load_in_order(games, data_files):
+    # Saved out of order, and with days past 9 (which sort before 2 as strings)
+    dates = [(1, 12), (0, 10), (1, 2), (0, 2), (0, 30), (1, 0)]
+    days = days_of(games, dates)
+    updateData = fetch.load_update_data()
+    for date in dates:
+        fetch.save_game_day(updateData, date, days[date])
+    assert list(fetch.load_game_data())==[j for date in sorted(dates) for j in days[date]]
+    assert updateData['lastDate']==[1, 12]
+
+
+def test_split_games_data(games, data_files):
+    # The first run splits the games data JSON into segments, one per season
+    first_days = [j for j in games if j['day'] < 20]
+    with open(fetch.GAMES_DATA_JSON, 'w') as f:
+        json.dump(first_days, f)
+    with open(fetch.UPDATE_DATA_JSON, 'w') as f:
+        json.dump({'lastDate': [1, 19]}, f)
+
+    updateData = fetch.load_update_data()
+    assert updateData['lastDate']==[1, 19]
+    assert sorted(updateData['segments'], key=int)==['0', '1']
+    for season in ['0', '1']:
+        assert sorted(updateData['segments'][season]['days'], key=int)==[str(day) for day in range(20)]
+    assert os.path.exists(fetch.MANIFEST_JSON)
+    assert list(fetch.load_game_data())==first_days
+
+    # Later runs read the manifest, and can export the same games data again
+    export = str(data_files / 'export.json')
+    fetch.export_game_data(export)
+    with open(export) as f:
+        assert json.load(f)==first_days
@@ -0,0 +1,68 @@
+import pytest
+from types import SimpleNamespace
+from series_sleuth.sleuth import Sleuth, FIELDS
+from series_sleuth.session import SleuthSession
+from series_sleuth.view import TextView
+from series_sleuth.util import SEASON_MAX
+from test_sleuth import index_of
+
+
+def sample_games(games):
+    """A few regular-season games and a few playoffs games"""
+    regular = [j for j in games if j['day'] < SEASON_MAX]
+    playoffs = [j for j in games if j['day'] >= SEASON_MAX]
+    return regular[::150] + playoffs[::10]
+
+
+def test_each_field(games):
+    index = index_of(games)
+    sleuth = Sleuth(index, memo_size=0)
+    for j in sample_games(games):
+        r = index.get(j['id'])
+        full = sleuth.summarize(r)
+        for field in FIELDS:
+            # The same value as in the full summary (and nothing, for playoffs keys of regular-season games)
+            assert sleuth.summarize(r, fields=[field])=={key: value for key, value in full.items() if key==field}, (j['id'], field)
+
+
+def test_several_fields(games):
+    index = index_of(games)
+    sleuth = Sleuth(index)
+    fields = ['seriesScoreFinal', 'odds', 'playoffsRound', 'seasonRecord', 'homeTeam']
+    for j in sample_games(games):
+        r = index.get(j['id'])
+        full = sleuth.summarize(r)
+        # In the usual order, whatever order the fields were asked for in
+        assert sleuth.summarize(r, fields=fields)=={key: value for key, value in full.items() if key in fields}
+        assert list(sleuth.summarize(r, fields=fields))==[key for key in full if key in fields]
+
+
+def test_unknown_fields(games):
+    session = SleuthSession(index=index_of(games))
+    game_id = games[0]['id']
+    with pytest.raises(ValueError, match="Unknown field\\(s\\): nope, nah"):
+        session.summarize(game_id, fields=['odds', 'nope', 'nah'])
+    with pytest.raises(ValueError, match="Unknown field"):
+        session.summarize_many([game_id], fields=['nope'], workers=2)
+
+
+def show_text(index, game_id, fields, capsys):
+    options = SimpleNamespace(game_id=game_id, team=None, season=None, day=None, fields=fields)
+    TextView(options, index=index).show()
+    return capsys.readouterr().out.split("\n\n")
+
+
+@pytest.mark.parametrize('fields', [['odds'], ['seriesScoreFinal', 'seasonRecord'], ['playoffsRecord']])
+def test_text_view_fields(games, fields, capsys):
+    # With --fields, the header is the same as without, and only the sections of those fields follow it
+    index = index_of(games)
+    for j in sample_games(games):
+        full = show_text(index, j['id'], None, capsys)
+        some = show_text(index, j['id'], fields, capsys)
+        assert some[0]==full[0]
+        assert some[0].split("\n")[1]=="Season %d, Day %d"%(j['season'] + 1, j['day'] + 1)
+        sections = [section for section in some[1:] if section.strip()]
+        shown = [field for field in fields if j['day'] >= SEASON_MAX or 'playoffs' not in field.lower()]
+        assert len(sections)==len(shown)
+        for section in sections:
+            assert section in full
@@ -0,0 +1,30 @@
+import argparse
+import pytest
+from generate_games_data import add_arguments, check_args
+
+
+def parse_args(*flags):
+    p = argparse.ArgumentParser()
+    add_arguments(p)
+    return p.parse_args(list(flags))
+
+
+def test_default_settings():
+    check_args(parse_args())
+
+
+@pytest.mark.parametrize('flags, message', [
+    (['--days', '98'], "whole number of 3-game series"),
+    (['--days', '102'], "1 to 99 days long"),
+    (['--bracket-size', '6'], "power of 2"),
+    (['--playoffs-series-length', '4'], "odd number"),
+])
+def test_reject_settings(flags, message):
+    with pytest.raises(Exception, match=message):
+        check_args(parse_args(*flags))
+
+
+def test_no_series_length_flag():
+    # Every regular-season series is SERIES_LENGTH games long, it cannot be set
+    with pytest.raises(SystemExit):
+        parse_args('--series-length', '4')
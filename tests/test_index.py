@@ -0,0 +1,58 @@
+import json
+import pytest
+from series_sleuth.sleuth import Sleuth
+from conftest import swap_scores
+from test_sleuth import index_of
+
+
+def summaries(index):
+    sleuth = Sleuth(index, memo_size=0)
+    return [json.dumps(sleuth.summarize(j)) for j in index.store]
+
+
+def day_games(games, season0, day0):
+    return [j for j in games if (j['season'], j['day'])==(season0, day0)]
+
+
+def without_days(games, days):
+    return [j for j in games if (j['season'], j['day']) not in days]
+
+
+def updates(games, change):
+    """Return the games to start from, the days to update one at a time, and the games after the updates"""
+    last = max(j['day'] for j in games if j['season']==0)
+    if change=='empty day past the end':
+        return games, [(0, last + 3, [])], games
+    if change=='empty day past the last season':
+        return games, [(5, 10, [])], games
+    if change=='replace a day':
+        swapped = {j['id']: swap_scores(j) for j in day_games(games, 0, 50)}
+        return games, [(0, 50, list(swapped.values()))], [swapped.get(j['id'], j) for j in games]
+    if change=='remove a day':
+        return games, [(0, last, [])], without_days(games, [(0, last)])
+    if change=='add the last day':
+        return without_days(games, [(0, last)]), [(0, last, day_games(games, 0, last))], games
+    # Add the first two series of a new season
+    first = [j for j in games if j['season']==0]
+    days = [(1, day0, day_games(games, 1, day0)) for day0 in range(6)]
+    return first, days, first + [j for _, _, day in days for j in day]
+
+
+@pytest.mark.parametrize('change', [
+    'empty day past the end',
+    'empty day past the last season',
+    'replace a day',
+    'remove a day',
+    'add the last day',
+    'add a new season',
+])
+def test_update_day(games, change):
+    # update_day() on a warmed index gives the same index as building it again
+    start, days, final = updates(games, change)
+    index = index_of(start)
+    index.warm()
+    for season0, day0, day in days:
+        index.update_day(season0, day0, day)
+    rebuilt = index_of(final)
+    assert list(index.store)==list(rebuilt.store)
+    assert summaries(index)==summaries(rebuilt)
@@ -0,0 +1,21 @@
+from series_sleuth.sleuth import Sleuth
+from test_sleuth import index_of, check_same, is_regular
+
+
+def test_series_scores_once_per_series(games):
+    sleuth = Sleuth(index_of(games))
+    team = games[0]['homeTeamNickname']
+    scores = [sleuth.series_scores(team, 1, day) for day in [4, 5, 6]]
+
+    # Every day of the series asks the memo for its first day
+    assert scores[0]==scores[1]==scores[2]
+    info = sleuth.memo.caches['series_scores'].cache_info()
+    assert (info.hits, info.misses, info.currsize)==(2, 1, 1)
+
+
+def test_memo_same_summaries(games):
+    # One sleuth (and one memo) for every game, so the series scores
+    # of each game come from the memo of the first game of its series
+    sleuth = Sleuth(index_of(games))
+    check_same(games, lambda game_id: sleuth.summarize(sleuth.index.get(game_id)), is_regular)
+    assert sleuth.memo.caches['series_scores'].cache_info().hits > 0
@@ -0,0 +1,29 @@
+import json
+from series_sleuth.report import SeriesReport
+from series_sleuth.util import SERIES_LENGTH
+from test_sleuth import index_of, baseline
+
+
+def test_all_series(games):
+    report = SeriesReport(index_of(games))
+    seen = []
+    for series in report.series():
+        if not series['playoffs']:
+            assert len(series['days'])==SERIES_LENGTH
+        for game_id, summary in zip(series['gameIds'], series['games']):
+            assert json.dumps(summary)==baseline(games, game_id), game_id
+        seen += series['gameIds']
+
+    # Every game is in exactly one series (every series of the data set is complete)
+    assert sorted(seen)==sorted(j['id'] for j in games)
+
+
+def test_unfinished_series_skipped(games):
+    # The last series of the season is one day short, so it is left out of the report
+    unfinished = [j for j in games if j['season']==0 and j['day'] <= 40]
+    report = SeriesReport(index_of(unfinished))
+    all_series = list(report.series(0))
+    assert max(series['days'][-1] for series in all_series)==39
+    for series in all_series:
+        for game_id, summary in zip(series['gameIds'], series['games']):
+            assert json.dumps(summary)==baseline(unfinished, game_id), game_id
@@ -0,0 +1,82 @@
+import json
+import asyncio
+import pytest
+from series_sleuth.server import SleuthServer
+from series_sleuth.metrics import HTTP_REQUESTS
+from test_sleuth import index_of, baseline
+
+
+def request(server, raw):
+    """Send a raw request to the server, and return the status and body of the response"""
+    async def send():
+        listener = await server.start(port=0)
+        port = listener.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        writer.write(raw)
+        await writer.drain()
+        # The request asks for the connection to be closed after the response
+        response = await reader.read()
+        writer.close()
+        listener.close()
+        await listener.wait_closed()
+        return response
+    head, _, body = asyncio.run(send()).partition(b'\r\n\r\n')
+    status = int(head.split()[1])
+    return status, json.loads(body)
+
+
+def get(server, target):
+    return request(server, ('GET %s HTTP/1.1\r\nConnection: close\r\n\r\n'%(target)).encode('latin-1'))
+
+
+def test_series(games):
+    server = SleuthServer(index_of(games))
+    for j in games[::50]:
+        status, body = get(server, '/series?game_id=%s'%(j['id']))
+        assert status==200
+        assert json.dumps(body)==baseline(games, j['id'])
+
+    status, body = get(server, '/series?game_id=nope')
+    assert status==404
+
+
+def test_internal_error(games):
+    # The series of the last game has not finished yet, so it cannot be summarized
+    unfinished = [j for j in games if j['season']==0 and j['day'] <= 39]
+    server = SleuthServer(index_of(unfinished))
+    status, body = get(server, '/series?game_id=%s'%(unfinished[-1]['id']))
+    assert status==500
+    assert 'error' in body
+
+
+def test_malformed_content_length(games):
+    server = SleuthServer(index_of(games))
+    raw = ('GET /series?game_id=%s HTTP/1.1\r\nContent-Length: lots\r\n\r\n'%(games[0]['id'])).encode('latin-1')
+    status, body = request(server, raw)
+    assert status==400
+
+
+def requests_counted(query, status):
+    return HTTP_REQUESTS.values.get(HTTP_REQUESTS.key({'query': query, 'status': status}), 0)
+
+
+def test_count_failed_requests(games):
+    unfinished = [j for j in games if j['season']==0 and j['day'] <= 39]
+    server = SleuthServer(index_of(unfinished))
+    before = requests_counted('game_id', 500)
+    get(server, '/series?game_id=%s'%(unfinished[-1]['id']))
+    assert requests_counted('game_id', 500)==before + 1
+
+    # Even a request that is interrupted is counted, as a 500
+    def interrupt():
+        raise KeyboardInterrupt()
+    server.session.refresh = interrupt
+    with pytest.raises(KeyboardInterrupt):
+        server.query('GET', '/series?game_id=%s'%(unfinished[0]['id']))
+    assert requests_counted('game_id', 500)==before + 2
+
+    # Requests too malformed to have a query count as other queries
+    before = requests_counted('other', 400)
+    request(server, b'GET /series HTTP/1.1\r\nContent-Length: lots\r\n\r\n')
+    request(server, b'nonsense\r\n\r\n')
+    assert requests_counted('other', 400)==before + 2
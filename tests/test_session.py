@@ -0,0 +1,77 @@
+import json
+from series_sleuth.session import SleuthSession
+from series_sleuth.cache import save_day, share_index
+from conftest import swap_scores
+from test_sleuth import index_of, check_same, baseline
+
+
+def test_summarize_many(games, games_data):
+    session = SleuthSession()
+    game_ids = [j['id'] for j in games] + ['not a game id']
+    for workers in [None, 4]:
+        summaries = session.summarize_many(game_ids, workers=workers)
+        assert summaries[-1] is None
+        assert [json.dumps(summary) for summary in summaries[:-1]]==[baseline(games, game_id) for game_id in game_ids[:-1]]
+
+
+def test_refresh_after_summarize_many(games, games_data):
+    session = SleuthSession()
+    session.summarize_many([j['id'] for j in games[:100]], workers=4)
+    assert not session.index.frozen
+
+    # The session still picks up days saved after a batch on threads
+    changed = {j['id']: swap_scores(j) for j in games if j['season']==0 and j['day']==50}
+    save_day(0, 50, list(changed.values()))
+    assert session.refresh()
+    updated = [changed.get(j['id'], j) for j in games]
+    check_same(updated, session.summarize, lambda j: j['season']==0)
+
+
+def test_frozen_session(games, games_data):
+    session = SleuthSession()
+    session.freeze()
+    session.summarize_many([j['id'] for j in games[:100]], workers=4)
+    assert session.index.frozen
+    save_day(0, 50, [swap_scores(j) for j in games if j['season']==0 and j['day']==50])
+    assert not session.refresh()
+
+
+def test_summarize_many_processes(games, games_data):
+    # A session over an index of its own: the processes summarize its games, not the data set's
+    first_season = [j for j in games if j['season']==0]
+    session = SleuthSession(index=index_of(first_season), memo_size=16)
+    game_ids = [j['id'] for j in games]
+    threads = session.summarize_many(game_ids, workers=2)
+    processes = session.summarize_many(game_ids, workers=2, processes=True)
+    assert processes==threads
+    assert processes.count(None)==len(games) - len(first_season)
+
+
+def test_summarize_many_processes_after_refresh(games, games_data):
+    # Days added since the data set was loaded are summarized by the processes too
+    session = SleuthSession()
+    # (until then, the processes can map the cache file itself)
+    assert share_index(session.index)[3] is False
+    changed = {j['id']: swap_scores(j) for j in games if j['season']==0 and j['day']==50}
+    save_day(0, 50, list(changed.values()))
+    assert session.refresh()
+    game_ids = [j['id'] for j in games if j['season']==0]
+    updated = [changed.get(j['id'], j) for j in games]
+    summaries = session.summarize_many(game_ids, workers=2, processes=True)
+    assert [json.dumps(summary) for summary in summaries]==[baseline(updated, game_id) for game_id in game_ids]
+
+
+def test_refresh_swaps_index(games, games_data):
+    # refresh() updates a copy of the index: a thread still reading the old one sees the old games
+    session = SleuthSession()
+    old_index = session.index
+    old_index.warm()
+    changed = {j['id']: swap_scores(j) for j in games if j['season']==0 and j['day']==50}
+    save_day(0, 50, list(changed.values()))
+    assert session.refresh()
+    assert session.index is not old_index
+
+    updated = [changed.get(j['id'], j) for j in games]
+    old_session = SleuthSession(index=old_index)
+    check_same(games, old_session.summarize, lambda j: j['season']==0 and j['day'] >= 48)
+    check_same(updated, session.summarize, lambda j: j['season']==0 and j['day'] >= 48)
@@ -0,0 +1,69 @@
+import json
+from types import SimpleNamespace
+from series_sleuth.store import GameStore
+from series_sleuth.index import GameIndex
+from series_sleuth.sleuth import SleuthData
+from series_sleuth.util import SEASON_MAX
+from baseline_sleuth import BaselineSleuth
+
+
+def index_of(games):
+    return GameIndex(GameStore.from_games(games))
+
+
+def parse(index, game_id):
+    options = SimpleNamespace(game_id=game_id, team=None, season=None, day=None)
+    return SleuthData(options, index=index).parse()
+
+
+def is_regular(j):
+    return j['day'] < SEASON_MAX
+
+
+def is_playoffs(j):
+    return j['day'] >= SEASON_MAX
+
+
+def check_same(games, summarize, select):
+    """
+    Check that summarize(game_id) gives the same summary as the baseline
+    for every selected game: same keys in the same order, same values,
+    and same types (compared as JSON, so 27 and 27.0 are different)
+    """
+    checked = 0
+    for j in games:
+        if not select(j):
+            continue
+        assert json.dumps(summarize(j['id']))==baseline(games, j['id']), j['id']
+        checked += 1
+    assert checked > 0
+
+
+# Baseline summaries (as JSON) already worked out, by data set and game id
+_baseline = {}
+
+
+def baseline(games, game_id):
+    """Return the baseline summary of the given game as JSON"""
+    key = (id(games), game_id)
+    if key not in _baseline:
+        _baseline[key] = json.dumps(BaselineSleuth(games, game_id).parse())
+    return _baseline[key]
+
+
+def test_parse_regular_season(games):
+    index = index_of(games)
+    check_same(games, lambda game_id: parse(index, game_id), is_regular)
+
+
+def test_parse_playoffs(games):
+    index = index_of(games)
+    check_same(games, lambda game_id: parse(index, game_id), is_playoffs)
+
+
+def test_parse_fractional_runs(fractional_games):
+    # Run totals are added up in the same order as the baseline, so they
+    # are exactly the same floats (e.g. 16.8, not 16.800000000000004), and
+    # totals without any fractional runs in them stay integers (27, not 27.0)
+    index = index_of(fractional_games)
+    check_same(fractional_games, lambda game_id: parse(index, game_id), lambda j: True)
@@ -0,0 +1,61 @@
+import io
+import json
+import pytest
+from series_sleuth.stream import iter_json_array
+
+# Small chunks split every item, number, and string across chunk boundaries
+CHUNK_SIZES = [1, 2, 3, 7, 64]
+
+
+def items(text, chunk_size):
+    """Parse text as a file read chunk_size characters at a time (or as a string, if chunk_size is None)"""
+    if chunk_size is None:
+        return list(iter_json_array(text))
+    return list(iter_json_array(io.StringIO(text), chunk_size=chunk_size))
+
+
+@pytest.mark.parametrize('chunk_size', [None] + CHUNK_SIZES)
+@pytest.mark.parametrize('text', [
+    '[]',
+    ' [ ] ',
+    '[12345, -6.5e3, 0, 1e-7, 123456789012345678901234567890]',
+    '[true, false, null, 7]',
+    '["plain", "esc\\"aped \\\\ quote", "\\u00e9 and \\ud83c\\udf1f", "]", ",", "{"]',
+    '[{"a": [1, 2, {"b": "]"}], "c": {"d": []}}, [[], [[1]], {}], {"e": 1.25}]',
+    '\n[\n  1 ,\n\t"two"\r\n,  {"three": 3}\n]\n',
+])
+def test_items(text, chunk_size):
+    assert items(text, chunk_size)==json.loads(text)
+
+
+@pytest.mark.parametrize('chunk_size', CHUNK_SIZES)
+def test_games(games, chunk_size):
+    text = json.dumps(games[:20])
+    assert items(text, chunk_size)==games[:20]
+
+
+@pytest.mark.parametrize('chunk_size', [None] + CHUNK_SIZES)
+@pytest.mark.parametrize('text, message', [
+    ('', "Unterminated JSON array"),
+    ('[1, 2', "Unterminated JSON array"),
+    ('[1, 2,', "Unterminated JSON array"),
+    ('[{"a": 1', "Invalid JSON array item at character 8: Expecting ',' delimiter"),
+    ('["abc', "Invalid JSON array item at character 1: Unterminated string"),
+    ('  {"a": 1}', "Expected a JSON array, found '{' at character 2"),
+    ('[1 2]', "Expected , or \\] in JSON array, found '2' at character 3"),
+    ('[1,]', "Invalid JSON array item at character 3: Expecting value"),
+    ('[1, nope]', "Invalid JSON array item at character 4: Expecting value"),
+])
+def test_malformed(text, message, chunk_size):
+    with pytest.raises(ValueError, match=message):
+        items(text, chunk_size)
+
+
+@pytest.mark.parametrize('chunk_size', [None] + CHUNK_SIZES)
+def test_error_position(games, chunk_size):
+    # The position of a problem is counted from the start, however much text was read and dropped before it
+    text = json.dumps(games[:20])
+    bad = text[:-1] + ', {"id": nope}]'
+    position = len(text) - 1 + len(', {"id": ')
+    with pytest.raises(ValueError, match="at character %d: Expecting value"%(position)):
+        items(bad, chunk_size)
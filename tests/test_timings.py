@@ -0,0 +1,92 @@
+from series_sleuth.timings import Timings
+from series_sleuth.standings import StandingsTable, HeadToHeadTable
+from series_sleuth.session import SleuthSession
+from series_sleuth.memo import MetricMemo
+from series_sleuth.sleuth import Sleuth
+
+
+class Base(object):
+    def __init__(self, value):
+        self.value = value
+
+
+class Phases(Base):
+    """Stand-in for a class with each kind of function Timings replaces"""
+    def method(self):
+        return self.value
+
+    @classmethod
+    def build(cls, value):
+        return cls(value)
+
+    @staticmethod
+    def double(value):
+        return 2*value
+
+
+class PhasesTimings(Timings):
+    PHASES = [
+        ('init', Phases, '__init__'),
+        ('method', Phases, 'method'),
+        ('build', Phases, 'build'),
+        ('double', Phases, 'double'),
+    ]
+
+
+def attributes(timings):
+    """The objects behind every phase and metric method, as found in their owners' dicts"""
+    owners = [(owner, attr) for _, owner, attr in timings.PHASES]
+    owners += [(Sleuth, name) for name in MetricMemo.METRICS]
+    owners += [(module, 'json') for module in timings.JSON_MODULES]
+    return [(owner, attr, owner.__dict__.get(attr)) for owner, attr in owners]
+
+
+def test_kinds_of_functions():
+    before = attributes(PhasesTimings)
+    with PhasesTimings() as timings:
+        p = Phases.build(3)
+        assert p.method()==3
+        assert Phases.double(4)==8
+        assert p.double(5)==10
+        # The inherited __init__ is timed on the class itself while the timings run
+        assert '__init__' in Phases.__dict__
+
+    # Every original is back (the same object), and the inherited __init__ is inherited again
+    for (owner, attr, original), (_, _, now) in zip(before, attributes(PhasesTimings)):
+        assert now is original, (owner, attr)
+    assert '__init__' not in Phases.__dict__
+    assert Phases(1).value==1
+
+    phases = timings.report()['phases']
+    assert {name: phase['calls'] for name, phase in phases.items()}=={'init': 1, 'method': 1, 'build': 1, 'double': 2}
+
+
+def test_timings(games, games_data):
+    before = attributes(Timings)
+    with Timings() as timings:
+        session = SleuthSession(memo_size=0)
+        for j in games[::100]:
+            session.summarize(j['id'])
+        for j in games[:3]:
+            session.summarize_game(j['homeTeamNickname'], j['season'] + 1, j['day'] + 1)
+
+    report = timings.report()
+    assert report['seconds'] > 0
+    for name in ['parseGamesData', 'buildIndex', 'writeCache', 'findGame', 'findTeamGame',
+                 'buildStandings', 'buildHeadToHead', 'buildBracket', 'summarize']:
+        phase = report['phases'][name]
+        assert phase['calls'] > 0 and phase['seconds'] > 0, name
+    assert report['phases']['summarize']['calls']==len(games[::100]) + 3
+    for name in MetricMemo.METRICS:
+        if name in report['metrics']:
+            assert report['metrics'][name]['seconds'] > 0
+    assert report['metrics']['season_record']['calls'] > 0
+
+    # Nothing is timed after stop(): every patched attribute is the original object again
+    for (owner, attr, original), (_, _, now) in zip(before, attributes(Timings)):
+        assert now is original, (owner, attr)
+    # (the table classes inherit __init__, and no copy of it is left on them)
+    assert '__init__' not in StandingsTable.__dict__
+    assert '__init__' not in HeadToHeadTable.__dict__
+    session.summarize(games[0]['id'])
+    assert timings.report()==report